@@ -0,0 +1,202 @@
+"""
+Lazy, indexed access to schemas inside (uncompressed) tar archives.
+
+Indexing an archive reads member headers and scans each member for its top-level
+`id` (members with `definitions` are parsed to find their ids, then discarded);
+members are memory-mapped and parsed only when one of their schemas is first used.
+
+Compressed archives cannot be read at arbitrary offsets and are loaded eagerly.
+"""
+from contextlib import closing
+from json import JSONDecoder
+from mmap import ACCESS_READ, mmap
+from tarfile import TarFile
+import re
+
+from jsonschematypes.model import DEFINITIONS, ID, TYPE
+from jsonschematypes.serialization import DEFAULT_CODEC
+
+
+# bytes of a member to read (at first) when looking for its id
+PREFIX_SIZE = 4096
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class IncompleteSchema(Exception):
+    """
+    A schema's prefix ended before its id was found.
+    """
+    pass
+
+
+def scan_id(text):
+    """
+    Find the top-level `id` of a JSON object by skipping over other top-level values.
+
+    Returns `None` if the object has no `id`; raises `IncompleteSchema` if `text`
+    ends first.
+    """
+    return scan_key(text, ID)
+
+
+def scan_key(text, name):
+    """
+    Find a top-level value of a JSON object by skipping over other top-level values.
+
+    Returns `None` if the object has no such key; raises `IncompleteSchema` if `text`
+    ends first.
+    """
+    decoder = JSONDecoder()
+
+    def skip(position):
+        position = WHITESPACE.match(text, position).end()
+        if position == len(text):
+            raise IncompleteSchema()
+        return position
+
+    def decode(position):
+        try:
+            return decoder.raw_decode(text, position)
+        except ValueError:
+            raise IncompleteSchema()
+
+    position = skip(0)
+    if text[position] != "{":
+        raise ValueError("Expected a JSON object")
+    position = skip(position + 1)
+    if text[position] == "}":
+        return None
+
+    while True:
+        key, position = decode(position)
+        position = skip(position)
+        if text[position] != ":":
+            raise ValueError("Expected ':'")
+        value, position = decode(skip(position + 1))
+        if key == name:
+            return value
+        position = skip(position)
+        if text[position] == "}":
+            return None
+        if text[position] != ",":
+            raise ValueError("Expected ',' or '}'")
+        position = skip(position + 1)
+
+
+def iter_definitions(schema):
+    """
+    Iterate through a schema's (nested) definitions that have ids.
+    """
+    for definition in schema.get(DEFINITIONS, {}).values():
+        if ID in definition:
+            yield definition
+        for nested in iter_definitions(definition):
+            yield nested
+
+
+def iter_definition_ids(schema):
+    """
+    Iterate through the ids of a schema's (nested) definitions.
+    """
+    for definition in iter_definitions(schema):
+        yield definition[ID]
+
+
+class TarArchive(object):
+    """
+    An uncompressed tar archive whose members are memory-mapped and read on demand.
+    """
+    def __init__(self, filename, codec=DEFAULT_CODEC):
+        self.filename = filename
+        self.codec = codec
+        # ids of the indexed schemas (including definitions)
+        self.schema_ids = []
+        with closing(open(filename, "rb")) as fileobj:
+            # the mapping remains valid after the file is closed
+            self.data = mmap(fileobj.fileno(), 0, access=ACCESS_READ)
+
+    def read(self, offset, size):
+        """
+        Read (the bytes of) a member.
+        """
+        return self.data[offset:offset + size]
+
+    def load(self, offset, size):
+        """
+        Parse a member's schema.
+        """
+        return self.codec.loads(self.read(offset, size))
+
+    def type_for(self, offset, size, schema_id):
+        """
+        Find the type of a schema in a member without loading the member.
+
+        Returns `None` if the schema has no type.
+        """
+        data = self.read(offset, size)
+        if b'"' + DEFINITIONS.encode("utf-8") + b'"' in data:
+            # the schema may be one of the member's definitions
+            schema = self.codec.loads(data)
+            for definition in iter_definitions(schema):
+                if definition[ID] == schema_id:
+                    return definition.get(TYPE)
+            return schema.get(TYPE)
+        try:
+            return scan_key(data.decode("utf-8", "ignore"), TYPE)
+        except IncompleteSchema:
+            raise ValueError("Invalid schema at offset: {}".format(offset))
+
+    def iter_members(self):
+        """
+        Iterate through (offset, size) of regular members, reading headers only.
+        """
+        with closing(TarFile.open(self.filename)) as tarfile:
+            tarinfo = tarfile.next()
+            while tarinfo is not None:
+                if tarinfo.isreg():
+                    yield tarinfo.offset_data, tarinfo.size
+                tarinfo = tarfile.next()
+
+    def ids_for(self, fileobj, offset, size):
+        """
+        Find the ids of the schemas in a member (its top-level id first).
+
+        Members are read (rather than mapped) while indexing, so that they do not
+        remain resident.
+        """
+        fileobj.seek(offset)
+        data = fileobj.read(size)
+        if b'"' + DEFINITIONS.encode("utf-8") + b'"' in data:
+            # definitions may appear anywhere; parse the whole member
+            schema = self.codec.loads(data)
+            return [schema[ID]] + list(iter_definition_ids(schema))
+
+        prefix_size = PREFIX_SIZE
+        while True:
+            text = data[:prefix_size].decode("utf-8", "ignore")
+            try:
+                schema_id = scan_id(text)
+            except IncompleteSchema:
+                if prefix_size >= size:
+                    raise ValueError("Invalid schema at offset: {}".format(offset))
+                prefix_size *= 2
+                continue
+            if schema_id is None:
+                raise ValueError("Schema without id at offset: {}".format(offset))
+            return [schema_id]
+
+    def index(self):
+        """
+        Index the archive's schemas, returning lists of ids and (offset, size) per member.
+        """
+        with closing(open(self.filename, "rb")) as fileobj:
+            index = [
+                (self.ids_for(fileobj, offset, size), (offset, size))
+                for offset, size in self.iter_members()
+            ]
+        self.schema_ids = [schema_id for ids, _ in index for schema_id in ids]
+        return index
+
+    def close(self):
+        self.data.close()
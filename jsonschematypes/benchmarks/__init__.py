@@ -0,0 +1,27 @@
+"""
+Micro-benchmarks for schema loading, class generation and validation.
+
+Each benchmark module can be run directly, e.g.:
+
+    python -m jsonschematypes.benchmarks.validation
+"""
+import sys
+from timeit import default_timer
+
+
+def measure(func, number):
+    """
+    Return the mean wall-clock time (in seconds) of calling `func` `number` times.
+    """
+    start = default_timer()
+    for _ in range(number):
+        func()
+    return (default_timer() - start) / number
+
+
+def report(name, seconds, fileobj=None):
+    """
+    Write a single benchmark result as microseconds per call.
+    """
+    fileobj = fileobj or sys.stdout
+    fileobj.write("{:<48} {:>12.2f} us/call\n".format(name, seconds * 1e6))
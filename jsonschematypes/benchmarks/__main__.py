@@ -0,0 +1,4 @@
+from jsonschematypes.benchmarks.runner import main
+
+
+main()
@@ -0,0 +1,88 @@
+"""
+Nested attribute and array item read latency for generated classes.
+"""
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.registry import Registry
+
+
+ADDRESS_ID = "http://x.y.z/bar/address"
+ORDER_ID = "http://x.y.z/order"
+ADDRESSES_ID = "http://x.y.z/bar/addresses"
+
+SCHEMAS = [
+    {
+        "id": ADDRESS_ID,
+        "properties": {
+            "street": {"type": "string"},
+            "city": {"type": "string"},
+            "state": {"type": "string"},
+            "zip": {"type": "string"},
+            "country": {"type": "string"},
+        },
+    },
+    {
+        "id": ORDER_ID,
+        "properties": {
+            "address": {"$ref": ADDRESS_ID},
+            "total": {"type": "number"},
+        },
+    },
+    {
+        "id": ADDRESSES_ID,
+        "type": "array",
+        "items": {"$ref": ADDRESS_ID},
+    },
+]
+
+ORDER = dict(
+    address=dict(
+        street="1600 Pennsylvania Ave",
+        city="Washington",
+        state="DC",
+        zip="20500",
+        country="US",
+    ),
+    total=1.0,
+)
+
+
+def make_registry(store_converted=False):
+    registry = Registry(store_converted=store_converted)
+    for schema in SCHEMAS:
+        registry.register(schema)
+    return registry
+
+
+def main(number=100000):
+    registry = make_registry()
+    Order = registry.create_class(ORDER_ID)
+    order = Order(ORDER)
+
+    report(
+        "order.address.city (converted on each access)",
+        measure(lambda: order.address.city, number),
+    )
+
+    StoredOrder = make_registry(store_converted=True).create_class(ORDER_ID)
+    stored_order = StoredOrder(ORDER)
+
+    report(
+        "order.address.city (store_converted)",
+        measure(lambda: stored_order.address.city, number),
+    )
+    report(
+        "order['address']['city'] (raw dict)",
+        measure(lambda: ORDER["address"]["city"], number),
+    )
+
+    Addresses = registry.create_class(ADDRESSES_ID)
+    addresses = Addresses([ORDER["address"]] * 100)
+
+    report(
+        "[a.city for a in addresses] (100 items)",
+        measure(lambda: [address.city for address in addresses], number // 100),
+    )
+
+
+if __name__ == "__main__":
+    main()
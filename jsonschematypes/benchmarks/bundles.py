@@ -0,0 +1,112 @@
+"""
+Loading large schema bundles (tar.gz and tar): time and peak RSS.
+
+Each variant runs in a fresh child process so that peak RSS (as reported by
+`getrusage()`) reflects that variant alone.
+"""
+from contextlib import closing
+from gzip import GzipFile
+from io import BytesIO
+from json import dumps
+from multiprocessing import Pool
+from os.path import join
+import resource
+from shutil import rmtree
+import sys
+from tarfile import TarFile, TarInfo
+from tempfile import NamedTemporaryFile, mkdtemp
+from timeit import default_timer
+
+from jsonschematypes.files import iter_gzip, iter_schemas
+from jsonschematypes.registry import Registry
+
+
+def write_bundle(path, count, size, mode="w:gz"):
+    """
+    Write a tar.gz (or other tar) bundle of `count` schemas of roughly `size` bytes each.
+    """
+    with closing(TarFile.open(path, mode=mode)) as tarfile:
+        for index in range(count):
+            data = dumps({
+                "id": "http://x.y.z/bundle/schema{}".format(index),
+                "type": "object",
+                "description": "x" * size,
+                "properties": {
+                    "field{}".format(field): {"type": "string"}
+                    for field in range(10)
+                },
+            }).encode("utf-8")
+            tarinfo = TarInfo("schemas/schema{}.json".format(index))
+            tarinfo.size = len(data)
+            tarfile.addfile(tarinfo, BytesIO(data))
+
+
+def legacy_iter_gzip(filename, mime_types, codec):
+    """
+    Decompress to a temporary file and sniff it again (the previous implementation).
+    """
+    with GzipFile(filename, "r") as gzipfileobj:
+        with NamedTemporaryFile() as fileobj:
+            fileobj.write(gzipfileobj.read())
+            fileobj.flush()
+            for schema in iter_schemas(fileobj.name, mime_types, codec):
+                yield schema
+
+
+def max_rss():
+    """
+    Return this process's peak RSS in megabytes.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+
+
+def load(path, legacy=False, lazy=False, used=0):
+    """
+    Load a bundle and create classes for the first `used` schemas.
+    """
+    registry = Registry()
+    iter_func = legacy_iter_gzip if legacy else iter_gzip
+    registry.mime_types.update({
+        "application/gzip": iter_func,
+        "application/x-gzip": iter_func,
+    })
+    baseline = max_rss()
+    start = default_timer()
+    registry.load(path, lazy=lazy)
+    for index in range(used):
+        registry.create_class("http://x.y.z/bundle/schema{}".format(index))
+    return default_timer() - start, baseline, max_rss()
+
+
+def main(count=20000, size=10000, used=20):
+    directory = mkdtemp()
+    try:
+        compressed = join(directory, "bundle.tar.gz")
+        write_bundle(compressed, count, size)
+        uncompressed = join(directory, "bundle.tar")
+        write_bundle(uncompressed, count, size, mode="w")
+        for name, args in [
+            ("tar.gz, temp file (legacy)", (compressed, True)),
+            ("tar.gz, streaming", (compressed, False)),
+            ("tar", (uncompressed, False, False, used)),
+            ("tar, lazy", (uncompressed, False, True, used)),
+        ]:
+            pool = Pool(processes=1)
+            try:
+                seconds, baseline, peak = pool.apply(load, args)
+            finally:
+                pool.terminate()
+            sys.stdout.write("{:<56} {:>6.2f} s {:>8.1f} MB peak RSS ({:.1f} MB before)\n".format(
+                "Registry.load() {} ({} schemas)".format(name, count),
+                seconds,
+                peak,
+                baseline,
+            ))
+    finally:
+        rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
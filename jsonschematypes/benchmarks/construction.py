@@ -0,0 +1,70 @@
+"""
+Instance construction latency for generated object classes.
+"""
+import sys
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.model import Attribute
+from jsonschematypes.registry import Registry
+
+
+RECORD_ID = "http://x.y.z/record"
+
+# ~20 properties, a quarter of which have defaults
+SCHEMA = {
+    "id": RECORD_ID,
+    "type": "object",
+    "properties": {
+        "field{}".format(index): (
+            {"type": "string", "default": "value{}".format(index)}
+            if index % 4 == 0 else
+            {"type": "string"}
+        )
+        for index in range(20)
+    },
+}
+
+DATA = {
+    "field{}".format(index): "data{}".format(index)
+    for index in range(1, 20, 2)
+}
+
+
+def scanning_class(cls):
+    """
+    Create a subclass that inserts defaults the way `SchemaAwareDict.__init__` did
+    before defaults were precomputed (scanning attributes on every instantiation).
+    """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        for key, value in vars(cls).items():
+            if isinstance(value, Attribute):
+                if value.default is not None and not hasattr(self, key):
+                    setattr(self, key, value.default)
+
+    return type("Scanning" + cls.__name__, (cls, ), dict(__init__=__init__))
+
+
+def main(number=1000000):
+    registry = Registry()
+    registry.register(SCHEMA)
+
+    Record = registry.create_class(RECORD_ID)
+    ScanningRecord = scanning_class(Record)
+
+    report(
+        "Record(data) (scanning)",
+        measure(lambda: ScanningRecord(DATA), number // 10),
+    )
+    report(
+        "Record(data)",
+        measure(lambda: Record(DATA), number),
+    )
+    report(
+        "dict(data)",
+        measure(lambda: dict(DATA), number),
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
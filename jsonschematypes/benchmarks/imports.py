@@ -0,0 +1,91 @@
+"""
+Import latency of generated modules: scanning the registry versus a package index.
+"""
+from importlib import import_module
+import sys
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.modules import ModuleFinder, ModuleLoader
+from jsonschematypes.registry import Registry
+
+
+class ScanningModuleLoader(ModuleLoader):
+    """
+    Loader that scans the whole registry on every import (the previous implementation).
+    """
+    def load_module(self, fullname):
+        matching_classes = {
+            schema_id: self.factory.make_class(schema_id)
+            for schema_id in self.factory.registry.iter_ids()
+            if self.package_name_for(schema_id).startswith(fullname)
+        }
+        if not matching_classes:
+            raise ImportError(fullname)
+
+        module = self.make_module(fullname)
+        for schema_id, matching_class in matching_classes.items():
+            if self.package_name_for(schema_id) != fullname:
+                continue
+            if not hasattr(module, matching_class.__name__):
+                setattr(module, matching_class.__name__, matching_class)
+        return module
+
+
+class ScanningModuleFinder(ModuleFinder):
+    def find_module(self, fullname, path=None):
+        if fullname.split(".")[0] == self.basename:
+            return ScanningModuleLoader(
+                factory=self.factory,
+                basename=self.basename,
+                keep_uri_parts=self.keep_uri_parts,
+            )
+        return None
+
+
+def make_registry(count, packages):
+    """
+    Make a registry of `count` object schemas spread across `packages` packages.
+    """
+    registry = Registry()
+    for index in range(count):
+        registry.register({
+            "id": "http://x.y.z/package{}/schema{}".format(index % packages, index),
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+            },
+        })
+    return registry
+
+
+def unload(basename):
+    for name in list(sys.modules):
+        if name.split(".")[0] == basename:
+            del sys.modules[name]
+
+
+def main(count=5000, packages=100, number=20):
+    for name, finder_class in [
+        ("scanning registry (legacy)", ScanningModuleFinder),
+        ("package index", ModuleFinder),
+    ]:
+        basename = "benchmark_{}".format(finder_class.__name__.lower())
+        registry = make_registry(count, packages)
+        finder = finder_class(registry.factory, basename)
+        sys.meta_path.append(finder)
+        try:
+            def import_one():
+                unload(basename)
+                import_module("{}.package0".format(basename))
+
+            report(
+                "import one module: {} ({} schemas)".format(name, count),
+                measure(import_one, number),
+            )
+        finally:
+            sys.meta_path.remove(finder)
+            unload(basename)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,35 @@
+"""
+Registry load time for many schema files: serial versus parallel reading and parsing.
+"""
+from shutil import rmtree
+import sys
+from tempfile import mkdtemp
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.benchmarks.startup import write_schemas
+from jsonschematypes.registry import Registry
+
+
+def main(count=5000, number=3, workers=4):
+    directory = mkdtemp()
+    try:
+        filenames = write_schemas(directory, count)
+
+        report(
+            "Registry.load() ({} files)".format(count),
+            measure(lambda: Registry().load(*filenames), number),
+        )
+        report(
+            "Registry.load(workers={}) threads".format(workers),
+            measure(lambda: Registry().load(*filenames, workers=workers), number),
+        )
+        report(
+            "Registry.load(workers={}, processes=True)".format(workers),
+            measure(lambda: Registry().load(*filenames, workers=workers, processes=True), number),
+        )
+    finally:
+        rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,58 @@
+"""
+Full-registry class generation with and without cached names.
+"""
+import sys
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.factory import TypeFactory
+from jsonschematypes.registry import Registry
+
+
+def make_registry(count):
+    """
+    Make a registry of `count` object schemas that share common property names.
+    """
+    registry = Registry()
+    for index in range(count):
+        registry.register({
+            "id": "http://x.y.z/package{}/someSchema{}".format(index % 100, index),
+            "type": "object",
+            "properties": {
+                name: {"type": "string"}
+                for name in (
+                    "createdAt",
+                    "updatedAt",
+                    "displayName",
+                    "emailAddress",
+                    "phoneNumber",
+                    "postalCode",
+                    "countryCode",
+                    "fieldNumber{}".format(index % 50),
+                )
+            },
+        })
+    return registry
+
+
+def main(count=2000, number=5):
+    registry = make_registry(count)
+
+    for name, maxsize in [
+        ("uncached names", 0),
+        ("cached names", TypeFactory.NAME_CACHE_SIZE),
+    ]:
+        def create_classes():
+            factory = TypeFactory(registry, name_cache_size=maxsize)
+            for schema_id in registry:
+                factory.make_class(schema_id)
+                # names are looked up again, e.g. by imports and snapshots
+                factory.class_names[schema_id]
+
+        report(
+            "create all classes: {} ({} schemas)".format(name, count),
+            measure(create_classes, number),
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
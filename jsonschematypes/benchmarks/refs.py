@@ -0,0 +1,93 @@
+"""
+Validation latency for deeply referenced schemas: jsonschema's resolver versus the pointer index.
+"""
+import sys
+
+from jsonschema.validators import validator_for
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.registry import Registry, RegistryResolver, do_not_resolve
+
+
+ROOT_ID = "http://x.y.z/refs/root"
+
+
+def make_schema(depth, width):
+    """
+    Make a schema whose values are chains of `depth` refs through definitions and pointers.
+    """
+    definitions = {
+        "level{}".format(level): {
+            "id": "http://x.y.z/refs/level{}".format(level),
+            "type": "object",
+            "properties": {
+                "next": {"$ref": "root#/definitions/level{}".format(level + 1)},
+                "value": {"$ref": "root#/definitions/value/properties/x"},
+            },
+        }
+        for level in range(depth)
+    }
+    definitions["level{}".format(depth)] = {
+        "id": "http://x.y.z/refs/level{}".format(depth),
+        "type": "integer",
+    }
+    definitions["value"] = {
+        "id": "http://x.y.z/refs/value",
+        "properties": {"x": {"type": "string"}},
+    }
+    return {
+        "id": ROOT_ID,
+        "type": "object",
+        "properties": {
+            "item{}".format(index): {"$ref": "#/definitions/level0"}
+            for index in range(width)
+        },
+        "definitions": definitions,
+    }
+
+
+def make_instance(depth, width):
+    value = 1
+    for _ in range(depth):
+        value = {"next": value, "value": "x"}
+    return {"item{}".format(index): value for index in range(width)}
+
+
+class UnindexedResolver(RegistryResolver):
+    """
+    Resolver that walks JSON pointers on every ref (the previous implementation).
+    """
+    def resolve(self, ref):
+        return super(RegistryResolver, self).resolve(ref)
+
+
+def main(depth=10, width=10, number=200):
+    registry = Registry()
+    registry.register(make_schema(depth, width))
+    schema = registry[ROOT_ID]
+    instance = make_instance(depth, width)
+    handlers = dict(http=do_not_resolve, https=do_not_resolve)
+
+    for name, resolver_class in [
+        ("pointer walk (legacy)", UnindexedResolver),
+        ("pointer index", RegistryResolver),
+    ]:
+        def make_validator():
+            resolver = resolver_class.from_schema(schema, registry=registry, handlers=handlers)
+            return validator_for(schema)(schema, resolver=resolver)
+
+        # jsonschema caches resolved URLs per resolver, so cold resolvers show the
+        # cost of walking pointers
+        report(
+            "validate {} refs, cold: {}".format(depth * width * 2, name),
+            measure(lambda: make_validator().validate(instance), number),
+        )
+        validator = make_validator()
+        report(
+            "validate {} refs, warm: {}".format(depth * width * 2, name),
+            measure(lambda: validator.validate(instance), number),
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,233 @@
+"""
+Benchmark suite runner.
+
+Runs a fixed set of benchmarks against a synthetic registry and writes the results
+(mean wall-clock time and peak traced memory per benchmark) as JSON, so that runs
+can be compared between releases:
+
+    jsonschematypes-benchmark --count 500 --depth 3 --output results.json
+"""
+from argparse import ArgumentParser
+from collections import namedtuple
+from importlib import import_module
+from json import dump
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+import platform
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2
+    tracemalloc = None
+
+from jsonschematypes.benchmarks import measure
+from jsonschematypes.benchmarks.synthetic import (
+    list_id_for,
+    make_instance,
+    make_schemas,
+    schema_id_for,
+    write_json,
+    write_tar,
+)
+from jsonschematypes.factory import TypeFactory
+from jsonschematypes.registry import Registry
+
+
+Benchmark = namedtuple("Benchmark", ["name", "func", "scale"])
+
+
+class Suite(object):
+    """
+    Benchmarks over a synthetic registry, written to a temporary directory.
+    """
+    BASENAME = "jsonschematypes_benchmark"
+
+    def __init__(self, count=500, depth=3, fields=10, width=2):
+        self.count = count
+        self.depth = depth
+        self.fields = fields
+        self.width = width
+        self.schemas = make_schemas(count, depth, fields)
+        self.root_id = schema_id_for(0, depth)
+        self.instance = make_instance(self.schemas, width=width)
+
+    def __enter__(self):
+        self.directory = mkdtemp()
+        self.filenames = write_json(self.directory, self.schemas)
+        self.tar = write_tar(join(self.directory, "schemas.tar"), self.schemas)
+        self.tar_gz = write_tar(join(self.directory, "schemas.tar.gz"), self.schemas, "gz")
+
+        self.registry = Registry()
+        self.registry.load(*self.filenames)
+        self.registry.configure_imports(self.BASENAME)
+        self.root_class = self.registry.create_class(self.root_id)
+        self.root = self.root_class(self.instance)
+        self.data = self.root.dumps()
+        # convert nested values once, as a reader would
+        self.root.child.children[0]
+        return self
+
+    def __exit__(self, *args):
+        for finder in self.registry.finders:
+            sys.meta_path.remove(finder)
+        self.unload()
+        rmtree(self.directory)
+
+    def unload(self):
+        for name in list(sys.modules):
+            if name.split(".")[0] == self.BASENAME:
+                del sys.modules[name]
+
+    def make_classes(self):
+        factory = TypeFactory(self.registry)
+        for index in range(self.count):
+            factory.make_class(schema_id_for(index, self.depth))
+            factory.make_class(list_id_for(index, self.depth))
+
+    def import_module(self):
+        self.unload()
+        return import_module("{}.synthetic.chain0".format(self.BASENAME)).Schema0
+
+    def benchmarks(self):
+        """
+        Return the suite's benchmarks; `scale` multiplies the number of calls.
+        """
+        count = self.count
+        root, root_class = self.root, self.root_class
+        return [
+            Benchmark(
+                "Registry.load() ({} json files)".format(count),
+                lambda: Registry().load(*self.filenames),
+                1,
+            ),
+            Benchmark(
+                "Registry.load() (tar)",
+                lambda: Registry().load(self.tar),
+                1,
+            ),
+            Benchmark(
+                "Registry.load() (tar.gz)",
+                lambda: Registry().load(self.tar_gz),
+                1,
+            ),
+            Benchmark(
+                "TypeFactory.make_class() ({} schemas)".format(count * 2),
+                self.make_classes,
+                1,
+            ),
+            Benchmark(
+                "import hook (one generated module)",
+                self.import_module,
+                10,
+            ),
+            Benchmark(
+                "Attribute.__get__",
+                lambda: root.child.field0,
+                10000,
+            ),
+            Benchmark(
+                "SchemaAwareDict.__init__",
+                lambda: root_class(self.instance),
+                10000,
+            ),
+            Benchmark(
+                "SchemaAwareList.__getitem__",
+                lambda: root.children[0],
+                10000,
+            ),
+            Benchmark(
+                "Registry.validate() (depth {})".format(self.depth),
+                lambda: self.registry.validate(self.instance, self.root_id),
+                100,
+            ),
+            Benchmark(
+                "dumps()",
+                root.dumps,
+                100,
+            ),
+            Benchmark(
+                "loads()",
+                lambda: root_class.loads(self.data),
+                100,
+            ),
+        ]
+
+
+def peak_memory(func):
+    """
+    Return the peak memory (in bytes) traced while calling `func` once, if available.
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(count=500, depth=3, fields=10, width=2, number=5, pattern=None):
+    """
+    Run the benchmark suite, returning its parameters and results.
+
+    :param number: calls per benchmark (multiplied by each benchmark's scale)
+    :param pattern: only run benchmarks whose names contain this string
+    """
+    results = []
+    with Suite(count, depth, fields, width) as suite:
+        for benchmark in suite.benchmarks():
+            if pattern is not None and pattern not in benchmark.name:
+                continue
+            calls = number * benchmark.scale
+            results.append(dict(
+                name=benchmark.name,
+                number=calls,
+                seconds=measure(benchmark.func, calls),
+                peak_memory=peak_memory(benchmark.func),
+            ))
+    return dict(
+        parameters=dict(count=count, depth=depth, fields=fields, width=width, number=number),
+        python=platform.python_version(),
+        results=results,
+    )
+
+
+def main(args=None):
+    """
+    Console entry point.
+    """
+    parser = ArgumentParser(description="Run the jsonschematypes benchmark suite.")
+    parser.add_argument("--count", type=int, default=500,
+                        help="number of object schemas")
+    parser.add_argument("--depth", type=int, default=3,
+                        help="length of chains of refs between schemas")
+    parser.add_argument("--fields", type=int, default=10,
+                        help="number of string properties per schema")
+    parser.add_argument("--width", type=int, default=2,
+                        help="number of array items per level of the instance")
+    parser.add_argument("--number", type=int, default=5,
+                        help="calls per benchmark (scaled up for fast benchmarks)")
+    parser.add_argument("--filter", default=None,
+                        help="only run benchmarks whose names contain this string")
+    parser.add_argument("--output", default=None,
+                        help="file to write results to (default: standard output)")
+    options = parser.parse_args(args)
+
+    results = run(
+        count=options.count,
+        depth=options.depth,
+        fields=options.fields,
+        width=options.width,
+        number=options.number,
+        pattern=options.filter,
+    )
+    if options.output is None:
+        dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    else:
+        with open(options.output, "w") as fileobj:
+            dump(results, fileobj, indent=2, sort_keys=True)
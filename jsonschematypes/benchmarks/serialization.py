@@ -0,0 +1,74 @@
+"""
+Serialization and parsing latency of generated types, by JSON codec.
+"""
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.registry import Registry
+from jsonschematypes.serialization import CODECS
+
+
+ADDRESS_ID = "http://x.y.z/bar/address"
+ADDRESSES_ID = "http://x.y.z/bar/addresses"
+
+SCHEMAS = [
+    {
+        "id": ADDRESS_ID,
+        "properties": {
+            "street": {"type": "string"},
+            "city": {"type": "string"},
+            "state": {"type": "string"},
+            "zip": {"type": "string"},
+            "location": {"type": "array", "items": {"type": "number"}},
+        },
+    },
+    {
+        "id": ADDRESSES_ID,
+        "type": "array",
+        "items": {"$ref": ADDRESS_ID},
+    },
+]
+
+ADDRESS = dict(
+    street="1600 Pennsylvania Ave",
+    city="Washington",
+    state="DC",
+    zip="20500",
+    location=[38.8977, -77.0365],
+)
+
+
+def main(number=10000):
+    for name in sorted(CODECS):
+        try:
+            registry = Registry(codec=name)
+        except ImportError:
+            continue
+        for schema in SCHEMAS:
+            registry.register(schema)
+
+        Address = registry.create_class(ADDRESS_ID)
+        Addresses = registry.create_class(ADDRESSES_ID)
+
+        address = Address(ADDRESS)
+        addresses = Addresses([Address(ADDRESS) for _ in range(100)])
+        address_data, addresses_data = address.dumps(), addresses.dumps()
+
+        report(
+            "{}: address.dumps()".format(name),
+            measure(address.dumps, number),
+        )
+        report(
+            "{}: Address.loads()".format(name),
+            measure(lambda: Address.loads(address_data), number),
+        )
+        report(
+            "{}: addresses.dumps() (100 items)".format(name),
+            measure(addresses.dumps, number // 100),
+        )
+        report(
+            "{}: Addresses.loads() (100 items)".format(name),
+            measure(lambda: Addresses.loads(addresses_data), number // 100),
+        )
+
+
+if __name__ == "__main__":
+    main()
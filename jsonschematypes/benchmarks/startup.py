@@ -0,0 +1,71 @@
+"""
+Registry startup time: loading schema files versus loading a snapshot.
+"""
+from json import dump
+from os.path import join
+from shutil import rmtree
+import sys
+from tempfile import mkdtemp
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.registry import Registry
+
+
+def write_schemas(directory, count):
+    """
+    Write `count` schema files (each referencing the previous one) to a directory.
+    """
+    filenames = []
+    for index in range(count):
+        schema = {
+            "id": "http://x.y.z/schemas/schema{}".format(index),
+            "type": "object",
+            "properties": {
+                "field{}".format(field): {"type": "string"}
+                for field in range(10)
+            },
+            "definitions": {
+                "nested": {
+                    "id": "http://x.y.z/schemas/nested{}".format(index),
+                    "type": "object",
+                },
+            },
+        }
+        if index:
+            schema["properties"]["previous"] = {
+                "$ref": "http://x.y.z/schemas/schema{}".format(index - 1),
+            }
+        filename = join(directory, "schema{}.json".format(index))
+        with open(filename, "w") as fileobj:
+            dump(schema, fileobj)
+        filenames.append(filename)
+    return filenames
+
+
+def main(count=500, number=5):
+    directory = mkdtemp()
+    try:
+        filenames = write_schemas(directory, count)
+        snapshot = join(directory, "registry.snapshot")
+        registry = Registry()
+        registry.load(*filenames)
+        registry.save_snapshot(snapshot)
+
+        report(
+            "Registry.load() ({} files)".format(count),
+            measure(lambda: Registry().load(*filenames), number),
+        )
+        report(
+            "Registry.from_snapshot() ({} files)".format(count),
+            measure(lambda: Registry.from_snapshot(snapshot), number),
+        )
+        report(
+            "Registry.from_snapshot(check=False)",
+            measure(lambda: Registry.from_snapshot(snapshot, check=False), number),
+        )
+    finally:
+        rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,99 @@
+"""
+Synthetic registries of configurable size and depth.
+
+Schemas are arranged in chains of `depth` schemas (one package per chain); each
+schema has `fields` string properties, defines an array type of itself and refers
+to the next schema in its chain both directly (`child`) and through its array
+type (`children`).
+"""
+from contextlib import closing
+from io import BytesIO
+from json import dumps
+from os.path import join
+import tarfile
+import time
+
+
+BASE_URI = "http://x.y.z/synthetic"
+
+
+def schema_id_for(index, depth):
+    return "{}/chain{}/schema{}".format(BASE_URI, index // depth, index)
+
+
+def list_id_for(index, depth):
+    return schema_id_for(index, depth) + "s"
+
+
+def make_schemas(count, depth=3, fields=10):
+    """
+    Make `count` object schemas in chains of `depth` refs.
+    """
+    schemas = []
+    for index in range(count):
+        properties = {
+            "field{}".format(field): {"type": "string"}
+            for field in range(fields)
+        }
+        properties["number"] = {"type": "integer"}
+        if (index + 1) % depth and index + 1 < count:
+            properties["child"] = {"$ref": schema_id_for(index + 1, depth)}
+            properties["children"] = {"$ref": list_id_for(index + 1, depth)}
+        schema_id = schema_id_for(index, depth)
+        schemas.append({
+            "id": schema_id,
+            "type": "object",
+            "properties": properties,
+            "required": ["number"],
+            "definitions": {
+                "list": {
+                    "id": list_id_for(index, depth),
+                    "type": "array",
+                    "items": {"$ref": schema_id},
+                },
+            },
+        })
+    return schemas
+
+
+def make_instance(schemas, index=0, width=2):
+    """
+    Make a (valid) instance of a schema, following its chain of refs.
+    """
+    instance = {
+        name: "value {}".format(name)
+        for name, property_ in schemas[index]["properties"].items()
+        if property_.get("type") == "string"
+    }
+    instance["number"] = index
+    if "child" in schemas[index]["properties"]:
+        instance["child"] = make_instance(schemas, index + 1, width)
+        instance["children"] = [make_instance(schemas, index + 1, width) for _ in range(width)]
+    return instance
+
+
+def write_json(directory, schemas):
+    """
+    Write one file per schema, returning the filenames.
+    """
+    filenames = []
+    for index, schema in enumerate(schemas):
+        filename = join(directory, "schema{}.json".format(index))
+        with open(filename, "w") as fileobj:
+            fileobj.write(dumps(schema))
+        filenames.append(filename)
+    return filenames
+
+
+def write_tar(filename, schemas, compression=""):
+    """
+    Write schemas to a tar archive, compressed with e.g. `compression="gz"`.
+    """
+    with closing(tarfile.open(filename, "w:" + compression)) as archive:
+        for index, schema in enumerate(schemas):
+            data = dumps(schema).encode("utf-8")
+            tarinfo = tarfile.TarInfo("schema{}.json".format(index))
+            tarinfo.size = len(data)
+            tarinfo.mtime = time.time()
+            archive.addfile(tarinfo, BytesIO(data))
+    return filename
@@ -0,0 +1,73 @@
+"""
+Per-call validation latency, with and without validator caching and compilation.
+"""
+from jsonschema import RefResolver, validate
+
+from jsonschematypes.benchmarks import measure, report
+from jsonschematypes.registry import Registry, do_not_resolve
+
+
+NAME_ID = "http://x.y.z/foo/name"
+RECORD_ID = "http://x.y.z/record"
+
+SCHEMAS = [
+    {
+        "id": NAME_ID,
+        "properties": {
+            "first": {"type": "string"},
+            "middle": {"type": "string"},
+            "last": {"type": "string"},
+        },
+        "required": ["first", "last"],
+    },
+    {
+        "id": RECORD_ID,
+        "properties": {
+            "name": {"$ref": NAME_ID},
+            "age": {"type": "integer"},
+        },
+        "required": ["name"],
+    },
+]
+
+RECORD = dict(
+    name=dict(first="George", last="Washington"),
+    age=67,
+)
+
+
+def uncached_validate(registry, instance, schema_id):
+    """
+    Validate the way `Registry.validate` did before validators were cached.
+    """
+    schema = registry[schema_id]
+    resolver = RefResolver.from_schema(
+        schema,
+        store=registry,
+        handlers=dict(http=do_not_resolve, https=do_not_resolve),
+    )
+    return validate(instance, schema, resolver=resolver)
+
+
+def main(number=10000):
+    registry = Registry()
+    for schema in SCHEMAS:
+        registry.register(schema)
+
+    report(
+        "validate (uncached)",
+        measure(lambda: uncached_validate(registry, RECORD, RECORD_ID), number),
+    )
+    report(
+        "validate (cached)",
+        measure(lambda: registry.validate(RECORD, RECORD_ID), number),
+    )
+    compiled = registry.compile(RECORD_ID)
+    report(
+        "validate (compiled)",
+        measure(lambda: compiled.validate(RECORD), number),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Ahead-of-time generation of Python modules for schema-based types.
+
+`Registry.configure_imports()` creates classes (and modules) at import time in
+every process. Instead, `generate_modules()` writes ordinary Python packages that
+declare the same classes, mirroring the package layout of `ModuleLoader`:
+
+    $ jsonschematypes-codegen --output src --basename generated schemas/*.json
+
+Generated packages embed their schemas (in `<basename>/_registry.py`) and build
+their own `Registry` on import.
+"""
+from argparse import ArgumentParser
+from importlib import import_module
+from os import makedirs
+from os.path import exists, join
+from pprint import pformat
+import sys
+
+from jsonschematypes.factory import TypeFactory
+from jsonschematypes.model import (
+    DEFAULT,
+    DEFINITIONS,
+    DESCRIPTION,
+    ID,
+    ITEMS,
+    PROPERTIES,
+    REF,
+    REQUIRED,
+    TYPE,
+)
+from jsonschematypes.modules import ModuleLoader
+from jsonschematypes.names import is_identifier
+
+
+HEADER = '''"""
+Generated by jsonschematypes. Do not edit.
+"""
+'''
+
+REGISTRY_MODULE = HEADER + '''from jsonschematypes.codegen import GeneratedTypeFactory
+from jsonschematypes.registry import Registry
+
+
+# schemas in registration order (definitions are registered with their parents)
+SCHEMAS = {schemas}
+
+# module names by schema id
+MODULES = {modules}
+
+REGISTRY = Registry()
+REGISTRY.factory = GeneratedTypeFactory(REGISTRY, MODULES, store_converted={store_converted!r})
+for schema in SCHEMAS:
+    REGISTRY.register(schema)
+'''
+
+# generated classes are module globals too, so imports use private aliases
+PACKAGE_MODULE = HEADER + '''from jsonschematypes import model as _jst_model
+
+from {basename}._registry import REGISTRY as _jst_REGISTRY
+'''
+
+
+class GeneratedTypeFactory(TypeFactory):
+    """
+    Factory for generated packages: classes are imported rather than created.
+    """
+    def __init__(self, registry, modules, store_converted=False):
+        """
+        :param modules: a mapping of schema ids to names of modules that declare their classes
+        """
+        super(GeneratedTypeFactory, self).__init__(registry, store_converted=store_converted)
+        self.modules = modules
+
+    def make_class(self, schema_id, extra_bases=()):
+        if schema_id not in self.classes and schema_id in self.modules and not extra_bases:
+            # importing the module registers its classes
+            import_module(self.modules[schema_id])
+        return super(GeneratedTypeFactory, self).make_class(schema_id, extra_bases)
+
+
+class ModuleGenerator(object):
+    """
+    Generator that knows how to write Python packages for a registry's types.
+
+    Like `ModuleLoader`, schemas without legal package or class names are skipped;
+    the reasons are reported in `skipped`.
+    """
+    BASES = {
+        "array": "_jst_model.SchemaAwareList",
+        "object": "_jst_model.SchemaAwareDict",
+        "string": "_jst_model.SchemaAwareString",
+    }
+
+    def __init__(self, registry, basename="generated", keep_uri_parts=None):
+        """
+        :param registry: the registry of schemas to generate types for
+        :param basename: the name of the top-level package
+        :param keep_uri_parts: number of URI parts to keep when computing package names
+        """
+        self.registry = registry
+        self.basename = basename
+        self.factory = registry.factory
+        self.loader = ModuleLoader(
+            factory=registry.factory,
+            basename=basename,
+            keep_uri_parts=keep_uri_parts,
+        )
+        # reasons that schemas were skipped (by the last `generate()`), by schema id
+        self.skipped = {}
+
+    def iter_root_schemas(self):
+        """
+        Iterate through registered schemas that are not definitions of other schemas.
+        """
+        definitions = set()
+
+        def add_definitions(schema):
+            for definition in schema.get(DEFINITIONS, {}).values():
+                definitions.add(definition[ID])
+                add_definitions(definition)
+
+        for schema in self.registry.values():
+            add_definitions(schema)
+
+        for schema_id, schema in self.registry.items():
+            if schema_id not in definitions:
+                yield schema
+
+    def modules_for(self):
+        """
+        Map module names to the ids of the schemas with classes in each module.
+        """
+        modules = {self.basename: []}
+        self.skipped = {}
+        for schema_id, schema in self.registry.items():
+            if schema.get(TYPE, "object") not in self.BASES:
+                # primitives do not have generated classes
+                continue
+            try:
+                module_name = self.loader.package_names[schema_id]
+            except ValueError as error:
+                self.skipped[schema_id] = str(error)
+                continue
+            if not is_identifier(self.factory.class_names[schema_id]):
+                self.skipped[schema_id] = "Unable to generate class name for: {}".format(
+                    schema_id,
+                )
+                continue
+            modules.setdefault(module_name, []).append(schema_id)
+            # make sure that all parent packages exist
+            parts = module_name.split(".")
+            for index in range(1, len(parts)):
+                modules.setdefault(".".join(parts[:index]), [])
+        return modules
+
+    def generate(self, directory):
+        """
+        Write packages to a directory, returning the names of the generated modules.
+        """
+        modules = self.modules_for()
+        module_names = {
+            schema_id: module_name
+            for module_name, schema_ids in modules.items()
+            for schema_id in schema_ids
+        }
+
+        for module_name, schema_ids in sorted(modules.items()):
+            path = join(directory, *module_name.split("."))
+            if not exists(path):
+                makedirs(path)
+            with open(join(path, "__init__.py"), "w") as fileobj:
+                fileobj.write(self.package_source(schema_ids))
+
+        with open(join(directory, self.basename, "_registry.py"), "w") as fileobj:
+            fileobj.write(REGISTRY_MODULE.format(
+                schemas=pformat(list(self.iter_root_schemas())),
+                modules=pformat(module_names),
+                store_converted=self.factory.store_converted,
+            ))
+
+        return sorted(modules)
+
+    def package_source(self, schema_ids):
+        """
+        Generate the source of a module that declares classes for some schemas.
+        """
+        lines = [PACKAGE_MODULE.format(basename=self.basename)]
+        names = set()
+        for schema_id in schema_ids:
+            class_name = self.factory.class_names[schema_id]
+            # like `ModuleLoader`, the first class with a given name wins
+            variable = class_name
+            while variable in names:
+                variable = "_{}".format(variable)
+            names.add(variable)
+            lines.append(self.class_source(schema_id, class_name, variable))
+        return "\n".join(lines)
+
+    def class_source(self, schema_id, class_name, variable):
+        """
+        Generate the source of a class declaration for a schema.
+        """
+        schema = self.registry[schema_id]
+        schema_type = schema.get(TYPE, "object")
+
+        body = []
+        if DESCRIPTION in schema:
+            body.append("{!r}".format(schema[DESCRIPTION]))
+        body.append("_ID = {!r}".format(schema_id))
+        body.append("_REGISTRY = _jst_REGISTRY")
+        body.append("_SCHEMA = _jst_REGISTRY[_ID]")
+
+        extra = []
+        if schema_type == "object":
+            defaults, mutable_defaults = self.factory.defaults_for(schema)
+            body.append("_DEFAULTS = {!r}".format(defaults))
+            body.append("_MUTABLE_DEFAULTS = {!r}".format(mutable_defaults))
+            for property_name, property_ in schema.get(PROPERTIES, {}).items():
+                attribute_name = self.factory.attribute_names[property_name]
+                if is_identifier(attribute_name):
+                    body.append("{} = {}".format(
+                        attribute_name,
+                        self.attribute_source(schema, property_name, property_, "_SCHEMA"),
+                    ))
+                else:
+                    extra.append("setattr({}, {!r}, {})".format(
+                        variable,
+                        attribute_name,
+                        self.attribute_source(
+                            schema, property_name, property_, "{}._SCHEMA".format(variable),
+                        ),
+                    ))
+        elif schema_type == "array":
+            items = schema.get(ITEMS, {})
+            has_ref = isinstance(items, dict) and REF in items
+            body.append("_ITEM_CLASS = {}".format("_jst_model.UNRESOLVED" if has_ref else "None"))
+
+        lines = ["", "class {}({}):".format(variable, self.BASES[schema_type])]
+        lines.extend("    " + line for line in body)
+        lines.extend(["", ""])
+        lines.extend(extra)
+        if variable != class_name:
+            lines.append("{}.__name__ = {!r}".format(variable, class_name))
+        lines.append("_jst_REGISTRY.factory.classes[{}._ID] = {}".format(variable, variable))
+        return "\n".join(lines) + "\n"
+
+    def attribute_source(self, schema, property_name, property_, schema_expr):
+        """
+        Generate the source of an attribute declaration.
+
+        Refs are expanded (where possible) in advance.
+
+        :param schema_expr: an expression that evaluates to the declaring schema
+        """
+        ref = property_.get(REF)
+        if ref is not None:
+            expanded = self.registry.expand_ref(schema, ref)
+            if expanded in self.registry:
+                ref = expanded
+        return "_jst_model.Attribute(registry=_jst_REGISTRY, key={!r}, description={!r}, " \
+            "required={!r}, default={!r}, schema={}, ref={!r}, " \
+            "store=_jst_REGISTRY.factory.store_converted)".format(
+                property_name,
+                property_.get(DESCRIPTION),
+                property_name in schema.get(REQUIRED, []),
+                property_.get(DEFAULT),
+                schema_expr,
+                ref,
+            )
+
+
+def generate_modules(registry, directory, basename="generated", keep_uri_parts=None):
+    """
+    Write Python packages declaring classes for all of a registry's schemas.
+
+    See `ModuleGenerator`.
+    """
+    generator = ModuleGenerator(registry, basename=basename, keep_uri_parts=keep_uri_parts)
+    return generator.generate(directory)
+
+
+def main(args=None):
+    """
+    Console entry point.
+    """
+    from jsonschematypes.registry import Registry
+
+    parser = ArgumentParser(description="Generate Python modules for JSON schemas.")
+    parser.add_argument("filenames", nargs="+", metavar="FILE",
+                        help="schema files (or archives) to load")
+    parser.add_argument("--output", default=".",
+                        help="directory to write packages to")
+    parser.add_argument("--basename", default="generated",
+                        help="name of the top-level package")
+    parser.add_argument("--keep-uri-parts", type=int, default=None,
+                        help="number of URI parts to keep when computing package names")
+    parser.add_argument("--store-converted", action="store_true",
+                        help="store converted attribute values back into instances' data")
+    options = parser.parse_args(args)
+
+    registry = Registry(store_converted=options.store_converted)
+    registry.load(*options.filenames)
+    generator = ModuleGenerator(
+        registry,
+        basename=options.basename,
+        keep_uri_parts=options.keep_uri_parts,
+    )
+    generator.generate(options.output)
+    for schema_id, reason in sorted(generator.skipped.items()):
+        sys.stderr.write("Skipped {}: {}\n".format(schema_id, reason))
@@ -0,0 +1,319 @@
+"""
+Compile registered schemas into specialized Python validation functions.
+
+The generic `jsonschema` validators walk the schema and dispatch on every
+keyword for every instance. For a fixed set of registered schemas, it is
+cheaper to generate (and `exec`) Python source with the common checks
+(`type`, `enum`, `required`, `properties`, `additionalProperties`, `items`
+and `$ref`) inlined.
+
+Compiled functions only decide *whether* an instance is valid. When an
+instance fails, the generic validator is re-run so that the raised error
+is exactly the one that `Registry.validate()` would raise. Sub-schemas that
+use keywords the compiler does not understand are delegated to the generic
+validator.
+"""
+from numbers import Number
+
+from jsonschema import Draft4Validator
+from jsonschema.compat import str_types, urljoin
+
+from jsonschematypes.locks import KeyedLocks
+from jsonschematypes.model import (
+    ADDITIONAL_PROPERTIES,
+    DEFAULT,
+    DEFINITIONS,
+    DESCRIPTION,
+    ENUM,
+    ID,
+    ITEMS,
+    PROPERTIES,
+    REF,
+    REQUIRED,
+    SCHEMA,
+    TITLE,
+    TYPE,
+)
+
+
+# keywords that do not affect validation
+ANNOTATIONS = frozenset([DEFAULT, DEFINITIONS, DESCRIPTION, ID, SCHEMA, TITLE])
+
+# keywords that are compiled inline
+KEYWORDS = frozenset([ADDITIONAL_PROPERTIES, ENUM, ITEMS, PROPERTIES, REQUIRED, TYPE])
+
+# nesting depth after which sub-schemas are compiled into separate functions;
+# Python limits the number of statically nested blocks in a single function
+MAX_DEPTH = 8
+
+
+class CompiledValidator(object):
+    """
+    A compiled validation function for a single registered schema.
+    """
+    def __init__(self, schema_id, validator):
+        """
+        :param schema_id: the id of the compiled schema
+        :param validator: the generic validator used to report errors
+        """
+        self.schema_id = schema_id
+        self.validator = validator
+        self.source = None
+        self.check = None
+
+    def is_valid(self, instance):
+        return self.check(instance)
+
+    def validate(self, instance):
+        """
+        Validate an instance, raising the same errors as `Registry.validate()`.
+        """
+        if not self.check(instance):
+            self.validator.validate(instance)
+
+
+class ValidatorCompiler(object):
+    """
+    Compiler that knows how to turn registered schemas into Python functions.
+    """
+    def __init__(self, registry):
+        self.registry = registry
+        self.compiled = {}
+        self.locks = KeyedLocks()
+
+    def compile(self, schema_id, skip_http=True):
+        """
+        Return a (cached) compiled validator for a registered schema.
+        """
+        key = (schema_id, skip_http)
+        try:
+            return self.compiled[key]
+        except KeyError:
+            pass
+
+        with self.locks(key):
+            compiled = self.compiled.get(key)
+            if compiled is None:
+                compiled = self.build(schema_id, skip_http)
+        return compiled
+
+    def build(self, schema_id, skip_http):
+        key = (schema_id, skip_http)
+        validator = self.registry.validator_for(schema_id, skip_http=skip_http)
+
+        # cache before generating code so that cyclic refs (and other threads) find
+        # this unit; it checks instances with the validator until code is generated
+        compiled = CompiledValidator(schema_id, validator)
+        compiled.check = validator.is_valid
+        self.compiled[key] = compiled
+
+        if type(validator) is not Draft4Validator:
+            # only draft 4 semantics are inlined
+            return compiled
+
+        builder = FunctionBuilder(self, schema_id, validator, skip_http)
+        compiled.source, compiled.check = builder.build()
+        return compiled
+
+    def source_for(self, schema_id, skip_http=True):
+        """
+        Return the generated Python source for a registered schema.
+        """
+        return self.compile(schema_id, skip_http=skip_http).source
+
+
+class FunctionBuilder(object):
+    """
+    Generates the Python source for one compiled schema.
+    """
+    def __init__(self, compiler, schema_id, validator, skip_http):
+        self.compiler = compiler
+        self.registry = compiler.registry
+        self.schema_id = schema_id
+        self.schema = self.registry[schema_id]
+        self.validator = validator
+        self.skip_http = skip_http
+        self.namespace = dict(is_valid=validator.is_valid)
+        self.functions = []
+        self.variables = 0
+
+    def build(self):
+        """
+        Generate source and return it with the compiled check function.
+        """
+        name = self.function(self.schema, root=True)
+        source = "\n\n".join(self.functions) + "\n"
+        code = compile(source, "<jsonschematypes:{}>".format(self.schema_id), "exec")
+        exec(code, self.namespace)
+        return source, self.namespace[name]
+
+    def constant(self, value, prefix="const"):
+        """
+        Bind a value into the function namespace and return its name.
+        """
+        name = "{}_{}".format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def variable(self):
+        self.variables += 1
+        return "value_{}".format(self.variables)
+
+    def function(self, schema, root=False):
+        """
+        Generate a function that checks a (sub-)schema and return its name.
+        """
+        index = len(self.functions)
+        name = "check_{}".format(index)
+        # reserve the slot so that nested functions get distinct names
+        self.functions.append(None)
+        lines = ["def {}(value_0):".format(name)]
+        lines.extend(
+            "    " + line
+            for line in self.node(schema, "value_0", depth=0, root=root)
+        )
+        lines.append("    return True")
+        self.functions[index] = "\n".join(lines)
+        return name
+
+    def fallback(self, schema, var):
+        """
+        Delegate a sub-schema to the generic validator.
+        """
+        return ["if not is_valid({}, {}):".format(var, self.constant(schema, "schema")),
+                "    return False"]
+
+    def node(self, schema, var, depth, root=False):
+        """
+        Generate the lines that check `var` against `schema`.
+        """
+        if not isinstance(schema, dict):
+            return self.fallback(schema, var)
+
+        if ID in schema and not root:
+            # nested ids change the resolution scope
+            return self.fallback(schema, var)
+
+        if REF in schema:
+            # draft 4 ignores all other keywords next to $ref
+            return self.ref(schema, var)
+
+        if any(key not in KEYWORDS and key not in ANNOTATIONS for key in schema):
+            return self.fallback(schema, var)
+
+        if depth > MAX_DEPTH:
+            return ["if not {}({}):".format(self.function(schema), var),
+                    "    return False"]
+
+        lines = []
+        if TYPE in schema:
+            lines.extend(self.type_(schema, var))
+        if ENUM in schema:
+            lines.extend([
+                "if {} not in {}:".format(var, self.constant(schema[ENUM], "enum")),
+                "    return False",
+            ])
+        if any(key in schema for key in (REQUIRED, PROPERTIES, ADDITIONAL_PROPERTIES)):
+            lines.extend(self.object_(schema, var, depth))
+        if ITEMS in schema:
+            lines.extend(self.array(schema, var, depth))
+        return lines
+
+    def ref(self, schema, var):
+        """
+        Check a `$ref` by calling the compiled function for a registered schema.
+        """
+        subschema = self.registry.pointers.get(urljoin(self.schema_id, schema[REF]))
+        target = subschema.get(ID) if isinstance(subschema, dict) else None
+
+        if target is None or target not in self.registry or self.registry[target] is not subschema:
+            # not a registered schema (e.g. an anonymous sub-schema or a nested id)
+            return self.fallback(schema, var)
+
+        compiled = self.compiler.compile(target, skip_http=self.skip_http)
+        return ["if not {}.check({}):".format(self.constant(compiled, "ref"), var),
+                "    return False"]
+
+    def type_(self, schema, var):
+        types = schema[TYPE]
+        if not isinstance(types, list):
+            types = [types]
+
+        conditions = []
+        for type_ in types:
+            if not isinstance(type_, str_types) or type_ not in self.validator.DEFAULT_TYPES:
+                # unknown types (and draft 3 schema types) are left to the validator
+                return self.fallback(schema, var)
+            pytypes = self.validator.DEFAULT_TYPES[type_]
+            if not isinstance(pytypes, tuple):
+                pytypes = (pytypes, )
+            condition = "isinstance({}, {})".format(var, self.constant(pytypes, "types"))
+            if bool not in pytypes and any(issubclass(pytype, Number) for pytype in pytypes):
+                # bool inherits from int, but is not a JSON number
+                condition = "({} and not isinstance({}, bool))".format(condition, var)
+            conditions.append(condition)
+
+        return ["if not ({}):".format(" or ".join(conditions)),
+                "    return False"]
+
+    def object_(self, schema, var, depth):
+        properties = schema.get(PROPERTIES, {})
+        additional = schema.get(ADDITIONAL_PROPERTIES, True)
+
+        if not isinstance(properties, dict) or not isinstance(additional, (bool, dict)):
+            return self.fallback(schema, var)
+
+        body = []
+        for property_name in schema.get(REQUIRED, []):
+            body.extend([
+                "if {!r} not in {}:".format(property_name, var),
+                "    return False",
+            ])
+
+        for property_name, property_ in properties.items():
+            value = self.variable()
+            lines = self.node(property_, value, depth + 1)
+            if lines:
+                body.append("if {!r} in {}:".format(property_name, var))
+                body.append("    {} = {}[{!r}]".format(value, var, property_name))
+                body.extend("    " + line for line in lines)
+
+        if additional is not True:
+            key = self.variable()
+            names = self.constant(frozenset(properties), "names")
+            if additional is False:
+                lines = ["return False"]
+            else:
+                value = self.variable()
+                lines = ["{} = {}[{}]".format(value, var, key)]
+                lines.extend(self.node(additional, value, depth + 2))
+            body.append("for {} in {}:".format(key, var))
+            body.append("    if {} not in {}:".format(key, names))
+            body.extend("        " + line for line in lines)
+
+        if not body:
+            return []
+
+        object_types = self.constant(self.validator.DEFAULT_TYPES["object"], "types")
+        lines = ["if isinstance({}, {}):".format(var, object_types)]
+        lines.extend("    " + line for line in body)
+        return lines
+
+    def array(self, schema, var, depth):
+        items = schema[ITEMS]
+        if not isinstance(items, dict):
+            # tuple validation is left to the validator
+            return self.fallback(schema, var)
+
+        value = self.variable()
+        lines = self.node(items, value, depth + 2)
+        if not lines:
+            return []
+
+        array_types = self.constant(self.validator.DEFAULT_TYPES["array"], "types")
+        result = [
+            "if isinstance({}, {}):".format(var, array_types),
+            "    for {} in {}:".format(value, var),
+        ]
+        result.extend("        " + line for line in lines)
+        return result
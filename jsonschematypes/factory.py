@@ -10,13 +10,20 @@ from jsonschematypes.model import (
     Attribute,
     SchemaAwareDict,
     SchemaAwareList,
+    SchemaAwareRecord,
     SchemaAwareString,
     DEFAULT,
     DESCRIPTION,
+    ITEMS,
     PROPERTIES,
+    REF,
     REQUIRED,
     TYPE,
+    UNRESOLVED,
 )
+from jsonschematypes.locks import KeyedLocks
+from jsonschematypes.names import NameCache, is_identifier
+from jsonschematypes.stats import Captures
 
 
 if sys.version > '3':
@@ -47,13 +54,45 @@ class TypeFactory(object):
         "string": SchemaAwareString,
     }
 
-    def __init__(self, registry):
+    NAME_CACHE_SIZE = 4096
+
+    def __init__(self, registry, name_cache_size=None, stats=None, store_converted=False):
+        """
+        :param name_cache_size: the number of class and attribute names to cache
+                                (default: `NAME_CACHE_SIZE`); see `NameCache`
+        :param stats: record class generation; see `jsonschematypes.stats`
+        :param store_converted: store converted `$ref` attribute values back into
+                                instances' data; see `Attribute`
+        """
         self.registry = registry
+        self.store_converted = store_converted
+        # captures (see `Registry.capture()`) take precedence over the installed stats
+        self.captures = Captures()
+        self.installed_stats = stats
         self.classes = {}
+        self.record_classes = {}
+        # classes are created once, even when first requested by many threads
+        self.locks = KeyedLocks()
+        if name_cache_size is None:
+            name_cache_size = self.NAME_CACHE_SIZE
+        # class names by schema id (may be precomputed, e.g. from a snapshot)
+        self.class_names = NameCache(self.class_name_for, name_cache_size)
+        # attribute names by property name
+        self.attribute_names = NameCache(self.attribute_name_for, name_cache_size)
+
+    @property
+    def stats(self):
+        return self.captures.current(self.installed_stats)
+
+    @stats.setter
+    def stats(self, stats):
+        self.installed_stats = stats
 
     def class_name_for(self, schema_id):
         """
         Choose a class name for a given schema id.
+
+        Names are cached; look them up via `class_names`.
         """
         path = urlsplit(schema_id).path
         last = path.split("/")[-1].split(".", 1)[0]
@@ -62,30 +101,71 @@ class TypeFactory(object):
     def attribute_name_for(self, property_name):
         """
         Choose an attribute name for a property name.
+
+        Names are cached; look them up via `attribute_names`.
         """
         return str(underscore(property_name))
 
+    def defaults_for(self, schema):
+        """
+        Compute property defaults (by key) for an object schema.
+
+        Returns immutable and mutable defaults separately; the latter must be
+        copied for each instance.
+        """
+        defaults = {
+            property_name: property_[DEFAULT]
+            for property_name, property_ in schema.get(PROPERTIES, {}).items()
+            if property_.get(DEFAULT) is not None
+        }
+        return (
+            {
+                key: value for key, value in defaults.items()
+                if not isinstance(value, (dict, list))
+            },
+            {
+                key: value for key, value in defaults.items()
+                if isinstance(value, (dict, list))
+            },
+        )
+
     def make_class(self, schema_id, extra_bases=()):
         """
         Create a Python class that maps to the given schema.
 
         :param extra_bases: extra bases to add to generated types
         """
-        if schema_id in self.classes:
-            return self.classes[schema_id]
+        try:
+            cls = self.classes[schema_id]
+        except KeyError:
+            with self.locks(("class", schema_id)):
+                cls = self.classes.get(schema_id)
+                if cls is None:
+                    return self.build_class(schema_id, extra_bases)
 
+        if self.stats is not None:
+            self.stats.record_class(schema_id, hit=True)
+        return cls
+
+    def build_class(self, schema_id, extra_bases=()):
+        """
+        Create (and cache) a class; see `make_class()`.
+        """
         schema = self.registry[schema_id]
 
         schema_type = schema.get(TYPE, "object")
 
-        # skip type generation for primitives
+        # skip type generation for primitives (but cache them, so lookups stay lock-free)
         if schema_type in TypeFactory.PRIMITIVE_BASES:
-            return TypeFactory.PRIMITIVE_BASES.get(schema_type)
+            cls = self.classes[schema_id] = TypeFactory.PRIMITIVE_BASES[schema_type]
+            if self.stats is not None:
+                self.stats.record_class(schema_id, hit=False)
+            return cls
 
         base = TypeFactory.SCHEMA_AWARE_BASES[schema_type]
         bases = (base, ) + extra_bases
 
-        class_name = self.class_name_for(schema_id)
+        class_name = self.class_names[schema_id]
 
         # save backref and metadata within the class definition
         attributes = dict(
@@ -101,17 +181,105 @@ class TypeFactory(object):
         # inject attributes for each property
         if schema_type == "object":
             attributes.update({
-                self.attribute_name_for(property_name): Attribute(
+                self.attribute_names[property_name]: Attribute(
                     registry=self.registry,
                     key=property_name,
                     description=property_.get(DESCRIPTION),
                     required=property_name in schema.get(REQUIRED, []),
                     default=property_.get(DEFAULT),
+                    schema=schema,
+                    ref=property_.get(REF),
+                    store=self.store_converted,
                 )
                 for property_name, property_ in schema.get(PROPERTIES, {}).items()
             })
 
+            # precompute defaults so that instantiation need not inspect attributes
+            attributes["_DEFAULTS"], attributes["_MUTABLE_DEFAULTS"] = self.defaults_for(schema)
+
+        # resolve the class of array items lazily (schemas may be cyclic)
+        if schema_type == "array":
+            items = schema.get(ITEMS, {})
+            has_ref = isinstance(items, dict) and REF in items
+            attributes["_ITEM_CLASS"] = UNRESOLVED if has_ref else None
+
         # create the class
         cls = type(class_name, bases, attributes)
         self.classes[schema_id] = cls
+        if self.stats is not None:
+            self.stats.record_class(schema_id, hit=False)
+        return cls
+
+    def make_record_class(self, schema_id, extra_bases=()):
+        """
+        Create a compact, `__slots__`-based Python class that maps to the given schema.
+
+        Record classes store declared properties in slots instead of a dictionary;
+        see `SchemaAwareRecord`. Schemas for types other than objects use `make_class()`.
+
+        :param extra_bases: extra bases to add to generated types; these must not
+                            add instance dictionaries (i.e. must define `__slots__`)
+        """
+        try:
+            cls = self.record_classes[schema_id]
+        except KeyError:
+            with self.locks(("record", schema_id)):
+                cls = self.record_classes.get(schema_id)
+                if cls is None:
+                    return self.build_record_class(schema_id, extra_bases)
+
+        if self.stats is not None:
+            self.stats.record_class(schema_id, hit=True)
+        return cls
+
+    def build_record_class(self, schema_id, extra_bases=()):
+        """
+        Create (and cache) a record class; see `make_record_class()`.
+        """
+        schema = self.registry[schema_id]
+
+        if schema.get(TYPE, "object") != "object":
+            return self.make_class(schema_id, extra_bases)
+
+        class_name = self.class_names[schema_id]
+        properties = schema.get(PROPERTIES, {})
+
+        # save backref and metadata within the class definition
+        attributes = dict(
+            _ID=schema_id,
+            _REGISTRY=self.registry,
+            _SCHEMA=schema,
+            _REFS={
+                property_name: property_[REF]
+                for property_name, property_ in properties.items()
+                if REF in property_
+            },
+            _REF_CLASSES=UNRESOLVED,
+        )
+        attributes["_DEFAULTS"], attributes["_MUTABLE_DEFAULTS"] = self.defaults_for(schema)
+
+        # properties whose attribute names are not legal, unique slot names are
+        # kept in the (additional) dictionary instead
+        taken = set(dir(SchemaAwareRecord)) | set(attributes)
+        fields = []
+        for property_name in properties:
+            name = self.attribute_names[property_name]
+            if is_identifier(name) and not name.startswith("__") and name not in taken:
+                taken.add(name)
+                fields.append((name, property_name))
+        attributes.update(
+            __slots__=tuple(name for name, _ in fields),
+            _FIELDS=tuple(fields),
+            _ATTRIBUTES={key: name for name, key in fields},
+        )
+
+        # include class level doc string if available
+        if DESCRIPTION in schema:
+            attributes["__doc__"] = schema[DESCRIPTION]
+
+        # create the class
+        cls = type(class_name, (SchemaAwareRecord, ) + extra_bases, attributes)
+        self.record_classes[schema_id] = cls
+        if self.stats is not None:
+            self.stats.record_class(schema_id, hit=False)
         return cls
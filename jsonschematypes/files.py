@@ -4,53 +4,216 @@ Schema loading functions from various kinds of files.
 The `Registry` loads schemas based on file paths. To support
 various kinds of files (especially tar+gz), it delegates to
 different schmea loading functions based on the file mime type.
+
+Mime types are detected from content signatures and file extensions;
+libmagic (`python-magic`) is only used, if installed, for anything else.
 """
 from contextlib import closing
+from functools import partial
 from gzip import GzipFile
-from json import load, loads
-from tarfile import TarFile
-from tempfile import NamedTemporaryFile
+from inspect import ismethod
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from os.path import splitext
+from tarfile import TarError, TarFile
+
+try:
+    from inspect import getfullargspec
+except ImportError:
+    # python 2
+    from inspect import getargspec as getfullargspec
+
+from jsonschematypes.serialization import DEFAULT_CODEC
+
+
+GZIP = "application/gzip"
+JSON = "application/json"
+TAR = "application/x-tar"
+UNKNOWN = "application/octet-stream"
+
+# mime types by file extension
+EXTENSIONS = {
+    ".gz": GZIP,
+    ".json": JSON,
+    ".tar": TAR,
+    ".tgz": GZIP,
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# tar archives are identified by a magic string within their first (512 byte) header
+TAR_HEADER_SIZE = 512
+TAR_MAGIC = b"ustar"
+TAR_MAGIC_OFFSET = 257
+
+
+class SchemaLoadError(ValueError):
+    """
+    A file's schemas could not be parsed.
+    """
+    def __init__(self, filename, message):
+        super(SchemaLoadError, self).__init__(filename, message)
+        self.filename = filename
+        self.message = message
 
-import magic
+    def __str__(self):
+        return "Unable to load schemas from: {}: {}".format(self.filename, self.message)
 
 
-def iter_file(filename, mime_types):
+def is_tar_header(data):
+    """
+    Does data begin with a (POSIX or GNU) tar header?
+    """
+    return data[TAR_MAGIC_OFFSET:TAR_MAGIC_OFFSET + len(TAR_MAGIC)] == TAR_MAGIC
+
+
+def iter_file(filename, mime_types, codec=DEFAULT_CODEC):
     """
     Iterate through (the single) schema in a JSON file.
     """
-    with closing(open(filename)) as fileobj:
-        yield load(fileobj)
+    with closing(open(filename, "rb")) as fileobj:
+        yield codec.loads(fileobj.read())
 
 
-def iter_gzip(filename, mime_types):
+def iter_gzip(filename, mime_types, codec=DEFAULT_CODEC):
     """
     Iterate through all schemas in a gzip file.
+
+    The decompressed content is sniffed (rather than written out and passed to
+    libmagic again): tar archives are streamed member by member; anything else is
+    parsed as a single schema.
     """
     with GzipFile(filename, "r") as gzipfileobj:
-        with NamedTemporaryFile() as fileobj:
-            fileobj.write(gzipfileobj.read())
-            fileobj.flush()
-            for schema in iter_schemas(fileobj.name, mime_types):
-                yield schema
+        header = gzipfileobj.read(TAR_HEADER_SIZE)
+        if not is_tar_header(header):
+            yield codec.loads(header + gzipfileobj.read())
+            return
+
+        # rewinding re-reads only the first block
+        gzipfileobj.seek(0)
+        for schema in iter_tar_stream(gzipfileobj, codec):
+            yield schema
 
 
-def iter_tar(filename, mime_types):
+def iter_tar(filename, mime_types, codec=DEFAULT_CODEC):
     """
     Iterate through all schemas in a tar file.
     """
-    with closing(TarFile.open(filename)) as tarfile:
+    with closing(open(filename, "rb")) as fileobj:
+        for schema in iter_tar_stream(fileobj, codec):
+            yield schema
+
+
+def iter_tar_stream(fileobj, codec=DEFAULT_CODEC):
+    """
+    Iterate through all schemas in a tar stream, yielding each as its member is read.
+
+    The stream is read sequentially (and never seeked), so memory use is bounded
+    by the largest member.
+    """
+    with closing(TarFile.open(fileobj=fileobj, mode="r|")) as tarfile:
         for tarinfo in tarfile:
             if tarinfo.isreg():
-                fileobj = tarfile.extractfile(tarinfo)
-                data = fileobj.read()
-                yield loads(data.decode())
+                yield codec.loads(tarfile.extractfile(tarinfo).read())
+
+
+def detect_mime_type(filename):
+    """
+    Detect the mime type of a file.
+
+    Checks (in order) the file's first bytes for gzip, tar and JSON signatures,
+    the file's extension, and (if installed) libmagic.
+    """
+    with closing(open(filename, "rb")) as fileobj:
+        header = fileobj.read(TAR_HEADER_SIZE)
+
+    if header.startswith(GZIP_MAGIC):
+        return GZIP
+    if is_tar_header(header):
+        return TAR
+    if header.lstrip()[:1] in (b"{", b"["):
+        return JSON
+
+    extension = splitext(filename)[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+
+    try:
+        import magic
+    except ImportError:
+        return UNKNOWN
+    mime_type = magic.from_file(filename, mime=True)
+    return mime_type.decode() if isinstance(mime_type, bytes) else mime_type
+
+
+def takes_codec(func):
+    """
+    Does a schema loading function take a codec (as its third argument)?
+
+    Loading functions written for earlier versions take only `(filename, mime_types)`.
+    """
+    try:
+        spec = getfullargspec(func)
+    except TypeError:
+        # not introspectable (e.g. a builtin); assume the current signature
+        return True
+    args = len(spec.args) - (1 if ismethod(func) else 0)
+    return spec.varargs is not None or args >= 3
 
 
-def iter_schemas(filename, mime_types):
+def iter_schemas(filename, mime_types, codec=DEFAULT_CODEC, mime_type=None):
     """
     Iterate through all schemas in a file.
+
+    :param mime_types: a mapping of mime types to schema loading functions
+    :param codec: the JSON codec used to parse schemas
+    :param mime_type: the file's mime type (detected if omitted)
     """
-    mime_type = magic.from_file(filename, mime=type)
-    iter_func = mime_types.get(mime_type.decode(), iter_file)
-    for schema in iter_func(filename, mime_types):
+    mime_type = mime_type or detect_mime_type(filename)
+    iter_func = mime_types.get(mime_type, iter_file)
+    if takes_codec(iter_func):
+        schemas = iter_func(filename, mime_types, codec)
+    else:
+        schemas = iter_func(filename, mime_types)
+    for schema in schemas:
         yield schema
+
+
+def load_schemas(filename, mime_types, codec=DEFAULT_CODEC, mime_type=None):
+    """
+    Load all schemas in a file as a list.
+
+    Raises `SchemaLoadError` (naming the file) if the file cannot be read or parsed.
+    """
+    try:
+        return list(iter_schemas(filename, mime_types, codec, mime_type))
+    except (ValueError, TarError, EnvironmentError) as error:
+        if isinstance(error, SchemaLoadError):
+            raise
+        raise SchemaLoadError(filename, str(error))
+
+
+def iter_loaded_schemas(filenames, mime_types, codec=DEFAULT_CODEC, workers=None,
+                        processes=False, mime_type=None):
+    """
+    Iterate through the schemas of many files, as one list per file, in input order.
+
+    :param workers: read and parse files using a pool of this many workers
+    :param processes: use worker processes (rather than threads); mime type loading
+                      functions and the codec must then be picklable
+    :param mime_type: the mime type of all files (detected per file if omitted)
+    """
+    func = partial(load_schemas, mime_types=mime_types, codec=codec, mime_type=mime_type)
+    if not workers or len(filenames) < 2:
+        for filename in filenames:
+            yield func(filename)
+        return
+
+    pool = (Pool if processes else ThreadPool)(workers)
+    try:
+        # ordered results; batches amortize inter-process communication
+        chunksize = max(1, len(filenames) // (workers * 4))
+        for schemas in pool.imap(func, filenames, chunksize):
+            yield schemas
+    finally:
+        pool.terminate()
@@ -0,0 +1,256 @@
+"""
+Schema reference graph.
+
+The `Registry` maintains a graph of `$ref`s between registered schemas, so that
+unresolved refs, dependencies and dependents can be found without rescanning
+every schema.
+"""
+from jsonschema.compat import str_types, urldefrag, urljoin
+
+from jsonschematypes.model import DEFINITIONS, ID, ITEMS, REF
+
+
+# keywords whose values are subschemas
+SUBSCHEMA_KEYWORDS = ("additionalItems", "additionalProperties", "not")
+
+# keywords whose values are lists of subschemas
+SUBSCHEMA_LIST_KEYWORDS = ("allOf", "anyOf", "oneOf")
+
+# keywords whose values map names to subschemas
+SUBSCHEMA_MAP_KEYWORDS = ("dependencies", "patternProperties", "properties")
+
+
+def iter_refs(schema):
+    """
+    Iterate through all refs in a schema, including nested subschemas.
+
+    Definitions with ids are skipped; they are registered as schemas of their own.
+    """
+    for ref, _ in iter_scoped_refs(schema):
+        yield ref
+
+
+def iter_scoped_refs(schema, scope=""):
+    """
+    Iterate through (ref, resolution scope) for all refs in a schema.
+
+    Like jsonschema's resolver, subschemas with ids change the scope that the refs
+    within them are resolved against.
+    """
+    if not isinstance(schema, dict):
+        return
+    if isinstance(schema.get(ID), str_types):
+        scope = urljoin(scope, schema[ID])
+    if REF in schema:
+        yield schema[REF], scope
+
+    subschemas = [schema.get(keyword) for keyword in SUBSCHEMA_KEYWORDS]
+    for keyword in SUBSCHEMA_LIST_KEYWORDS:
+        subschemas.extend(schema.get(keyword, ()))
+    for keyword in SUBSCHEMA_MAP_KEYWORDS:
+        # dependencies may also be lists of property names
+        subschemas.extend(schema.get(keyword, {}).values())
+    items = schema.get(ITEMS)
+    subschemas.extend(items if isinstance(items, list) else [items])
+    subschemas.extend(
+        definition for definition in schema.get(DEFINITIONS, {}).values()
+        if isinstance(definition, dict) and ID not in definition
+    )
+
+    for subschema in subschemas:
+        for ref in iter_scoped_refs(subschema, scope):
+            yield ref
+
+
+class RefGraph(object):
+    """
+    A graph of refs between schemas, maintained incrementally.
+
+    Edges are between documents: refs are normalized to the ids of the schemas they
+    target (without fragments). Refs with fragments (JSON pointers) are also kept, so
+    that pointers into registered schemas can be checked.
+    """
+    def __init__(self, pointers=None):
+        """
+        :param pointers: a `PointerIndex` to check refs with JSON pointers against
+                         (otherwise, pointers into registered schemas always resolve)
+        """
+        self.pointers = pointers
+        # targets of each registered schema's refs, by schema id
+        self.refs = {}
+        # ids of schemas that ref a target, by target
+        self.dependents = {}
+        # targets that are not registered (but are ref-ed)
+        self.missing = set()
+        # (ref, expanded URL) pairs of each registered schema's refs, by schema id
+        self.urls = {}
+        # (schema id, ref, URL) of refs that do not resolve, by target
+        self.unresolved = {}
+
+    @classmethod
+    def from_refs(cls, urls, pointers=None):
+        """
+        Build a graph from the (ref, expanded URL) pairs of each schema's refs
+        (e.g. from a snapshot).
+        """
+        graph = cls(pointers)
+        for schema_id, refs in urls.items():
+            graph.add(schema_id, refs)
+        return graph
+
+    def document(self, url):
+        """
+        Return the document (schema id) part of a ref's URL.
+        """
+        return urldefrag(url)[0]
+
+    def resolves(self, target, url):
+        """
+        Return whether a ref's URL resolves (in its registered target).
+        """
+        if target not in self.refs:
+            return False
+        if url == target or self.pointers is None:
+            return True
+        return self.pointers.get(url, load=False) is not None
+
+    def add(self, schema_id, refs):
+        """
+        Add (or replace) a schema and its refs.
+
+        Only the schema's own refs and the refs to it are checked for resolution, so
+        the unresolved refs are kept up to date in time proportional to the change.
+
+        :param refs: (ref, expanded URL) pairs of the schema's refs
+        """
+        self.remove_refs(schema_id)
+        urls = self.urls[schema_id] = {(ref, url) for ref, url in refs}
+        targets = self.refs[schema_id] = {self.document(url) for _, url in urls}
+        self.missing.discard(schema_id)
+        for target in targets:
+            self.dependents.setdefault(target, set()).add(schema_id)
+            if target not in self.refs:
+                self.missing.add(target)
+
+        # the schema's pointers may have changed, so refs to it are checked again
+        self.unresolved.pop(schema_id, None)
+        for ref in self.iter_refs_to(schema_id):
+            self.check(ref)
+        for ref, url in urls:
+            target = self.document(url)
+            if target != schema_id:
+                self.check((schema_id, ref, url))
+
+    def check(self, ref):
+        """
+        Track whether a (schema id, ref, URL) resolves.
+        """
+        target = self.document(ref[2])
+        if self.resolves(target, ref[2]):
+            unresolved = self.unresolved.get(target)
+            if unresolved is not None:
+                unresolved.discard(ref)
+                if not unresolved:
+                    del self.unresolved[target]
+        else:
+            self.unresolved.setdefault(target, set()).add(ref)
+
+    def remove_refs(self, schema_id):
+        """
+        Remove a schema's refs (but not refs to it).
+        """
+        targets = self.refs.pop(schema_id, None)
+        if targets is None:
+            return False
+        for ref, url in self.urls.pop(schema_id):
+            target = self.document(url)
+            unresolved = self.unresolved.get(target)
+            if unresolved is not None:
+                unresolved.discard((schema_id, ref, url))
+                if not unresolved:
+                    del self.unresolved[target]
+        for target in targets:
+            dependents = self.dependents[target]
+            dependents.discard(schema_id)
+            if not dependents:
+                del self.dependents[target]
+                self.missing.discard(target)
+        return True
+
+    def remove(self, schema_id):
+        """
+        Remove a schema (refs to it become missing).
+        """
+        if not self.remove_refs(schema_id):
+            return
+        if schema_id in self.dependents:
+            self.missing.add(schema_id)
+            self.unresolved[schema_id] = set(self.iter_refs_to(schema_id))
+
+    def iter_refs_to(self, target):
+        """
+        Iterate through (schema id, ref, URL) of refs to a target document.
+        """
+        for schema_id in self.dependents.get(target, ()):
+            for ref, url in self.urls[schema_id]:
+                if self.document(url) == target:
+                    yield schema_id, ref, url
+
+    def __contains__(self, schema_id):
+        return schema_id in self.refs
+
+    def walk(self, schema_ids, edges, follow=None):
+        """
+        Return the ids of schemas reachable from any of the given schemas, including them.
+
+        :param follow: only walk on from (reached) schemas for which this returns true
+        """
+        found, pending = set(schema_ids), list(schema_ids)
+        while pending:
+            for other in edges.get(pending.pop(), ()):
+                if other not in found:
+                    found.add(other)
+                    if follow is None or follow(other):
+                        pending.append(other)
+        return found
+
+    def dependencies_of(self, schema_ids):
+        """
+        Return the ids of schemas that any of the given schemas (transitively) ref,
+        including the given schemas.
+        """
+        return self.walk(schema_ids, self.refs)
+
+    def dependents_of(self, schema_ids):
+        """
+        Return the ids of schemas that (transitively) ref any of the given schemas,
+        including the given schemas.
+        """
+        return self.walk(schema_ids, self.dependents)
+
+    def topological_order(self, schema_ids=None):
+        """
+        Order schemas (and their registered dependencies) so that dependencies come first.
+
+        Schemas in cycles are ordered arbitrarily relative to each other.
+        """
+        if schema_ids is None:
+            schema_ids = list(self.refs)
+        order, visited = [], set()
+        for root in schema_ids:
+            if root in visited or root not in self.refs:
+                continue
+            visited.add(root)
+            # iterative depth-first search; schemas are added after their dependencies
+            stack = [(root, iter(sorted(self.refs[root])))]
+            while stack:
+                schema_id, targets = stack[-1]
+                for target in targets:
+                    if target not in visited and target in self.refs:
+                        visited.add(target)
+                        stack.append((target, iter(sorted(self.refs[target]))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(schema_id)
+        return order
@@ -0,0 +1,42 @@
+"""
+Locking for once-only initialization of cached values.
+
+Caches (classes, validators, compiled validators, modules) are read without locks;
+a miss takes a lock for its key, checks the cache again and only then creates and
+publishes the value, so concurrent first accesses create a value exactly once
+without serializing unrelated keys.
+"""
+from contextlib import contextmanager
+from threading import Lock, RLock
+
+
+class KeyedLocks(object):
+    """
+    Re-entrant locks by key (e.g. schema id), created on demand.
+
+    A key's lock is discarded once no thread holds or waits for it.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        # [lock, number of holders and waiters] by key
+        self.locks = {}
+
+    @contextmanager
+    def __call__(self, key):
+        with self.lock:
+            entry = self.locks.get(key)
+            if entry is None:
+                entry = self.locks[key] = [RLock(), 0]
+            entry[1] += 1
+        entry[0].acquire()
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.locks[key]
+
+    def __len__(self):
+        return len(self.locks)
@@ -1,31 +1,52 @@
 """
 Model generation based on JSON schema definitions.
 """
-import json
+from copy import deepcopy
+
+from jsonschematypes.streams import NDJSON, iter_documents
 
 
 ID = u"id"
+ADDITIONAL_PROPERTIES = u"additionalProperties"
 DEFAULT = u"default"
 DEFINITIONS = u"definitions"
 DESCRIPTION = u"description"
+ENUM = u"enum"
 ITEMS = u"items"
 PROPERTIES = u"properties"
 REF = u"$ref"
 REQUIRED = u"required"
+SCHEMA = u"$schema"
+TITLE = u"title"
 TYPE = u"type"
 ARRAY = u"array"
 
 
+# marker for `$ref` classes that have not been resolved yet
+UNRESOLVED = object()
+
+
 class Attribute(object):
     """
     Descriptor for attribute references into a dictionary.
     """
-    def __init__(self, registry, key, description=None, required=False, default=None):
+    def __init__(self, registry, key, description=None, required=False, default=None,
+                 schema=None, ref=None, store=False):
+        """
+        :param schema: the schema that declares this attribute's property
+        :param ref: the property's `$ref`, if any
+        :param store: store converted values back into the underlying dictionary
+        """
         self.registry = registry
         self.key = key
         self.description = description
         self.required = required
         self.default = default
+        self.schema = schema
+        self.ref = ref
+        self.store = store
+        # the class for `ref` is resolved lazily (schemas may be cyclic)
+        self.ref_class = UNRESOLVED if ref is not None else None
 
         if description:
             self.__doc__ = "{} ({})".format(
@@ -38,24 +59,44 @@ class Attribute(object):
         Attribute-based access to underlying JSON data.
 
         Converts between Pythonic types and naming conventions and underlying raw data.
+
+        If `store` is set, converted values replace the raw data in the underlying
+        dictionary, so that conversion happens once and changes made through the
+        returned value persist. Otherwise, the underlying dictionary is left as is.
         """
         if instance is None:
             return self
         try:
             value = instance[self.key]
-
-            if isinstance(value, SchemaAware):
-                return value
-
-            ref = instance._SCHEMA.get(PROPERTIES, {}).get(self.key, {}).get(REF)
-            ref_class = instance._REGISTRY.create_class_for(instance._SCHEMA, ref)
-            return ref_class(value) if ref_class else value
         except KeyError:
             raise AttributeError("'{}' object has no attribute '{}'".format(
                 instance.__class__.__name__,
                 self.key,
             ))
 
+        if isinstance(value, SchemaAware):
+            return value
+
+        ref_class = self.ref_class
+        if ref_class is UNRESOLVED:
+            ref_class = self.resolve()
+        if ref_class is None:
+            return value
+
+        value = ref_class(value)
+        if self.store and isinstance(value, SchemaAware):
+            instance[self.key] = value
+        return value
+
+    def resolve(self):
+        """
+        Resolve (and remember) the class for this attribute's `$ref`.
+
+        Unresolvable refs are remembered as having no class.
+        """
+        self.ref_class = self.registry.create_class_for(self.schema, self.ref)
+        return self.ref_class
+
     def __set__(self, instance, value):
         instance[self.key] = value
 
@@ -77,6 +118,8 @@ class SchemaAware(object):
     JSON primitives (e.g. dict, list, float) so that existing JSON libraries
     "just work".
     """
+    __slots__ = ()
+
     def validate(self, skip_http=True):
         """
         Validate that this instance matches its schema.
@@ -89,19 +132,49 @@ class SchemaAware(object):
             skip_http=skip_http,
         )
 
+    @classmethod
+    def validate_many(cls, instances, skip_http=True, max_failures=None, collect_errors=True):
+        """
+        Validate many instances against this class's schema.
+
+        See `Registry.validate_many()`.
+        """
+        return cls._REGISTRY.validate_many(
+            instances,
+            cls._ID,
+            skip_http=skip_http,
+            max_failures=max_failures,
+            collect_errors=collect_errors,
+        )
+
     def dump(self, fileobj):
-        return json.dump(self, fileobj)
+        return self.__class__._REGISTRY.codec.dump(self, fileobj)
 
     def dumps(self):
-        return json.dumps(self)
+        return self.__class__._REGISTRY.codec.dumps(self)
 
     @classmethod
     def loads(cls, data):
-        return cls(json.loads(data))
+        return cls(cls._REGISTRY.codec.loads(data))
 
     @classmethod
     def load(cls, fileobj):
-        return cls(json.load(fileobj))
+        return cls(cls._REGISTRY.codec.load(fileobj))
+
+    @classmethod
+    def iter_load(cls, fileobj, format=NDJSON, validate=False, skip_http=True):
+        """
+        Iterate through instances loaded incrementally from a (large) stream.
+
+        Memory is bounded by the size of one instance; see `jsonschematypes.streams`.
+
+        :param format: "ndjson" (one instance per line) or "array" (a top-level array)
+        :param validate: validate each instance as it is loaded (see `Registry.validate()`)
+        """
+        for data in iter_documents(fileobj, format, codec=cls._REGISTRY.codec):
+            if validate:
+                cls._REGISTRY.validate(data, cls._ID, skip_http=skip_http)
+            yield cls(data)
 
 
 class SchemaAwareDict(dict, SchemaAware):
@@ -110,33 +183,117 @@ class SchemaAwareDict(dict, SchemaAware):
 
     Sets defaults based on attributes.
     """
+    # property defaults by key, precomputed per class
+    _DEFAULTS = {}
+    # property defaults that must be copied per instance (e.g. lists)
+    _MUTABLE_DEFAULTS = {}
+
     def __init__(self, *args, **kwargs):
         """
         Insert defaults into dictionary.
         """
         super(SchemaAwareDict, self).__init__(*args, **kwargs)
-        for key, value in vars(self.__class__).items():
-            if isinstance(value, Attribute):
-                if value.default is not None and not hasattr(self, key):
-                    setattr(self, key, value.default)
+        for key, default in self._DEFAULTS.items():
+            if key not in self:
+                self[key] = default
+        for key, default in self._MUTABLE_DEFAULTS.items():
+            if key not in self:
+                self[key] = deepcopy(default)
 
 
 class SchemaAwareList(list, SchemaAware):
     """
     Schema aware list type.
+
+    Item access (indexing, slicing, iteration, `pop()`) converts items to the type
+    referenced by `items`. Converted items replace the raw data in the list, so that
+    conversion happens once and changes made through the returned items persist.
     """
+    # the class for the `$ref` of `items`, resolved lazily
+    _ITEM_CLASS = UNRESOLVED
+
     def __getitem__(self, index):
         """
         Override item access to convert types.
         """
+        if isinstance(index, slice):
+            for item_index in range(*index.indices(len(self))):
+                self.__getitem__(item_index)
+            return self.__class__(super(SchemaAwareList, self).__getitem__(index))
+
         value = super(SchemaAwareList, self).__getitem__(index)
 
         if isinstance(value, SchemaAware):
             return value
 
-        ref = self._SCHEMA.get(ITEMS, {}).get(REF)
-        ref_class = self._REGISTRY.create_class_for(self._SCHEMA, ref)
-        return ref_class(value) if ref_class else value
+        item_class = self._ITEM_CLASS
+        if item_class is UNRESOLVED:
+            item_class = self.__class__.resolve_item_class()
+        if item_class is None:
+            return value
+
+        value = item_class(value)
+        if isinstance(value, SchemaAware):
+            super(SchemaAwareList, self).__setitem__(index, value)
+        return value
+
+    def __getslice__(self, start, stop):
+        # Python 2 only
+        return self.__getitem__(slice(start, stop))
+
+    def __iter__(self):
+        return self.typed_items()
+
+    def __reversed__(self):
+        for index in reversed(range(len(self))):
+            yield self[index]
+
+    def pop(self, *args):
+        value = super(SchemaAwareList, self).pop(*args)
+
+        if isinstance(value, SchemaAware):
+            return value
+
+        item_class = self._ITEM_CLASS
+        if item_class is UNRESOLVED:
+            item_class = self.__class__.resolve_item_class()
+        return item_class(value) if item_class is not None else value
+
+    def typed_items(self):
+        """
+        Iterate through converted items.
+
+        The item class is resolved once for the whole pass.
+        """
+        item_class = self._ITEM_CLASS
+        if item_class is UNRESOLVED:
+            item_class = self.__class__.resolve_item_class()
+
+        iterator = super(SchemaAwareList, self).__iter__()
+        if item_class is None:
+            for value in iterator:
+                yield value
+            return
+
+        setitem = super(SchemaAwareList, self).__setitem__
+        for index, value in enumerate(iterator):
+            if not isinstance(value, SchemaAware):
+                value = item_class(value)
+                if isinstance(value, SchemaAware):
+                    setitem(index, value)
+            yield value
+
+    @classmethod
+    def resolve_item_class(cls):
+        """
+        Resolve (and remember) the class for the `$ref` of `items`.
+
+        Unresolvable refs are remembered as having no class.
+        """
+        items = cls._SCHEMA.get(ITEMS, {})
+        ref = items.get(REF) if isinstance(items, dict) else None
+        cls._ITEM_CLASS = cls._REGISTRY.create_class_for(cls._SCHEMA, ref)
+        return cls._ITEM_CLASS
 
 
 class SchemaAwareString(str, SchemaAware):
@@ -146,3 +303,166 @@ class SchemaAwareString(str, SchemaAware):
     Especially useful for enumeration validation.
     """
     pass
+
+
+class SchemaAwareRecord(SchemaAware):
+    """
+    Schema aware compact record type.
+
+    Records store declared properties in `__slots__` (one per property, named
+    by `TypeFactory.attribute_name_for()`), which uses much less memory than a
+    dictionary. Unset properties are absent (and raise `AttributeError`).
+    Undeclared (additional) properties, and declared properties whose attribute
+    names are not legal or not unique, fall back to a dictionary.
+
+    Records are not JSON primitives; use `to_dict()` and `from_dict()` to
+    convert to and from plain dictionaries.
+    """
+    __slots__ = ("_additional", )
+
+    # (attribute name, key) pairs for declared properties
+    _FIELDS = ()
+    # attribute names by key
+    _ATTRIBUTES = {}
+    # property defaults by key (see `SchemaAwareDict`)
+    _DEFAULTS = {}
+    _MUTABLE_DEFAULTS = {}
+    # property `$ref`s by key
+    _REFS = {}
+    # classes for `_REFS` by key, resolved lazily
+    _REF_CLASSES = UNRESOLVED
+
+    def __init__(self, *args, **kwargs):
+        """
+        Populate slots from a dictionary (and/or keyword arguments), inserting defaults.
+
+        Values of properties with a `$ref` are converted to the referenced type.
+        """
+        if kwargs or len(args) != 1 or not isinstance(args[0], dict):
+            data = dict(*args, **kwargs)
+        else:
+            data = args[0]
+
+        ref_classes = self._REF_CLASSES
+        if ref_classes is UNRESOLVED:
+            ref_classes = self.__class__.resolve_ref_classes()
+
+        attributes = self._ATTRIBUTES
+        additional = None
+        for key, value in data.items():
+            ref_class = ref_classes.get(key)
+            if ref_class is not None and isinstance(value, (dict, list)) and \
+                    not isinstance(value, SchemaAware):
+                value = ref_class(value)
+            name = attributes.get(key)
+            if name is None:
+                # undeclared properties (and declared properties without slots)
+                if additional is None:
+                    additional = {}
+                additional[key] = value
+                continue
+            setattr(self, name, value)
+
+        for key, default in self._DEFAULTS.items():
+            if key not in data:
+                if key in attributes:
+                    setattr(self, attributes[key], default)
+                else:
+                    additional = additional or {}
+                    additional[key] = default
+        for key, default in self._MUTABLE_DEFAULTS.items():
+            if key not in data:
+                if key in attributes:
+                    setattr(self, attributes[key], deepcopy(default))
+                else:
+                    additional = additional or {}
+                    additional[key] = deepcopy(default)
+        self._additional = additional
+
+    @classmethod
+    def resolve_ref_classes(cls):
+        """
+        Resolve (and remember) the classes for property `$ref`s.
+
+        Object refs resolve to record classes; unresolvable refs are skipped.
+        """
+        registry = cls._REGISTRY
+        ref_classes = {}
+        for key, ref in cls._REFS.items():
+            try:
+                ref_class = registry.create_record_class(registry.expand_ref(cls._SCHEMA, ref))
+            except KeyError:
+                continue
+            if isinstance(ref_class, type) and issubclass(ref_class, SchemaAware):
+                ref_classes[key] = ref_class
+        cls._REF_CLASSES = ref_classes
+        return ref_classes
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def to_dict(self):
+        """
+        Convert to a plain dictionary (recursively converting nested records).
+        """
+        data = {}
+        for name, key in self._FIELDS:
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
+            data[key] = to_plain(value)
+        if self._additional:
+            data.update(
+                (key, to_plain(value))
+                for key, value in self._additional.items()
+            )
+        return data
+
+    def validate(self, skip_http=True):
+        """
+        Validate that this instance matches its schema.
+
+        See `Registry.validate()`.
+        """
+        self.__class__._REGISTRY.validate(
+            self.to_dict(),
+            self.__class__._ID,
+            skip_http=skip_http,
+        )
+
+    def dump(self, fileobj):
+        return self.__class__._REGISTRY.codec.dump(self.to_dict(), fileobj)
+
+    def dumps(self):
+        return self.__class__._REGISTRY.codec.dumps(self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, SchemaAwareRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.to_dict())
+
+
+def to_plain(value):
+    """
+    Convert records (possibly nested within lists and dictionaries) to dictionaries.
+    """
+    if isinstance(value, SchemaAwareRecord):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    return value
@@ -3,13 +3,17 @@ Module finder and loader implementations.
 
 Supports auto-generation of classes on import.
 """
-from imp import new_module
+from threading import RLock
+from types import ModuleType
 import re
 import sys
 
 from inflection import underscore
 from jsonschema.compat import urlsplit
 
+from jsonschematypes.locks import KeyedLocks
+from jsonschematypes.names import NameCache
+
 
 class ModuleFinder(object):
     """
@@ -24,6 +28,12 @@ class ModuleFinder(object):
         self.factory = factory
         self.basename = basename
         self.keep_uri_parts = keep_uri_parts
+        # one loader (and package index) for all imports
+        self.loader = ModuleLoader(
+            factory=self.factory,
+            basename=self.basename,
+            keep_uri_parts=self.keep_uri_parts,
+        )
 
     def find_module(self, fullname, path=None):
         """
@@ -31,13 +41,162 @@ class ModuleFinder(object):
         """
         if fullname.split(".")[0] == self.basename:
             # only handle basename
-            return ModuleLoader(
-                factory=self.factory,
-                basename=self.basename,
-                keep_uri_parts=self.keep_uri_parts,
-            )
+            return self.loader
         return None
 
+    def add(self, schema_id):
+        """
+        Add a (newly registered) schema to the package index.
+        """
+        self.loader.index.add(schema_id)
+
+    def remove(self, schema_id):
+        """
+        Remove an (unregistered) schema from the package index.
+        """
+        self.loader.index.remove(schema_id)
+
+    def invalidate(self, classes):
+        """
+        Remove stale classes from already loaded modules.
+
+        :param classes: stale classes by schema id
+        """
+        for schema_id, cls in classes.items():
+            module_name = self.loader.index.package_name_for(schema_id)
+            module = sys.modules.get(module_name) if module_name else None
+            if module is not None and module.__dict__.get(cls.__name__) is cls:
+                # created again on next access
+                delattr(module, cls.__name__)
+
+
+class PackageIndex(object):
+    """
+    An index of schema ids by package name.
+
+    The index is built from the registry when first used and then kept up to date
+    as schemas are (un)registered.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+        self.built = False
+        # the index is built once (and updated) by one thread at a time
+        self.lock = RLock()
+        # ids of indexed schemas
+        self.schema_ids = set()
+        # package names by schema id (`None` for ids without legal package names)
+        self.package_names = {}
+        # schema ids (in registration order) by package name
+        self.modules = {}
+        # number of schemas in each package and its sub-packages, by package name
+        self.packages = {}
+        # schema ids by class name, by package name (for modules that were used)
+        self.class_names = {}
+
+    def build(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    for schema_id in self.loader.factory.registry.iter_ids():
+                        self.index(schema_id)
+                    self.built = True
+        return self
+
+    def package_name_for(self, schema_id):
+        """
+        Return the (cached) package name for a schema id, or `None` if it is illegal.
+        """
+        try:
+            return self.package_names[schema_id]
+        except KeyError:
+            pass
+        try:
+            package_name = self.loader.package_names[schema_id]
+        except ValueError:
+            package_name = None
+        self.package_names[schema_id] = package_name
+        return package_name
+
+    def iter_parents(self, package_name):
+        parts = package_name.split(".")
+        for index in range(1, len(parts) + 1):
+            yield ".".join(parts[:index])
+
+    def add(self, schema_id):
+        with self.lock:
+            if self.built:
+                self.index(schema_id)
+
+    def index(self, schema_id):
+        if schema_id in self.schema_ids:
+            # a new version of the schema may have another (primitive) class name
+            package_name = self.package_names[schema_id]
+            schema_ids = self.class_names.get(package_name)
+            if schema_ids is not None:
+                if schema_ids.get(self.loader.class_name_for(schema_id)) != schema_id:
+                    del self.class_names[package_name]
+            return
+        self.schema_ids.add(schema_id)
+        package_name = self.package_name_for(schema_id)
+        if package_name is None:
+            return
+        self.modules.setdefault(package_name, []).append(schema_id)
+        for parent in self.iter_parents(package_name):
+            self.packages[parent] = self.packages.get(parent, 0) + 1
+        schema_ids = self.class_names.get(package_name)
+        if schema_ids is not None:
+            schema_ids.setdefault(self.loader.class_name_for(schema_id), schema_id)
+
+    def remove(self, schema_id):
+        with self.lock:
+            self.unindex(schema_id)
+
+    def unindex(self, schema_id):
+        if schema_id not in self.schema_ids:
+            return
+        self.schema_ids.remove(schema_id)
+        package_name = self.package_names.pop(schema_id)
+        if package_name is None:
+            return
+        self.modules[package_name].remove(schema_id)
+        for parent in self.iter_parents(package_name):
+            self.packages[parent] -= 1
+            if not self.packages[parent]:
+                del self.packages[parent]
+        if schema_id in self.class_names.get(package_name, {}).values():
+            # another schema may have the same class name
+            del self.class_names[package_name]
+
+    def __contains__(self, package_name):
+        """
+        Does a package contain any schemas (directly or in sub-packages)?
+        """
+        return package_name in self.build().packages
+
+    def schema_ids_for(self, package_name):
+        """
+        Return the ids of schemas in a package (but not in its sub-packages).
+        """
+        return list(self.build().modules.get(package_name, ()))
+
+    def schema_ids_by_class_name(self, package_name):
+        """
+        Map class names to schema ids for a package; the first schema with a given name wins.
+
+        Maps are built when a package is first used and then kept up to date.
+        """
+        try:
+            return self.class_names[package_name]
+        except KeyError:
+            pass
+        with self.lock:
+            if package_name not in self.class_names:
+                schema_ids = {}
+                for schema_id in self.schema_ids_for(package_name):
+                    schema_ids.setdefault(self.loader.class_name_for(schema_id), schema_id)
+                self.class_names[package_name] = schema_ids
+            return self.class_names[package_name]
+
 
 class ModuleLoader(object):
     """
@@ -52,33 +211,40 @@ class ModuleLoader(object):
         self.factory = factory
         self.basename = basename
         self.keep_uri_parts = keep_uri_parts
+        # package names by schema id
+        self.package_names = NameCache(self.package_name_for, factory.NAME_CACHE_SIZE)
+        self.index = PackageIndex(self)
+        # modules are created once, even when first imported by many threads
+        self.locks = KeyedLocks()
 
     def load_module(self, fullname):
         """
         Load module matching full name.
-        """
-        matching_classes = {
-            schema_id: self.factory.make_class(schema_id)
-            for schema_id in self.factory.registry
-            if self.package_name_for(schema_id).startswith(fullname)
-        }
 
-        if not matching_classes:
+        Classes are created when first accessed; see `GeneratedModule`.
+        """
+        if fullname not in self.index:
             # no classes have this module as a parent
             raise ImportError(fullname)
 
-        module = self.make_module(fullname)
+        return self.make_module(fullname)
 
-        for schema_id, matching_class in matching_classes.items():
-            if self.package_name_for(schema_id) != fullname:
-                # class belongs to a different module
-                continue
-
-            class_name = matching_class.__name__
-            if not hasattr(module, class_name):
-                setattr(module, class_name, matching_class)
+    def schema_ids_by_class_name(self, fullname):
+        """
+        Map class names to schema ids for a module; the first schema with a given name wins.
+        """
+        return self.index.schema_ids_by_class_name(fullname)
 
-        return module
+    def class_name_for(self, schema_id):
+        """
+        Choose the name that a schema's class will have (without creating it or
+        loading a lazily indexed schema).
+        """
+        schema_type = self.factory.registry.type_for(schema_id)
+        primitive = self.factory.PRIMITIVE_BASES.get(schema_type)
+        if primitive is not None:
+            return primitive.__name__
+        return self.factory.class_names[schema_id]
 
     def is_legal_package_name(self, name):
         """
@@ -92,6 +258,8 @@ class ModuleLoader(object):
     def package_name_for(self, schema_id):
         """
         Choose a package name for a given schema id.
+
+        Names are cached; look them up via `package_names`.
         """
         path = urlsplit(schema_id).path
         uri_parts = path.split("/")
@@ -108,13 +276,40 @@ class ModuleLoader(object):
         """
         Create a new module.
         """
-        if fullname in sys.modules:
-            return sys.modules[fullname]
+        with self.locks(fullname):
+            if fullname in sys.modules:
+                return sys.modules[fullname]
+
+            module = GeneratedModule(fullname)
+            module.__file__ = "<jsonschematypes>"
+            module.__loader__ = self
+            module.__package__ = fullname
+            module.__path__ = []
+            sys.modules[fullname] = module
+            return module
+
+
+class GeneratedModule(ModuleType):
+    """
+    A module whose classes are created when first accessed.
+
+    `__all__` lists the module's class names (so that `import *` creates them).
+    """
+    def __getattr__(self, name):
+        # only called for attributes that are not (yet) in the module's dictionary
+        if name == "__all__":
+            return sorted(self.__loader__.schema_ids_by_class_name(self.__name__))
+        if name.startswith("__"):
+            raise AttributeError(name)
+        schema_id = self.__loader__.schema_ids_by_class_name(self.__name__).get(name)
+        if schema_id is None:
+            raise AttributeError(name)
+        # concurrent first accesses set the same (once-only) class
+        cls = self.__loader__.factory.make_class(schema_id)
+        setattr(self, name, cls)
+        return cls
 
-        module = new_module(fullname)
-        module.__file__ = "<jsonschematypes>"
-        module.__loader__ = self
-        module.__package__ = fullname
-        module.__path__ = []
-        sys.modules[fullname] = module
-        return module
+    def __dir__(self):
+        names = set(self.__dict__)
+        names.update(self.__loader__.schema_ids_by_class_name(self.__name__))
+        return sorted(names)
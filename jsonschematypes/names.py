@@ -0,0 +1,105 @@
+"""
+Bounded memoization for naming functions.
+
+Choosing class, attribute and package names (via `inflection` and `urlsplit`) is
+comparatively expensive and the same names are computed many times (e.g. common
+property names across schemas), so factories and loaders look names up through a
+`NameCache` that wraps their (overridable) naming methods.
+"""
+from collections import namedtuple, OrderedDict
+from keyword import iskeyword
+from threading import Lock
+import re
+
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def is_identifier(name):
+    """
+    Is name a legal (non-keyword) Python identifier?
+    """
+    return bool(IDENTIFIER.match(name)) and not iskeyword(name)
+
+
+class NameCache(object):
+    """
+    A least-recently-used cache of the results of a naming function.
+
+    Names may also be set explicitly (e.g. precomputed names from a snapshot);
+    names added via `update()` are kept in addition to (and are never evicted by)
+    the cache.
+
+    Caches are shared between threads; the naming function is called outside the
+    lock, so threads that miss at once may each compute the same name.
+    """
+    def __init__(self, func, maxsize=4096):
+        """
+        :param func: the naming function (of one argument)
+        :param maxsize: the maximum number of cached names; `None` for no limit
+                        and 0 to disable caching
+        """
+        self.func = func
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.data = OrderedDict()
+        # names added via `update()`
+        self.precomputed = {}
+        # guards the order of `data` (and the counts)
+        self.lock = Lock()
+
+    def __getitem__(self, key):
+        try:
+            value = self.precomputed[key]
+        except KeyError:
+            pass
+        else:
+            with self.lock:
+                self.hits += 1
+            return value
+        with self.lock:
+            try:
+                # move to the end (most recently used)
+                value = self.data.pop(key)
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.data[key] = value
+                return value
+        value = self.func(key)
+        self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self.maxsize == 0:
+            return
+        with self.lock:
+            self.data[key] = value
+            if self.maxsize is not None and len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.precomputed or key in self.data
+
+    def __len__(self):
+        return len(self.precomputed) + len(self.data)
+
+    def update(self, names):
+        """
+        Add precomputed names, regardless of `maxsize`.
+        """
+        self.precomputed.update(names)
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+    def clear(self):
+        with self.lock:
+            self.precomputed.clear()
+            self.data.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,128 @@
+"""
+Index of addressable sub-schemas for `$ref` resolution.
+
+Every registered schema is indexed by its id and every JSON pointer into it
+(`<id>#/definitions/foo`, `<id>#/properties/bar/items`, ...), so that resolving a
+(joined) ref is a single dictionary lookup instead of defragmenting the URL,
+fetching the document and walking the pointer.
+"""
+from threading import Lock
+
+from jsonschema.compat import str_types, unquote, urljoin
+
+from jsonschematypes.model import DEFINITIONS, ID
+
+
+def normalize_url(url):
+    """
+    Normalize a URL to an index key.
+
+    Empty fragments are dropped; other fragments are unquoted and treated as
+    JSON pointers (with a single leading "/").
+    """
+    url, _, fragment = url.partition("#")
+    fragment = unquote(fragment).lstrip("/")
+    if not fragment:
+        return url
+    return url + "#/" + fragment
+
+
+def escape(token):
+    """
+    Escape a JSON pointer token.
+    """
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def iter_addresses(schema_id, schema):
+    """
+    Iterate through (index key, sub-schema) for a schema and every object or array within it.
+    """
+    yield normalize_url(schema_id), schema
+    base = normalize_url(schema_id) + "#"
+    stack = [(schema, "")]
+    while stack:
+        node, pointer = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                child = pointer + u"/" + escape(u"{}".format(key))
+                yield base + child, value
+                stack.append((value, child))
+
+
+def iter_definition_aliases(schema_id, schema):
+    """
+    Iterate through (index key, definition) for definitions with relative ids.
+
+    Definitions are registered by their (raw) ids, but refs to them are resolved
+    relative to the schema that defines them.
+    """
+    for definition in schema.get(DEFINITIONS, {}).values():
+        if isinstance(definition, dict) and isinstance(definition.get(ID), str_types):
+            key = normalize_url(urljoin(schema_id, definition[ID]))
+            if key != definition[ID]:
+                yield key, definition
+
+
+class PointerIndex(object):
+    """
+    An index of sub-schemas by (normalized) URL.
+
+    Schemas are indexed when they are registered; schemas that were added to the
+    registry some other way (e.g. from a snapshot) are indexed on first lookup.
+    """
+    def __init__(self, registry):
+        self.registry = registry
+        # sub-schemas by index key
+        self.subschemas = {}
+        # (index key, sub-schema) pairs by schema id
+        self.keys = {}
+        # schemas are indexed on first lookup once, even by many threads
+        self.lock = Lock()
+
+    def add(self, schema_id, schema):
+        self.remove(schema_id)
+        keys = self.keys[schema_id] = []
+        for key, subschema in iter_addresses(schema_id, schema):
+            self.subschemas[key] = subschema
+            keys.append((key, subschema))
+        for key, definition in iter_definition_aliases(schema_id, schema):
+            # schemas registered with the same id take precedence
+            if self.subschemas.setdefault(key, definition) is definition:
+                keys.append((key, definition))
+
+    def remove(self, schema_id):
+        for key, subschema in self.keys.pop(schema_id, ()):
+            if self.subschemas.get(key) is subschema:
+                del self.subschemas[key]
+
+    def get(self, url, load=True):
+        """
+        Look up the sub-schema for a URL, or `None`.
+
+        :param load: load lazily indexed schemas
+        """
+        try:
+            # most refs are already normalized
+            return self.subschemas[url]
+        except KeyError:
+            pass
+
+        key = normalize_url(url)
+        if key in self.subschemas:
+            return self.subschemas[key]
+
+        schema_id = key.partition("#")[0]
+        if schema_id in self.keys:
+            return None
+        if dict.__contains__(self.registry, schema_id):
+            with self.lock:
+                if schema_id not in self.keys:
+                    self.add(schema_id, dict.__getitem__(self.registry, schema_id))
+        elif load and schema_id in self.registry:
+            # registers (and indexes) the schema
+            self.registry[schema_id]
+        else:
+            return None
+        return self.subschemas.get(key)
@@ -1,33 +1,110 @@
 """
 Interpose JSON schema loading through a registry of known schemas.
 """
+from collections import namedtuple
+from contextlib import contextmanager
+from os import walk
+from os.path import abspath, join
+from tarfile import TarError
+from threading import local
+from timeit import default_timer
 import sys
 
-from jsonschema import RefResolver, RefResolutionError, validate
+from jsonschema import RefResolver, RefResolutionError, ValidationError
+from jsonschema.compat import str_types, urldefrag, urljoin
+from jsonschema.validators import validator_for
 
+from jsonschematypes.archives import TarArchive, iter_definition_ids
+from jsonschematypes.compiler import ValidatorCompiler
 from jsonschematypes.factory import TypeFactory
-from jsonschematypes.files import iter_gzip, iter_tar, iter_schemas
-from jsonschematypes.model import ARRAY, DEFINITIONS, ID, ITEMS, REF, TYPE
+from jsonschematypes.graph import RefGraph, iter_scoped_refs
+from jsonschematypes.locks import KeyedLocks
+from jsonschematypes.files import (
+    GZIP,
+    TAR,
+    detect_mime_type,
+    iter_gzip,
+    iter_loaded_schemas,
+    iter_tar,
+)
+from jsonschematypes.model import DEFINITIONS, ID, TYPE
 from jsonschematypes.modules import ModuleFinder
+from jsonschematypes.pointers import PointerIndex, normalize_url
+from jsonschematypes.serialization import make_codec
+from jsonschematypes.snapshots import read_snapshot, stat_fingerprint, write_snapshot
 
 
-def iter_schema_refs(schema):
-    """
-    Iterate through all refs in a schema.
-    """
-    if REF in schema:
-        yield schema[REF]
-    for property_ in schema.get("properties", {}).values():
-        if REF in property_:
-            yield property_[REF]
-        elif property_.get(TYPE) == ARRAY and REF in property_.get(ITEMS, {}):
-            yield property_.get(ITEMS, {})[REF]
+# the outcome of validating one of many instances
+ValidationResult = namedtuple("ValidationResult", ["index", "ok", "errors"])
+
+# the outcome of validating many instances, as counts
+ValidationCounts = namedtuple("ValidationCounts", ["valid", "invalid"])
+
+# the schema ids that changed during a refresh, including invalidated dependents
+# (and the errors of files that could not be reloaded, by file)
+RefreshReport = namedtuple(
+    "RefreshReport",
+    ["added", "updated", "removed", "invalidated", "failed"],
+)
 
 
 def do_not_resolve(uri):
     raise RefResolutionError(uri)
 
 
+class RegistryResolver(RefResolver):
+    """
+    A resolver that looks up refs in a registry when they are first resolved.
+
+    Unlike a store (which is copied when the resolver is built), the registry
+    may load schemas on demand.
+
+    Refs are joined with `RefResolver`'s (private) URL cache, which is why
+    `setup.py` pins jsonschema to 2.6 and later 2.x releases.
+
+    Resolution scopes are kept per thread, so that a (cached) validator may be
+    used by many threads at once.
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        :param registry: the registry to look up refs in
+        """
+        self.registry = kwargs.pop("registry")
+        self.local = local()
+        super(RegistryResolver, self).__init__(*args, **kwargs)
+
+    @property
+    def _scopes_stack(self):
+        # replaces `RefResolver`'s (private) list of scopes; see the jsonschema pin in setup.py
+        try:
+            return self.local.scopes
+        except AttributeError:
+            scopes = self.local.scopes = [self.base_scope]
+            return scopes
+
+    @_scopes_stack.setter
+    def _scopes_stack(self, scopes):
+        # set (once) by `RefResolver.__init__()`
+        self.base_scope = scopes[0]
+        self.local.scopes = scopes
+
+    def resolve(self, ref):
+        """
+        Resolve a ref through the registry's index of sub-schemas (if possible).
+        """
+        url = self._urljoin_cache(self.resolution_scope, ref)
+        resolved = self.registry.pointers.get(url)
+        if resolved is None:
+            return super(RegistryResolver, self).resolve(ref)
+        return url, resolved
+
+    def resolve_from_url(self, url):
+        document_url = urldefrag(url)[0]
+        if document_url not in self.store and document_url in self.registry:
+            self.store[document_url] = self.registry[document_url]
+        return super(RegistryResolver, self).resolve_from_url(url)
+
+
 class Registry(dict):
     """
     A registry of loaded JSON schemas, mapped by id.
@@ -35,36 +112,446 @@ class Registry(dict):
     JSON Schema ids are both unique names and URIs. Keeping a registry of
     known schemas avoids URI loading at runtime.
     """
-    def __init__(self, mime_types=None):
+    def __init__(self, mime_types=None, codec=None, stats=None, store_converted=False):
         """
         :param mime_types: a mapping of mime types to schema loading functions.
+        :param codec: a JSON codec (or codec name) for schemas and generated types;
+                      see `jsonschematypes.serialization`.
+        :param stats: record loading, registration, class generation and validation;
+                      see `jsonschematypes.stats`.
+        :param store_converted: store converted `$ref` attribute values back into
+                                instances' data, so that conversion happens once and
+                                changes to nested objects persist.
         """
         super(Registry, self).__init__()
         self.mime_types = {
+            GZIP: iter_gzip,
             "application/x-gzip": iter_gzip,
-            "application/x-tar": iter_tar,
+            TAR: iter_tar,
         }
         if mime_types:
             self.mime_types.update(mime_types)
-        self.factory = TypeFactory(self)
+        self.codec = make_codec(codec)
+        self.stats = stats
+        self.factory = TypeFactory(self, stats=stats, store_converted=store_converted)
+        # per-thread captures, shared with the factory
+        self.captures = self.factory.captures
+        self.compiler = ValidatorCompiler(self)
+        self.validators = {}
+        # addressable sub-schemas
+        self.pointers = PointerIndex(self)
+        # refs between schemas
+        self.graph = RefGraph(self.pointers)
+        # files that schemas were loaded from
+        self.sources = []
+        # (stat fingerprint, schema ids, `load()` arguments) of files loaded by
+        # `load_directory()`, by file
+        self.tracked = {}
+        # `load()` arguments of directories to scan for new files on `refresh()`, by directory
+        self.watched = {}
+        # import handlers installed by `configure_imports()`
+        self.finders = []
+        # (archive, offset, size) of lazily indexed schemas that have not been loaded, by id
+        self.lazy = {}
+        # lazily indexed archives, by file
+        self.archives = {}
+        # validators are built (and lazily indexed members loaded) once, even when
+        # first requested by many threads
+        self.locks = KeyedLocks()
 
-    def load(self, *filenames):
+    def __missing__(self, schema_id):
+        """
+        Load lazily indexed schemas on first use.
+        """
+        try:
+            archive, offset, size = self.lazy[schema_id]
+        except KeyError:
+            raise KeyError(schema_id)
+        # members (which may contain several schemas) are loaded once
+        with self.locks((archive.filename, offset)):
+            if not dict.__contains__(self, schema_id):
+                # registers the member's schema and its definitions
+                self.register(archive.load(offset, size))
+        return dict.__getitem__(self, schema_id)
+
+    def __contains__(self, schema_id):
+        return dict.__contains__(self, schema_id) or schema_id in self.lazy
+
+    def get(self, schema_id, default=None):
+        try:
+            return self[schema_id]
+        except KeyError:
+            return default
+
+    def type_for(self, schema_id):
+        """
+        Return the type of a registered or lazily indexed schema, without loading it.
+        """
+        if dict.__contains__(self, schema_id):
+            return dict.__getitem__(self, schema_id).get(TYPE, "object")
+        try:
+            archive, offset, size = self.lazy[schema_id]
+        except KeyError:
+            # loaded (or unregistered) meanwhile
+            return self[schema_id].get(TYPE, "object")
+        return archive.type_for(offset, size, schema_id) or "object"
+
+    def iter_ids(self):
+        """
+        Iterate through the ids of registered and (not yet loaded) lazily indexed schemas.
+        """
+        schema_ids = list(self)
+        schema_ids.extend(
+            schema_id for schema_id in self.lazy
+            if not dict.__contains__(self, schema_id)
+        )
+        return iter(schema_ids)
+
+    def load(self, *filenames, **kwargs):
         """
         Load one or more schemas from file.
 
         Files are evaluated according to their mime types, which allows
         archives (e.g. tars) to be loaded.
+
+        Files may be read and parsed in parallel; schemas are always registered
+        in the order of `filenames`. Raises `SchemaLoadError` if a file cannot be parsed.
+
+        :param workers: read and parse files using a pool of this many workers
+        :param processes: use worker processes (rather than threads)
+        :param mime_type: the mime type of all files, instead of detecting each
+                          file's type (see `jsonschematypes.files.detect_mime_type`)
+        :param lazy: index (uncompressed) tar archives and load their schemas on first
+                     use; see `load_archive()`
+        """
+        workers = kwargs.pop("workers", None)
+        processes = kwargs.pop("processes", False)
+        mime_type = kwargs.pop("mime_type", None)
+        lazy = kwargs.pop("lazy", False)
+        if kwargs:
+            raise TypeError("Unexpected arguments: {}".format(", ".join(sorted(kwargs))))
+
+        schema_ids = []
+        if lazy:
+            archives = [
+                filename for filename in filenames
+                if (mime_type or detect_mime_type(filename)) == TAR
+            ]
+            filenames = [filename for filename in filenames if filename not in archives]
+            for filename in archives:
+                start = default_timer()
+                schema_ids.extend(self.load_archive(filename))
+                if self.stats is not None:
+                    self.stats.record_load(filename, default_timer() - start)
+
+        start = default_timer()
+        for filename, schemas in zip(filenames, iter_loaded_schemas(
+            filenames,
+            self.mime_types,
+            self.codec,
+            workers=workers,
+            processes=processes,
+            mime_type=mime_type,
+        )):
+            schema_ids.extend(self.register(schema) for schema in schemas)
+            if self.stats is not None:
+                # with workers, includes time spent waiting for (rather than parsing) files
+                end = default_timer()
+                self.stats.record_load(filename, end - start)
+                start = end
+        known = set(self.sources)
+        self.sources.extend(
+            filename for filename in map(abspath, filenames)
+            if filename not in known
+        )
+        return schema_ids
+
+    def load_archive(self, filename):
+        """
+        Index the schemas in an uncompressed tar archive without loading them.
+
+        Schemas are parsed (and registered) when first looked up; until then, they
+        are included in `in` checks but not in iteration or `len()`.
+
+        Returns the top-level schema ids of the archive's members.
+        """
+        filename = abspath(filename)
+        archive = self.archives[filename] = TarArchive(filename, self.codec)
+        schema_ids = []
+        for ids, (offset, size) in archive.index():
+            for schema_id in ids:
+                self.lazy[schema_id] = archive, offset, size
+                for finder in self.finders:
+                    finder.add(schema_id)
+            schema_ids.append(ids[0])
+        if filename not in self.sources:
+            self.sources.append(filename)
+        return schema_ids
+
+    def load_directory(self, path, watch=False, **kwargs):
         """
+        Load all schemas from the files in a directory (recursively, ignoring dotfiles).
+
+        Loaded files are tracked: `refresh()` reloads them if they change.
+
+        :param watch: also load new files in this directory on `refresh()`
+        :param kwargs: arguments for `load()`
+        """
+        path = abspath(path)
+        if watch:
+            self.watched[path] = kwargs
         return [
-            self.register(schema)
-            for filename in filenames
-            for schema in iter_schemas(filename, self.mime_types)
+            schema_id
+            for filename in self.iter_directory(path)
+            for schema_id in self.load_tracked(filename, **kwargs)
         ]
 
+    def iter_directory(self, path):
+        """
+        Iterate through the files in a directory (recursively, ignoring dotfiles), in order.
+        """
+        for dirpath, dirnames, filenames in walk(path):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            for filename in sorted(filenames):
+                if not filename.startswith("."):
+                    yield join(dirpath, filename)
+
+    def load_tracked(self, filename, **kwargs):
+        """
+        Load a file and track it; `refresh()` reloads it with the same arguments.
+        """
+        fingerprint = stat_fingerprint(filename)
+        schema_ids = self.load(filename, **kwargs)
+        self.tracked[filename] = fingerprint, self.provided_ids(filename, schema_ids), kwargs
+        return schema_ids
+
+    def provided_ids(self, filename, schema_ids):
+        """
+        Return the ids of a loaded file's schemas and their (nested) definitions.
+
+        Lazily indexed schemas are not loaded; their archive's index lists them.
+        """
+        provided = list(schema_ids)
+        for schema_id in schema_ids:
+            if dict.__contains__(self, schema_id):
+                provided.extend(iter_definition_ids(dict.__getitem__(self, schema_id)))
+        archive = self.archives.get(abspath(filename))
+        if archive is not None and any(schema_id in self.lazy for schema_id in schema_ids):
+            known = set(provided)
+            provided.extend(
+                schema_id for schema_id in archive.schema_ids
+                if schema_id not in known
+            )
+        return provided
+
+    def refresh(self):
+        """
+        Reload tracked files that changed (and load new files in watched directories).
+
+        Files are compared by mtime and size; schemas in changed files are compared
+        to their registered versions, so that only changed schemas are registered
+        again. All changed files are reloaded before schemas that no tracked file
+        provides anymore (e.g. those of removed files or definitions) are unregistered,
+        so schemas may move between files.
+
+        Files that cannot be reloaded (e.g. while they are being written) keep their
+        previously loaded schemas and are retried on the next refresh.
+
+        Returns a `RefreshReport` of schema ids (and errors by file).
+        """
+        added, updated, removed, invalidated = set(), set(), set(), set()
+        failed = {}
+
+        filenames = {filename: entry[2] for filename, entry in self.tracked.items()}
+        for path, kwargs in self.watched.items():
+            for filename in self.iter_directory(path):
+                filenames.setdefault(filename, kwargs)
+
+        provided = {
+            schema_id
+            for _, schema_ids, _ in self.tracked.values()
+            for schema_id in schema_ids
+        }
+        # lazily indexed schemas are not loaded for comparison; they count as updated
+        old_schemas = {schema_id: dict.get(self, schema_id) for schema_id in provided}
+
+        changed = []
+        for filename in sorted(filenames):
+            fingerprint = self.tracked.get(filename, (None, ))[0]
+            try:
+                if stat_fingerprint(filename) == fingerprint:
+                    continue
+            except OSError:
+                # the file was removed
+                self.tracked.pop(filename, None)
+                if filename in self.sources:
+                    self.sources.remove(filename)
+                continue
+            changed.append(filename)
+
+        for filename in changed:
+            try:
+                self.load_tracked(filename, **filenames[filename])
+            except (ValueError, TarError, EnvironmentError) as error:
+                failed[filename] = error
+                continue
+            for schema_id in self.tracked[filename][1]:
+                if schema_id not in provided:
+                    added.add(schema_id)
+                elif schema_id in self.lazy or old_schemas[schema_id] != self[schema_id]:
+                    updated.add(schema_id)
+
+        for _, schema_ids, _ in self.tracked.values():
+            provided.difference_update(schema_ids)
+        for schema_id in provided:
+            # definitions are unregistered with their schemas
+            if schema_id in self:
+                invalidated.update(self.unregister(schema_id))
+            removed.add(schema_id)
+
+        for schema_id in added | updated:
+            invalidated.update(self.dependents_of([schema_id]))
+
+        return RefreshReport(added, updated, removed, invalidated, failed)
+
+    def save_snapshot(self, path):
+        """
+        Save registered schemas (and precomputed indexes) to a snapshot file.
+
+        See `jsonschematypes.snapshots`.
+        """
+        write_snapshot(
+            path,
+            schemas=dict(self),
+            sources=self.sources,
+            indexes=dict(
+                refs=self.graph.urls,
+                class_names={
+                    schema_id: self.factory.class_names[schema_id]
+                    for schema_id in self
+                },
+                lazy={
+                    schema_id: (archive.filename, offset, size)
+                    for schema_id, (archive, offset, size) in self.lazy.items()
+                },
+            ),
+        )
+
+    @classmethod
+    def from_snapshot(cls, path, check=True, **kwargs):
+        """
+        Create a registry from a snapshot file.
+
+        :param check: raise `StaleSnapshotError` if any file that the snapshot's
+                      schemas were loaded from has changed since it was saved
+        :param kwargs: arguments for the registry
+        """
+        schemas, sources, indexes = read_snapshot(path, check=check)
+        registry = cls(**kwargs)
+        # schemas were registered (including their definitions) when saved
+        dict.update(registry, schemas)
+        registry.sources.extend(sources)
+        registry.graph = RefGraph.from_refs(indexes["refs"], registry.pointers)
+        registry.factory.class_names.update(indexes["class_names"])
+        for schema_id, (filename, offset, size) in indexes.get("lazy", {}).items():
+            if filename not in registry.archives:
+                registry.archives[filename] = TarArchive(filename, registry.codec)
+            registry.lazy[schema_id] = registry.archives[filename], offset, size
+        return registry
+
     def validate(self, instance, schema_id, skip_http=True):
         """
         Validate an instance against a registered schema.
         """
+        if self.stats is None:
+            return self.validator_for(schema_id, skip_http=skip_http).validate(instance)
+
+        validator = self.validator_for(schema_id, skip_http=skip_http)
+        start = default_timer()
+        try:
+            validator.validate(instance)
+        except ValidationError as error:
+            self.stats.record_validation(schema_id, default_timer() - start, [error])
+            raise
+        self.stats.record_validation(schema_id, default_timer() - start)
+
+    def validate_many(self, instances, schema_id, skip_http=True, max_failures=None,
+                      collect_errors=True):
+        """
+        Validate many instances against a registered schema.
+
+        Instances may be any iterable (including generators) and are consumed lazily;
+        a `ValidationResult(index, ok, errors)` is yielded for each instance.
+
+        :param max_failures: stop after this many invalid instances
+        :param collect_errors: if false, `errors` is `None` for invalid instances
+        """
+        compiled = self.compile(schema_id, skip_http=skip_http)
+        check, iter_errors = compiled.check, compiled.validator.iter_errors
+        stats = self.stats
+        failures = 0
+        for index, instance in enumerate(instances):
+            if stats is not None:
+                start = default_timer()
+            if check(instance):
+                if stats is not None:
+                    stats.record_validation(schema_id, default_timer() - start)
+                yield ValidationResult(index, True, ())
+                continue
+
+            errors = list(iter_errors(instance)) if collect_errors else None
+            if stats is not None:
+                stats.record_validation(schema_id, default_timer() - start, errors)
+            yield ValidationResult(index, False, errors)
+
+            failures += 1
+            if max_failures is not None and failures >= max_failures:
+                return
+
+    def count_valid(self, instances, schema_id, skip_http=True, max_failures=None):
+        """
+        Count valid and invalid instances without collecting errors.
+
+        See `validate_many()`.
+        """
+        valid = invalid = 0
+        for result in self.validate_many(
+            instances,
+            schema_id,
+            skip_http=skip_http,
+            max_failures=max_failures,
+            collect_errors=False,
+        ):
+            if result.ok:
+                valid += 1
+            else:
+                invalid += 1
+        return ValidationCounts(valid, invalid)
+
+    def validator_for(self, schema_id, skip_http=True):
+        """
+        Return a (cached) validator for a registered schema.
+
+        The schema is checked against its metaschema only when the validator
+        is first built; subsequent calls reuse the same validator and resolver.
+        """
+        key = (schema_id, skip_http)
+        try:
+            return self.validators[key]
+        except KeyError:
+            pass
+
+        with self.locks(key):
+            validator = self.validators.get(key)
+            if validator is None:
+                validator = self.build_validator(schema_id, skip_http)
+        return validator
+
+    def build_validator(self, schema_id, skip_http=True):
+        """
+        Build (and cache) a validator; see `validator_for()`.
+        """
+        key = (schema_id, skip_http)
         schema = self[schema_id]
         handlers = {}
         if skip_http:
@@ -72,12 +559,54 @@ class Registry(dict):
                 http=do_not_resolve,
                 https=do_not_resolve,
             )
-        resolver = RefResolver.from_schema(
+        resolver = RegistryResolver.from_schema(
             schema,
-            store=self,
+            registry=self,
             handlers=handlers,
         )
-        return validate(instance, schema, resolver=resolver)
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = self.validators[key] = cls(schema, resolver=resolver)
+        if self.stats is not None:
+            self.stats.record_validator_build(schema_id)
+        return validator
+
+    def compile(self, schema_id, skip_http=True):
+        """
+        Compile a registered schema into a specialized validation function.
+
+        The returned object's `validate()` raises the same errors as `validate()`
+        but inlines common checks; see `jsonschematypes.compiler`.
+        """
+        return self.compiler.compile(schema_id, skip_http=skip_http)
+
+    @property
+    def stats(self):
+        return self.captures.current(self.installed_stats)
+
+    @stats.setter
+    def stats(self, stats):
+        self.installed_stats = stats
+
+    def instrument(self, stats):
+        """
+        Install (or, with `None`, remove) a `Stats` object for this registry and its factory.
+        """
+        self.stats = self.factory.stats = stats
+
+    @contextmanager
+    def capture(self):
+        """
+        Record operations within a block (in the current thread) in a new `Stats` object.
+
+        Counts are added to the enclosing capture or to the installed stats (if any)
+        afterwards.
+        """
+        stats = self.captures.push()
+        try:
+            yield stats
+        finally:
+            self.captures.pop(stats, self.installed_stats)
 
     def create_class(self, schema_id):
         """
@@ -85,12 +614,20 @@ class Registry(dict):
         """
         return self.factory.make_class(schema_id)
 
+    def create_record_class(self, schema_id):
+        """
+        Create a compact, `__slots__`-based Python class that maps to the given schema.
+
+        See `TypeFactory.make_record_class()`.
+        """
+        return self.factory.make_record_class(schema_id)
+
     def create_class_for(self, schema, ref):
         if ref is None:
             return None
 
         try:
-            return self.create_class(self.expand_ref(schema, ref))
+            return self.create_class(self.expand_ref(schema, ref, load=True))
         except KeyError:
             # unable to resolve ref; fall through
             return None
@@ -99,44 +636,150 @@ class Registry(dict):
         """
         Register an import handler that automatically creates classes.
         """
-        sys.meta_path.append(ModuleFinder(
+        finder = ModuleFinder(
             factory=self.factory,
             basename=basename,
             keep_uri_parts=keep_uri_parts,
-        ))
+        )
+        self.finders.append(finder)
+        sys.meta_path.append(finder)
 
     def find_unresolved(self):
         """
-        Return all unresolved schema references.
+        Return all unresolved schema references (as written in their schemas).
+
+        Refs are unresolved if the schema they target is not registered (or lazily
+        indexed) or if their JSON pointer does not point into the target.
         """
-        return {
-            ref
-            for schema in self.values()
-            for ref in iter_schema_refs(schema)
-            if self.expand_ref(schema, ref) not in self
-        }
+        unresolved = set()
+        for target, refs in self.graph.unresolved.items():
+            if target in self.lazy and not dict.__contains__(self, target):
+                # (pointers into) lazily indexed schemas are resolved once loaded
+                continue
+            unresolved.update(ref for _, ref, _ in refs)
+        return unresolved
 
     def register(self, schema):
         """
         Register a schema.
 
-        Schemas must define an `id` attribute.
+        Schemas must define an `id` attribute. Registering a new version of a
+        schema invalidates classes and validators for it and its dependents.
         """
         schema_id = schema[ID]
-        self[schema_id] = schema
+        previous = dict.get(self, schema_id)
+        if previous != schema:
+            self[schema_id] = schema
+            if self.stats is not None:
+                self.stats.record_register(schema_id)
+            self.pointers.add(schema_id, schema)
+            self.graph.add(schema_id, [
+                (ref, self.expand_ref(schema, ref, scope=scope))
+                for ref, scope in iter_scoped_refs(schema)
+            ])
+            for finder in self.finders:
+                finder.add(schema_id)
+            if previous is not None:
+                self.invalidate(schema_id)
+            elif schema_id in self.lazy:
+                # lazily indexed schemas were already known (and resolvable), so
+                # loading them cannot make anything stale
+                pass
+            else:
+                # dependents may have cached that the schema was unknown, but only
+                # through dependents that are cached themselves (this keeps bulk
+                # loading linear, whatever the order of dependencies)
+                self.drop_cached(self.graph.walk(
+                    [schema_id], self.graph.dependents, follow=self.is_cached,
+                ))
+        # after registering, so that the schema is always found (by other threads)
+        self.lazy.pop(schema_id, None)
         for definition in schema.get(DEFINITIONS, {}).values():
             self.register(definition)
         return schema_id
 
-    def expand_ref(self, schema, ref):
+    def unregister(self, schema_id):
+        """
+        Remove a schema (and its definitions).
+
+        Returns the ids of invalidated schemas; see `invalidate()`.
+        """
+        schema = self[schema_id]
+        dict.__delitem__(self, schema_id)
+        self.pointers.remove(schema_id)
+        self.graph.remove(schema_id)
+        for finder in self.finders:
+            finder.remove(schema_id)
+        invalidated = self.invalidate(schema_id)
+        for definition in schema.get(DEFINITIONS, {}).values():
+            if definition.get(ID) in self:
+                invalidated |= self.unregister(definition[ID])
+        return invalidated
+
+    def dependents_of(self, schema_ids):
+        """
+        Return the ids of schemas that (transitively) ref any of the given schemas,
+        including the given schemas.
+        """
+        return self.graph.dependents_of(schema_ids)
+
+    def is_cached(self, schema_id):
+        """
+        Is a class, validator or compiled validator cached for a schema?
+        """
+        return (
+            schema_id in self.factory.classes or
+            schema_id in self.factory.record_classes or
+            any(
+                (schema_id, skip_http) in self.validators or
+                (schema_id, skip_http) in self.compiler.compiled
+                for skip_http in (True, False)
+            )
+        )
+
+    def invalidate(self, *schema_ids):
         """
-        Expand refs to internal definitions.
+        Drop cached classes, validators and module attributes for schemas and their dependents.
+
+        Dropped classes are created again on demand; existing instances keep their
+        (old) classes. Returns the ids of invalidated schemas.
+        """
+        invalidated = self.dependents_of(schema_ids)
+        self.drop_cached(invalidated)
+        return invalidated
+
+    def drop_cached(self, schema_ids):
+        """
+        Drop cached classes, validators and module attributes for schemas (only).
+        """
+        stale_classes = {}
+        for schema_id in schema_ids:
+            if schema_id in self.factory.classes:
+                stale_classes[schema_id] = self.factory.classes.pop(schema_id)
+            self.factory.record_classes.pop(schema_id, None)
+            for skip_http in (True, False):
+                self.validators.pop((schema_id, skip_http), None)
+                self.compiler.compiled.pop((schema_id, skip_http), None)
+        for finder in self.finders:
+            finder.invalidate(stale_classes)
+
+    def expand_ref(self, schema, ref, load=False, scope=None):
+        """
+        Expand a ref (relative to the schema it appears in) to the id of the schema it refers to.
+
+        Refs to registered schemas, including JSON pointers to sub-schemas with ids
+        (e.g. `#/definitions/foo`), expand to their ids; other refs expand to
+        normalized URLs.
+
+        :param load: load lazily indexed schemas to resolve pointers into them
+        :param scope: the resolution scope of the ref, if it is in a subschema with an id
+                      (default: the schema's id); see `jsonschematypes.graph.iter_scoped_refs`
         """
         if ref is None:
             return ref
 
-        if ref.startswith("#/definitions/"):
-            definition = ref.split("#/definitions/", 1)[1]
-            return schema.get(DEFINITIONS, {}).get(definition, {}).get(ID, ref)
-
-        return ref
+        url = urljoin(schema.get(ID, "") if scope is None else scope, ref)
+        subschema = self.pointers.get(url, load=load)
+        if isinstance(subschema, dict) and isinstance(subschema.get(ID), str_types):
+            return subschema[ID]
+        return normalize_url(url)
@@ -0,0 +1,131 @@
+"""
+Pluggable JSON codecs.
+
+A `Registry` parses schemas and generated classes serialize and parse instances
+through a codec. The standard library's `json` module is the default; faster
+third-party libraries may be used if they are installed.
+"""
+import json
+
+from jsonschema.compat import str_types
+
+
+class JSONCodec(object):
+    """
+    Codec backed by the standard library's `json` module.
+
+    Encoder and decoder instances are reused across calls (and use the C
+    accelerators where available).
+
+    Codecs pickle as their options (e.g. to be passed to worker processes).
+    """
+    options = {}
+
+    def __init__(self, **options):
+        """
+        :param options: options for `json.JSONEncoder` (e.g. `separators`)
+        """
+        self.options = options
+        self.encoder = json.JSONEncoder(**options)
+        self.decoder = json.JSONDecoder()
+
+    def __getstate__(self):
+        return self.options
+
+    def __setstate__(self, options):
+        self.__init__(**options)
+
+    def dumps(self, obj):
+        return self.encoder.encode(obj)
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return self.decoder.decode(data)
+
+    def dump(self, obj, fileobj):
+        fileobj.write(self.dumps(obj))
+
+    def load(self, fileobj):
+        return self.loads(fileobj.read())
+
+
+class CompactJSONCodec(JSONCodec):
+    """
+    Codec backed by the standard library's `json` module, without insignificant whitespace.
+    """
+    def __init__(self, **options):
+        options.setdefault("separators", (",", ":"))
+        super(CompactJSONCodec, self).__init__(**options)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec backed by `orjson` (if installed).
+    """
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def dumps(self, obj):
+        return self.orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    """
+    Codec backed by `ujson` (if installed).
+    """
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def dumps(self, obj):
+        return self.ujson.dumps(obj)
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+
+class SimpleJSONCodec(JSONCodec):
+    """
+    Codec backed by `simplejson` (if installed).
+    """
+    def __init__(self):
+        import simplejson
+        self.simplejson = simplejson
+
+    def dumps(self, obj):
+        return self.simplejson.dumps(obj)
+
+    def loads(self, data):
+        return self.simplejson.loads(data)
+
+
+CODECS = {
+    "json": JSONCodec,
+    "json-compact": CompactJSONCodec,
+    "orjson": OrjsonCodec,
+    "simplejson": SimpleJSONCodec,
+    "ujson": UJSONCodec,
+}
+
+DEFAULT_CODEC = JSONCodec()
+
+
+def make_codec(codec=None):
+    """
+    Resolve a codec from an instance, a name in `CODECS`, or `None` (the default).
+
+    Raises `ImportError` if the codec's library is not installed.
+    """
+    if codec is None:
+        return DEFAULT_CODEC
+    if isinstance(codec, str_types):
+        try:
+            return CODECS[codec]()
+        except KeyError:
+            raise ValueError("Unknown codec: {}".format(codec))
+    return codec
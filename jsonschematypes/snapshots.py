@@ -0,0 +1,95 @@
+"""
+Registry snapshots for fast process startup.
+
+A snapshot is a (pickled) bundle of a registry's schemas, together with indexes
+that would otherwise be recomputed at startup, and fingerprints of the files that
+the schemas were loaded from. Snapshots are stale once any of these files changes.
+
+Snapshots are caches: only load snapshots that you (or your build) wrote.
+"""
+from hashlib import sha1
+from os import stat
+import pickle
+
+
+SNAPSHOT_VERSION = 3
+
+
+class StaleSnapshotError(ValueError):
+    """
+    A snapshot does not match its source files (or this version of the library).
+    """
+    pass
+
+
+def fingerprint(filename):
+    """
+    Compute a fingerprint for a file: (mtime, size, content hash).
+    """
+    stat_result = stat(filename)
+    with open(filename, "rb") as fileobj:
+        digest = sha1(fileobj.read()).hexdigest()
+    return stat_result.st_mtime, stat_result.st_size, digest
+
+
+def stat_fingerprint(filename):
+    """
+    Compute a cheap fingerprint for a file: (mtime, size).
+    """
+    stat_result = stat(filename)
+    return stat_result.st_mtime, stat_result.st_size
+
+
+def is_current(filename, expected):
+    """
+    Does a file match a previously computed fingerprint?
+
+    Files whose mtime and size are unchanged are assumed to be unchanged;
+    otherwise, content hashes are compared.
+    """
+    mtime, size, digest = expected
+    try:
+        stat_result = stat(filename)
+    except OSError:
+        return False
+    if (stat_result.st_mtime, stat_result.st_size) == (mtime, size):
+        return True
+    return fingerprint(filename)[2] == digest
+
+
+def write_snapshot(path, schemas, sources, indexes):
+    """
+    Write a snapshot.
+
+    :param schemas: a mapping of schema ids to schemas
+    :param sources: the files the schemas were loaded from
+    :param indexes: a mapping of precomputed indexes (by name)
+    """
+    data = dict(
+        version=SNAPSHOT_VERSION,
+        schemas=schemas,
+        sources={filename: fingerprint(filename) for filename in sources},
+        indexes=indexes,
+    )
+    with open(path, "wb") as fileobj:
+        pickle.dump(data, fileobj, pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path, check=True):
+    """
+    Read a snapshot, returning its schemas, sources and indexes.
+
+    :param check: raise `StaleSnapshotError` if any source file has changed
+    """
+    with open(path, "rb") as fileobj:
+        data = pickle.load(fileobj)
+
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        raise StaleSnapshotError("Unsupported snapshot version in: {}".format(path))
+
+    if check:
+        for filename, expected in data["sources"].items():
+            if not is_current(filename, expected):
+                raise StaleSnapshotError("Snapshot source has changed: {}".format(filename))
+
+    return data["schemas"], data["sources"], data["indexes"]
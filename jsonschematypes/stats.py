@@ -0,0 +1,201 @@
+"""
+Optional instrumentation for registry operations.
+
+A `Registry` (and its `TypeFactory`) records loading, registration, class
+generation and validation in a `Stats` object, if one is installed:
+
+    registry = Registry(stats=Stats())
+
+    with registry.capture() as stats:
+        registry.validate(instance, schema_id)
+    print(stats.snapshot())
+
+Without stats (the default), instrumented code paths only check for `None`.
+`Stats` methods are the instrumentation hooks; subclasses may forward them to
+a metrics system instead of (or as well as) counting.
+"""
+from bisect import bisect_left
+from collections import Counter
+from threading import local
+
+
+class Histogram(object):
+    """
+    A histogram of latencies (in seconds), with fixed, logarithmic buckets.
+    """
+    # upper bounds of the buckets; the last bucket is unbounded
+    BOUNDS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def update(self, other):
+        self.counts = [count + other.counts[index] for index, count in enumerate(self.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return dict(
+            buckets=[
+                dict(le=bound, count=count)
+                for bound, count in zip(self.BOUNDS + (None, ), self.counts)
+            ],
+            count=self.count,
+            total=self.total,
+            mean=self.mean,
+            max=self.max,
+        )
+
+
+class Stats(object):
+    """
+    Counters and latency histograms for registry operations.
+    """
+    def __init__(self):
+        # total load time (in seconds) by file
+        self.load_times = Counter()
+        self.schemas_registered = 0
+        self.classes_generated = 0
+        self.class_cache_hits = 0
+        self.class_cache_misses = 0
+        # validators built (schemas checked against their metaschemas), by schema id
+        self.validator_builds = Counter()
+        # validation latency histograms, by schema id
+        self.validation_latency = {}
+        # invalid instances, by (schema id, instance path of the error)
+        self.validation_failures = Counter()
+
+    def record_load(self, filename, seconds):
+        """
+        Record the time taken to read, parse and register the schemas of a file.
+        """
+        self.load_times[filename] += seconds
+
+    def record_register(self, schema_id):
+        """
+        Record a new (or changed) schema being registered.
+        """
+        self.schemas_registered += 1
+
+    def record_class(self, schema_id, hit):
+        """
+        Record a class lookup; misses generate (or, for primitive types, pick) a class.
+        """
+        if hit:
+            self.class_cache_hits += 1
+        else:
+            self.class_cache_misses += 1
+            self.classes_generated += 1
+
+    def record_validator_build(self, schema_id):
+        self.validator_builds[schema_id] += 1
+
+    def record_validation(self, schema_id, seconds, errors=()):
+        """
+        Record the latency (and any errors) of validating an instance.
+
+        :param errors: validation errors, or `None` if the instance was invalid but
+                       errors were not collected (its path is then recorded as `None`)
+        """
+        try:
+            histogram = self.validation_latency[schema_id]
+        except KeyError:
+            histogram = self.validation_latency[schema_id] = Histogram()
+        histogram.add(seconds)
+
+        if errors is None:
+            self.validation_failures[schema_id, None] += 1
+            return
+        for error in errors:
+            path = "/".join(str(part) for part in error.absolute_path)
+            self.validation_failures[schema_id, path] += 1
+
+    def update(self, other):
+        """
+        Add another `Stats`' counts to this one's.
+        """
+        self.load_times.update(other.load_times)
+        self.schemas_registered += other.schemas_registered
+        self.classes_generated += other.classes_generated
+        self.class_cache_hits += other.class_cache_hits
+        self.class_cache_misses += other.class_cache_misses
+        self.validator_builds.update(other.validator_builds)
+        for schema_id, histogram in other.validation_latency.items():
+            self.validation_latency.setdefault(schema_id, Histogram()).update(histogram)
+        self.validation_failures.update(other.validation_failures)
+
+    def snapshot(self):
+        """
+        Return the current counts as plain (JSON-serializable) data.
+        """
+        return dict(
+            load_times=dict(self.load_times),
+            schemas_registered=self.schemas_registered,
+            classes_generated=self.classes_generated,
+            class_cache_hits=self.class_cache_hits,
+            class_cache_misses=self.class_cache_misses,
+            validator_builds=dict(self.validator_builds),
+            validation_latency={
+                schema_id: histogram.as_dict()
+                for schema_id, histogram in self.validation_latency.items()
+            },
+            validation_failures=[
+                dict(schema_id=schema_id, path=path, count=count)
+                for (schema_id, path), count in sorted(
+                    self.validation_failures.items(),
+                    key=lambda item: (item[0][0], item[0][1] or ""),
+                )
+            ],
+        )
+
+
+class Captures(local):
+    """
+    The `Stats` objects capturing operations in the current thread, innermost last.
+
+    Captures are kept per thread, so that concurrent captures only record their own
+    thread's operations.
+    """
+    def __init__(self):
+        self.stack = []
+
+    def current(self, installed):
+        """
+        Return the stats that operations are recorded in: the innermost capture, if any.
+        """
+        return self.stack[-1] if self.stack else installed
+
+    def push(self):
+        """
+        Start capturing in a new `Stats` object.
+        """
+        stats = Stats()
+        self.stack.append(stats)
+        return stats
+
+    def pop(self, stats, installed):
+        """
+        Stop capturing in a `Stats` object and add its counts to the enclosing capture
+        (or to the installed stats, if any).
+
+        Captures may end in any order.
+        """
+        index = next(index for index, other in enumerate(self.stack) if other is stats)
+        del self.stack[index]
+        enclosing = self.stack[index - 1] if index else installed
+        if enclosing is not None:
+            enclosing.update(stats)
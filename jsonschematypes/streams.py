@@ -0,0 +1,148 @@
+"""
+Incremental loading of large JSON documents.
+
+Supports newline-delimited JSON (one document per line) and a single, large
+top-level JSON array. Both yield one document at a time from a buffered stream,
+so that memory is bounded by the size of one document (plus one read chunk).
+
+Newline-delimited documents are parsed with a configurable codec (see
+`jsonschematypes.serialization`); array items are delimited and parsed with the
+standard library's `json` decoder.
+"""
+from codecs import getincrementaldecoder
+import json
+import re
+
+from jsonschematypes.serialization import DEFAULT_CODEC
+
+
+NDJSON = "ndjson"
+ARRAY = "array"
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_text(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    Iterate through text chunks of a (text or binary) file object.
+
+    Binary data is decoded as UTF-8.
+    """
+    decoder = None
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            if decoder is not None:
+                tail = decoder.decode(b"", True)
+                if tail:
+                    yield tail
+            return
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk)
+        yield chunk
+
+
+def iter_ndjson(fileobj, chunk_size=CHUNK_SIZE, codec=DEFAULT_CODEC):
+    """
+    Iterate through documents in newline-delimited JSON; blank lines are skipped.
+    """
+    for line in fileobj:
+        if line.strip():
+            yield codec.loads(line)
+
+
+def iter_array(fileobj, chunk_size=CHUNK_SIZE, codec=DEFAULT_CODEC):
+    """
+    Iterate through the items of a top-level JSON array.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter_text(fileobj, chunk_size)
+    buffer, position, eof = "", 0, False
+
+    def refill(buffer, position, size):
+        """
+        Discard consumed data and append at least `size` characters (unless at EOF).
+        """
+        parts, count = [buffer[position:]], 0
+        for chunk in chunks:
+            parts.append(chunk)
+            count += len(chunk)
+            if count >= size:
+                break
+        return "".join(parts), count == 0
+
+    # expect "[", then an item or "]", then "," or "]", then an item, ...
+    expected = "["
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            (buffer, eof), position = refill(buffer, position, chunk_size), 0
+            continue
+
+        char = buffer[position]
+        if expected == "[":
+            if char != "[":
+                raise ValueError("Expected a JSON array; found: {!r}".format(char))
+            position += 1
+            expected = "item or ]"
+            continue
+
+        if char == "]" and expected in ("item or ]", ", or ]"):
+            return
+
+        if expected == ", or ]":
+            if char != ",":
+                raise ValueError("Expected ',' or ']'; found: {!r}".format(char))
+            position += 1
+            expected = "item"
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if eof:
+                raise
+            item, end = None, None
+
+        if end is not None and not eof:
+            # the item is only known to be complete if a delimiter follows it
+            # (e.g. a number may continue in the next chunk)
+            delimiter = WHITESPACE.match(buffer, end).end()
+            if delimiter == len(buffer) or buffer[delimiter] not in ",]":
+                end = None
+
+        if end is None:
+            # the item may be incomplete; read at least as much again and retry
+            size = max(chunk_size, len(buffer) - position)
+            (buffer, eof), position = refill(buffer, position, size), 0
+            continue
+
+        yield item
+        position = end
+        expected = ", or ]"
+
+
+FORMATS = {
+    NDJSON: iter_ndjson,
+    ARRAY: iter_array,
+}
+
+
+def iter_documents(fileobj, format=NDJSON, chunk_size=CHUNK_SIZE, codec=DEFAULT_CODEC):
+    """
+    Iterate through documents in a stream of the given format.
+
+    :param format: one of "ndjson" or "array"
+    :param codec: the JSON codec used to parse newline-delimited documents
+    """
+    try:
+        iter_func = FORMATS[format]
+    except KeyError:
+        raise ValueError("Unsupported format: {}".format(format))
+    return iter_func(fileobj, chunk_size, codec)
@@ -2,6 +2,13 @@
 Common test fixtures.
 """
 from os.path import dirname, join
+from shutil import rmtree
+from tarfile import TarFile
+from tempfile import mkdtemp
+from uuid import uuid4
+import sys
+
+from jsonschematypes.codegen import generate_modules
 
 
 ADDRESS = dict(
@@ -28,3 +35,52 @@ RECORD_ID = "http://x.y.z/record"
 
 def schema_for(name):
     return join(dirname(__file__), name)
+
+
+def build_tar(fileobj, mode="w"):
+    """
+    Write a tar archive of the address, name and record schemas.
+    """
+    tarfile = TarFile(mode=mode, fileobj=fileobj)
+    tarfile.add(schema_for("data/address.json"))
+    tarfile.add(schema_for("data/name.json"))
+    tarfile.add(schema_for("data/record.json"))
+
+
+class GeneratedModules(object):
+    """
+    Generate modules for a registry into a temporary, importable directory.
+    """
+    def __init__(self, registry):
+        self.registry = registry
+        self.basename = "generated_{}".format(uuid4().hex)
+
+    def __enter__(self):
+        self.directory = mkdtemp()
+        generate_modules(self.registry, self.directory, basename=self.basename)
+        sys.path.insert(0, self.directory)
+        return self
+
+    def __exit__(self, *args):
+        sys.path.remove(self.directory)
+        for name in list(sys.modules):
+            if name.split(".")[0] == self.basename:
+                del sys.modules[name]
+        rmtree(self.directory)
+
+    def import_module(self, name):
+        fullname = ".".join([self.basename, name]) if name else self.basename
+        __import__(fullname)
+        return sys.modules[fullname]
+
+
+def iter_registries(registry):
+    """
+    Yield a registry, then the registry of modules generated for it.
+
+    Tests that loop over both check that generated classes behave like dynamically
+    created ones.
+    """
+    yield registry
+    with GeneratedModules(registry) as generated:
+        yield generated.import_module("_registry").REGISTRY
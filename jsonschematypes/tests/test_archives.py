@@ -0,0 +1,73 @@
+"""
+Lazy archive indexing tests.
+"""
+from io import BytesIO
+from json import dumps
+from tarfile import TarFile, TarInfo
+from tempfile import NamedTemporaryFile
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    none,
+    raises,
+)
+
+from jsonschematypes.archives import PREFIX_SIZE, IncompleteSchema, TarArchive, scan_id
+
+
+def test_scan_id():
+    """
+    Top-level ids are found without parsing other values.
+    """
+    assert_that(scan_id('{"id": "foo", "type": "obj'), is_(equal_to("foo")))
+    assert_that(
+        scan_id('{"properties": {"id": {"id": "bar"}}, "id": "foo"}'),
+        is_(equal_to("foo")),
+    )
+    assert_that(scan_id('{"type": "object"}'), is_(none()))
+    assert_that(calling(scan_id).with_args('{"type": "object", "i'), raises(IncompleteSchema))
+    assert_that(calling(scan_id).with_args('[]'), raises(ValueError))
+
+
+def test_index():
+    """
+    Archives index members by id (and definition ids).
+    """
+    schemas = [
+        {
+            "description": "x" * PREFIX_SIZE,
+            "id": "foo",
+            "type": "string",
+        },
+        {
+            "id": "bar",
+            "definitions": {
+                "baz": {
+                    "id": "baz",
+                    "type": "integer",
+                },
+            },
+        },
+    ]
+    with NamedTemporaryFile() as fileobj:
+        tarfile = TarFile(mode="w", fileobj=fileobj)
+        for index, schema in enumerate(schemas):
+            data = dumps(schema).encode("utf-8")
+            tarinfo = TarInfo("schema{}.json".format(index))
+            tarinfo.size = len(data)
+            tarfile.addfile(tarinfo, BytesIO(data))
+        tarfile.close()
+        fileobj.flush()
+
+        archive = TarArchive(fileobj.name)
+        index = archive.index()
+
+        assert_that([ids for ids, _ in index], is_(equal_to([["foo"], ["bar", "baz"]])))
+        assert_that(archive.load(*index[0][1]), is_(equal_to(schemas[0])))
+        assert_that(archive.type_for(*index[0][1] + ("foo", )), is_(equal_to("string")))
+        assert_that(archive.type_for(*index[1][1] + ("bar", )), is_(none()))
+        assert_that(archive.type_for(*index[1][1] + ("baz", )), is_(equal_to("integer")))
+        archive.close()
@@ -0,0 +1,66 @@
+"""
+Benchmark suite tests.
+"""
+from json import load
+from os import close, remove
+from tempfile import mkstemp
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    greater_than,
+    has_length,
+    is_,
+)
+
+from jsonschematypes.benchmarks.runner import main, run
+from jsonschematypes.benchmarks.synthetic import make_instance, make_schemas, schema_id_for
+from jsonschematypes.registry import Registry
+
+
+def test_synthetic_registry():
+    """
+    Synthetic schemas resolve, and synthetic instances are valid.
+    """
+    schemas = make_schemas(7, depth=3, fields=2)
+    registry = Registry()
+    for schema in schemas:
+        registry.register(schema)
+
+    assert_that(registry.find_unresolved(), is_(equal_to(set())))
+    instance = make_instance(schemas)
+    registry.validate(instance, schema_id_for(0, 3))
+
+    root = registry.create_class(schema_id_for(0, 3))(instance)
+    assert_that(root.children[1].number, is_(equal_to(1)))
+    assert_that(root.child.child.number, is_(equal_to(2)))
+
+
+def test_run():
+    results = run(count=6, depth=3, fields=2, number=1, pattern="Registry")
+
+    assert_that([result["name"] for result in results["results"]], is_(equal_to([
+        "Registry.load() (6 json files)",
+        "Registry.load() (tar)",
+        "Registry.load() (tar.gz)",
+        "Registry.validate() (depth 3)",
+    ])))
+    for result in results["results"]:
+        assert_that(result["seconds"], is_(greater_than(0)))
+
+
+def test_main():
+    """
+    The console entry point writes results as JSON.
+    """
+    fd, filename = mkstemp(suffix=".json")
+    close(fd)
+    try:
+        main(["--count", "3", "--number", "1", "--filter", "loads", "--output", filename])
+        with open(filename) as fileobj:
+            results = load(fileobj)
+    finally:
+        remove(filename)
+
+    assert_that(results["parameters"]["count"], is_(equal_to(3)))
+    assert_that(results["results"], has_length(1))
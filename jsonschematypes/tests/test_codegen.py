@@ -0,0 +1,187 @@
+"""
+Ahead-of-time code generation tests.
+"""
+from os.path import exists, join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    instance_of,
+    is_,
+    is_not,
+    same_instance,
+)
+from jsonschematypes.codegen import ModuleGenerator, main
+from jsonschematypes.registry import Registry
+from jsonschematypes.tests.fixtures import (
+    NAME,
+    NAME_ID,
+    RECORD,
+    RECORD_ID,
+    GeneratedModules,
+    iter_registries,
+    schema_for,
+)
+
+
+NAMES_ID = "http://x.y.z/foo/names"
+OPTIONS_ID = "http://x.y.z/foo/options"
+
+
+def make_registry():
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+    registry.register({
+        "id": NAMES_ID,
+        "type": "array",
+        "items": {
+            "$ref": NAME_ID,
+        },
+    })
+    registry.register({
+        "id": OPTIONS_ID,
+        "type": "object",
+        "description": "Options",
+        "properties": {
+            "class": {
+                "type": "string",
+                "default": "x",
+            },
+            "tags": {
+                "type": "array",
+                "default": [],
+            },
+        },
+    })
+    return registry
+
+
+def test_generate_modules():
+    """
+    Generated modules match the package layout of dynamic imports.
+    """
+    with GeneratedModules(make_registry()) as generated:
+        for path in [
+            ("__init__.py", ),
+            ("_registry.py", ),
+            ("foo", "__init__.py"),
+            ("bar", "__init__.py"),
+        ]:
+            path = join(generated.directory, generated.basename, *path)
+            assert_that(exists(path), is_(equal_to(True)))
+
+        foo = generated.import_module("foo")
+        assert_that(foo.Name._ID, is_(equal_to(NAME_ID)))
+        assert_that(foo.Options.__doc__, is_(equal_to("Options")))
+        assert_that(generated.import_module("").Record._ID, is_(equal_to(RECORD_ID)))
+
+
+def test_generated_classes_behave_like_dynamic_classes():
+    """
+    Generated classes support the same operations as dynamically created ones.
+    """
+    for registry in iter_registries(make_registry()):
+        Record = registry.create_class(RECORD_ID)
+        Name = registry.create_class(NAME_ID)
+        Names = registry.create_class(NAMES_ID)
+        Options = registry.create_class(OPTIONS_ID)
+
+        record = Record(RECORD)
+        record.validate()
+        assert_that(record.name, is_(instance_of(Name)))
+        assert_that(record["name"], is_not(instance_of(Name)))
+        assert_that(record.name.first, is_(equal_to(NAME["first"])))
+
+        names = Names.loads('[{"first": "George", "last": "Washington"}]')
+        names.validate()
+        assert_that(names[0], is_(instance_of(Name)))
+
+        options = Options()
+        assert_that(getattr(options, "class"), is_(equal_to("x")))
+        assert_that(options.tags, is_(equal_to([])))
+        assert_that(options.tags, is_(equal_to(Options().tags)))
+        options.tags.append("y")
+        assert_that(Options().tags, is_(equal_to([])))
+
+
+def test_generated_classes_are_imported():
+    """
+    The registry of generated modules returns the generated classes.
+    """
+    with GeneratedModules(make_registry()) as generated:
+        foo = generated.import_module("foo")
+        from_registry = generated.import_module("_registry").REGISTRY
+
+        assert_that(from_registry.create_class(NAME_ID), is_(same_instance(foo.Name)))
+        assert_that(from_registry.create_class(NAMES_ID), is_(same_instance(foo.Names)))
+
+
+def test_class_names_do_not_shadow_imports():
+    """
+    Generated classes may have the same names as the classes that generated modules use.
+    """
+    registry = Registry()
+    for name in ("attribute", "schema_aware_dict", "unresolved"):
+        registry.register({
+            "id": "http://x/foo/{}".format(name),
+            "type": "object",
+        })
+    registry.register({
+        "id": "http://x/foo/thing",
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "child": {"$ref": "http://x/foo/attribute"},
+        },
+    })
+
+    with GeneratedModules(registry) as generated:
+        foo = generated.import_module("foo")
+        thing = foo.Thing(name="x", child={})
+
+        assert_that(thing.name, is_(equal_to("x")))
+        assert_that(thing.child, is_(instance_of(foo.Attribute)))
+        assert_that(foo.SchemaAwareDict._ID, is_(equal_to("http://x/foo/schema_aware_dict")))
+
+
+def test_illegal_names_are_skipped():
+    """
+    Schemas without legal class (or package) names are skipped and reported.
+    """
+    registry = make_registry()
+    registry.register({
+        "id": "foo/1-bar",
+        "type": "object",
+    })
+    registry.register({
+        "id": "1.0/baz",
+        "type": "object",
+    })
+    directory = mkdtemp()
+    try:
+        generator = ModuleGenerator(registry)
+        generator.generate(directory)
+
+        assert_that(sorted(generator.skipped), is_(equal_to(["1.0/baz", "foo/1-bar"])))
+        foo = join(directory, "generated", "foo", "__init__.py")
+        assert_that(exists(foo), is_(equal_to(True)))
+    finally:
+        rmtree(directory)
+
+
+def test_main():
+    """
+    The console entry point generates modules for schema files.
+    """
+    directory = mkdtemp()
+    try:
+        main(["--output", directory, "--basename", "test", schema_for("data/name.json")])
+        assert_that(exists(join(directory, "test", "foo", "__init__.py")), is_(equal_to(True)))
+    finally:
+        rmtree(directory)
@@ -0,0 +1,144 @@
+"""
+Schema compilation tests.
+"""
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_string,
+    equal_to,
+    is_,
+    raises,
+)
+from jsonschema import RefResolutionError, ValidationError
+
+from jsonschematypes.registry import Registry
+from jsonschematypes.tests.fixtures import (
+    ADDRESS,
+    NAME,
+    RECORD,
+    RECORD_ID,
+    schema_for,
+)
+
+
+def assert_same_verdict(registry, schema_id, instance):
+    """
+    Compiled and generic validation agree on an instance (including the error raised).
+    """
+    compiled = registry.compile(schema_id)
+    try:
+        registry.validate(instance, schema_id)
+    except ValidationError as error:
+        assert_that(compiled.is_valid(instance), is_(equal_to(False)))
+        assert_that(calling(compiled.validate).with_args(instance), raises(ValidationError))
+        try:
+            compiled.validate(instance)
+        except ValidationError as compiled_error:
+            assert_that(compiled_error.message, is_(equal_to(error.message)))
+            assert_that(list(compiled_error.path), is_(equal_to(list(error.path))))
+    else:
+        assert_that(compiled.is_valid(instance), is_(equal_to(True)))
+        compiled.validate(instance)
+
+
+def test_compile_record():
+    """
+    Compiled validators match generic validation across refs.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    assert_that(registry.compiler.source_for(RECORD_ID), contains_string("def check_0"))
+
+    for instance in [
+        RECORD,
+        {},
+        [],
+        dict(RECORD, name=dict(NAME, first=1)),
+        dict(RECORD, address=dict(ADDRESS, zip=None)),
+        dict(RECORD, name="George"),
+    ]:
+        assert_same_verdict(registry, RECORD_ID, instance)
+
+
+def test_compile_keywords():
+    """
+    Compiled validators match generic validation for inlined and fallback keywords.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "foo",
+        "type": "object",
+        "properties": {
+            "count": {"type": "integer"},
+            "ratio": {"type": ["number", "null"]},
+            "color": {"enum": ["red", "green"]},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "bar": {"$ref": "#/definitions/bar"},
+            "label": {"type": "string", "maxLength": 3},
+        },
+        "required": ["count"],
+        "additionalProperties": False,
+        "definitions": {
+            "bar": {
+                "id": "bar",
+                "type": "object",
+                "additionalProperties": {"type": "boolean"},
+            },
+        },
+    })
+
+    for instance in [
+        dict(count=1),
+        dict(count=True),
+        dict(count=1.0),
+        dict(count=1, ratio=None),
+        dict(count=1, ratio=0.5),
+        dict(count=1, ratio="0.5"),
+        dict(count=1, color="red"),
+        dict(count=1, color="blue"),
+        dict(count=1, tags=["a", "b"]),
+        dict(count=1, tags=["a", 1]),
+        dict(count=1, bar=dict(x=True)),
+        dict(count=1, bar=dict(x=1)),
+        dict(count=1, label="abc"),
+        dict(count=1, label="abcd"),
+        dict(count=1, other=1),
+        dict(),
+    ]:
+        assert_same_verdict(registry, "foo", instance)
+
+
+def test_compile_cyclic():
+    """
+    Compiled validators handle cyclic refs.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "node",
+        "type": "object",
+        "properties": {
+            "value": {"type": "integer"},
+            "children": {"type": "array", "items": {"$ref": "node"}},
+        },
+    })
+
+    assert_same_verdict(registry, "node", dict(value=1, children=[dict(value=2, children=[])]))
+    assert_same_verdict(registry, "node", dict(value=1, children=[dict(value="2")]))
+
+
+def test_compile_does_not_resolve_reference():
+    """
+    Compiled validators fall back to (and fail like) the generic validator for unresolved refs.
+    """
+    registry = Registry()
+    registry.load(schema_for("data/record.json"))
+
+    assert_that(
+        calling(registry.compile(RECORD_ID).validate).with_args(RECORD),
+        raises(RefResolutionError),
+    )
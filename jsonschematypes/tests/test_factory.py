@@ -8,14 +8,25 @@ from hamcrest import (
     calling,
     equal_to,
     has_properties,
+    has_property,
     instance_of,
     is_,
+    is_not,
+    none,
     raises,
+    same_instance,
 )
 from jsonschema import ValidationError
 
 from jsonschematypes.registry import Registry
-from jsonschematypes.tests.fixtures import NAME, NAME_ID, schema_for
+from jsonschematypes.tests.fixtures import (
+    NAME,
+    NAME_ID,
+    RECORD,
+    RECORD_ID,
+    iter_registries,
+    schema_for,
+)
 
 
 if sys.version > '3':
@@ -89,32 +100,33 @@ def test_object():
     registry = Registry()
     registry.load(schema_for("data/name.json"))
 
-    Name = registry.create_class(NAME_ID)
+    for registry in iter_registries(registry):
+        Name = registry.create_class(NAME_ID)
 
-    name = Name(
-        first="George",
-    )
+        name = Name(
+            first="George",
+        )
 
-    assert_that(calling(name.validate), raises(ValidationError))
+        assert_that(calling(name.validate), raises(ValidationError))
 
-    name.last = "Washington"
+        name.last = "Washington"
 
-    name.validate()
+        name.validate()
 
-    assert_that(
-        name,
-        has_properties(
-            first=equal_to("George"),
-            last=equal_to("Washington"),
+        assert_that(
+            name,
+            has_properties(
+                first=equal_to("George"),
+                last=equal_to("Washington"),
+            )
         )
-    )
-    assert_that(name, is_(equal_to(NAME)))
-    assert_that(name, is_(equal_to(Name(**NAME))))
-    assert_that(Name.loads(name.dumps()), is_(equal_to(name)))
+        assert_that(name, is_(equal_to(NAME)))
+        assert_that(name, is_(equal_to(Name(**NAME))))
+        assert_that(Name.loads(name.dumps()), is_(equal_to(name)))
 
-    del name.first
+        del name.first
 
-    assert_that(calling(name.validate), raises(ValidationError))
+        assert_that(calling(name.validate), raises(ValidationError))
 
 
 def test_enum():
@@ -128,15 +140,16 @@ def test_enum():
         "enum": ["Foo", "Bar"],
     })
 
-    Enum = registry.create_class("id")
+    for registry in iter_registries(registry):
+        Enum = registry.create_class("id")
 
-    enum = Enum("Foo")
-    enum.validate()
+        enum = Enum("Foo")
+        enum.validate()
 
-    assert_that(calling(Enum("").validate), raises(ValidationError))
+        assert_that(calling(Enum("").validate), raises(ValidationError))
 
-    assert_that(Enum.loads(enum.dumps()), is_(equal_to(enum)))
-    assert_that(enum.dumps(), is_(equal_to(('"Foo"'))))
+        assert_that(Enum.loads(enum.dumps()), is_(equal_to(enum)))
+        assert_that(enum.dumps(), is_(equal_to(('"Foo"'))))
 
 
 def test_array():
@@ -150,16 +163,17 @@ def test_array():
         "items": {"type": "integer"}
     })
 
-    Array = registry.create_class("id")
+    for registry in iter_registries(registry):
+        Array = registry.create_class("id")
 
-    array = Array([1, 2])
-    array.validate()
+        array = Array([1, 2])
+        array.validate()
 
-    assert_that(calling(Array("foo").validate), raises(ValidationError))
-    assert_that(calling(Array([1.0, 2.0]).validate), raises(ValidationError))
+        assert_that(calling(Array("foo").validate), raises(ValidationError))
+        assert_that(calling(Array([1.0, 2.0]).validate), raises(ValidationError))
 
-    assert_that(Array.loads(array.dumps()), is_(equal_to(array)))
-    assert_that(array.dumps(), is_(equal_to(('[1, 2]'))))
+        assert_that(Array.loads(array.dumps()), is_(equal_to(array)))
+        assert_that(array.dumps(), is_(equal_to(('[1, 2]'))))
 
 
 def test_boolean():
@@ -223,12 +237,13 @@ def test_create_nested():
         }
     })
 
-    Bar = registry.create_class("bar")
-    bar = Bar.loads('{"foo":{}}')
-    bar.validate()
+    for registry in iter_registries(registry):
+        Bar = registry.create_class("bar")
+        bar = Bar.loads('{"foo":{}}')
+        bar.validate()
 
-    Foo = registry.create_class("foo")
-    assert_that(bar.foo, is_(instance_of(Foo)))
+        Foo = registry.create_class("foo")
+        assert_that(bar.foo, is_(instance_of(Foo)))
 
 
 def test_create_nested_definition():
@@ -252,12 +267,13 @@ def test_create_nested_definition():
         }
     })
 
-    Bar = registry.create_class("bar")
-    bar = Bar.loads('{"foo":{}}')
-    bar.validate()
+    for registry in iter_registries(registry):
+        Bar = registry.create_class("bar")
+        bar = Bar.loads('{"foo":{}}')
+        bar.validate()
 
-    Foo = registry.create_class("foo")
-    assert_that(bar.foo, is_(instance_of(Foo)))
+        Foo = registry.create_class("foo")
+        assert_that(bar.foo, is_(instance_of(Foo)))
 
 
 def test_create_nested_array():
@@ -277,9 +293,259 @@ def test_create_nested_array():
         }
     })
 
-    Bar = registry.create_class("bar")
-    bar = Bar.loads('[{}, {}]')
-    bar.validate()
+    for registry in iter_registries(registry):
+        Bar = registry.create_class("bar")
+        bar = Bar.loads('[{}, {}]')
+        bar.validate()
+
+        Foo = registry.create_class("foo")
+        assert_that(bar[0], is_(instance_of(Foo)))
+
+
+def test_validate_many():
+    """
+    Generated classes can validate many instances.
+    """
+    registry = Registry()
+    registry.load(schema_for("data/name.json"))
+
+    for registry in iter_registries(registry):
+        Name = registry.create_class(NAME_ID)
+
+        results = list(Name.validate_many([NAME, {}], collect_errors=False))
+        assert_that([result.ok for result in results], is_(equal_to([True, False])))
+        assert_that(results[1].errors, is_(none()))
+
+
+def test_nested_attribute_is_not_stored():
+    """
+    By default, nested types are converted on each access and the data is left as is.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    for registry in iter_registries(registry):
+        Record = registry.create_class(RECORD_ID)
+        record = Record(RECORD)
+
+        assert_that(record.name, is_(instance_of(registry.create_class(NAME_ID))))
+        assert_that(record.name, is_not(same_instance(record.name)))
+        assert_that(record["name"], is_(same_instance(RECORD["name"])))
+
+
+def test_nested_attribute_is_converted_once():
+    """
+    Nested types are converted on first access and changes persist, if stored.
+    """
+    registry = Registry(store_converted=True)
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    for registry in iter_registries(registry):
+        Record = registry.create_class(RECORD_ID)
+        record = Record(RECORD)
+
+        assert_that(record.name, is_(same_instance(record.name)))
+
+        record.name.first = "Martha"
+        assert_that(record.name.first, is_(equal_to("Martha")))
+        assert_that(record["name"]["first"], is_(equal_to("Martha")))
+
+
+def test_ref_classes_are_resolved_once():
+    """
+    Ref classes are resolved lazily, once, including for cyclic and unresolvable refs.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "node",
+        "type": "object",
+        "properties": {
+            "parent": {
+                "$ref": "node"
+            },
+            "missing": {
+                "$ref": "missing"
+            },
+            "children": {
+                "$ref": "nodes"
+            }
+        }
+    })
+    registry.register({
+        "id": "nodes",
+        "type": "array",
+        "items": {
+            "$ref": "node"
+        }
+    })
+
+    for registry in iter_registries(registry):
+        Node = registry.create_class("node")
+        Nodes = registry.create_class("nodes")
+
+        node = Node(parent={}, missing={}, children=[{}])
+
+        assert_that(node.parent, is_(instance_of(Node)))
+        assert_that(node.children, is_(instance_of(Nodes)))
+        assert_that(node.children[0], is_(instance_of(Node)))
+        assert_that(node.missing, is_(equal_to({})))
+
+        assert_that(Node.parent.ref_class, is_(same_instance(Node)))
+        assert_that(Node.missing.ref_class, is_(none()))
+        assert_that(Nodes._ITEM_CLASS, is_(same_instance(Node)))
+
+
+def test_defaults():
+    """
+    Defaults are set for missing properties and mutable defaults are not shared.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "foo",
+        "type": "object",
+        "properties": {
+            "fooBar": {
+                "type": "string",
+                "default": "baz"
+            },
+            "tags": {
+                "type": "array",
+                "default": []
+            },
+            "other": {
+                "type": "string"
+            }
+        }
+    })
+
+    for registry in iter_registries(registry):
+        Foo = registry.create_class("foo")
+
+        foo = Foo(fooBar="qux")
+        assert_that(foo, is_(equal_to(dict(fooBar="qux", tags=[]))))
+        assert_that(Foo(), is_(equal_to(dict(fooBar="baz", tags=[]))))
+
+        foo.tags.append("tag")
+        assert_that(Foo().tags, is_(equal_to([])))
+
+
+def test_record():
+    """
+    Can create a compact record class for an object schema.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    Name = registry.create_record_class(NAME_ID)
+    Record = registry.create_record_class(RECORD_ID)
+
+    name = Name(first="George")
+    assert_that(name, is_not(has_property("__dict__")))
+    assert_that(calling(getattr).with_args(name, "last"), raises(AttributeError))
+    assert_that(calling(name.validate), raises(ValidationError))
+
+    name.last = "Washington"
+    name.validate()
+
+    assert_that(name.to_dict(), is_(equal_to(NAME)))
+    assert_that(name, is_(equal_to(Name.from_dict(NAME))))
+    assert_that(Name.loads(name.dumps()), is_(equal_to(name)))
+
+    record = Record(dict(RECORD, extra=1))
+    assert_that(record.name, is_(instance_of(Name)))
+    assert_that(record.to_dict(), is_(equal_to(dict(RECORD, extra=1))))
+    assert_that(Record.loads(record.dumps()), is_(equal_to(record)))
+
+
+def test_record_illegal_attribute_names():
+    """
+    Properties whose attribute names are not legal identifiers are kept in the dictionary.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "http://x.y.z/thing",
+        "type": "object",
+        "properties": {
+            "@type": {"type": "string", "default": "thing"},
+            "name": {"type": "string"},
+        },
+    })
+    Thing = registry.create_record_class("http://x.y.z/thing")
+
+    thing = Thing(name="foo")
+    assert_that(thing.name, is_(equal_to("foo")))
+    assert_that(thing.to_dict(), is_(equal_to({"@type": "thing", "name": "foo"})))
+    assert_that(Thing.loads(thing.dumps()), is_(equal_to(thing)))
+
+
+def test_record_duplicate_attribute_names():
+    """
+    Properties whose attribute names collide do not share a slot.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "http://x.y.z/thing",
+        "type": "object",
+        "properties": {
+            "fooBar": {"type": "integer"},
+            "foo_bar": {"type": "integer"},
+            "validate": {"type": "integer"},
+        },
+    })
+    Thing = registry.create_record_class("http://x.y.z/thing")
+
+    data = {"fooBar": 1, "foo_bar": 2, "validate": 3}
+    thing = Thing(data)
+    assert_that(thing.to_dict(), is_(equal_to(data)))
+    thing.validate()
+
+
+def test_nested_array_access():
+    """
+    Array items are converted (once) for all kinds of access.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "foo",
+        "type": "object"
+    })
+    registry.register({
+        "id": "bar",
+        "type": "array",
+        "items": {
+            "$ref": "foo"
+        }
+    })
+
+    for registry in iter_registries(registry):
+        Bar = registry.create_class("bar")
+        Foo = registry.create_class("foo")
+
+        bar = Bar.loads('[{"x": 0}, {"x": 1}, {"x": 2}]')
+
+        assert_that(bar[-1], is_(same_instance(bar[2])))
+        assert_that(all(isinstance(foo, Foo) for foo in bar), is_(equal_to(True)))
+        assert_that(all(isinstance(foo, Foo) for foo in reversed(bar)), is_(equal_to(True)))
+        assert_that(all(isinstance(foo, Foo) for foo in bar.typed_items()), is_(equal_to(True)))
+        assert_that(bar[1:], is_(instance_of(Bar)))
+        assert_that(bar[1:][0], is_(same_instance(bar[1])))
+
+        for foo in bar:
+            foo["y"] = foo["x"]
+        assert_that(bar, is_(equal_to([dict(x=0, y=0), dict(x=1, y=1), dict(x=2, y=2)])))
 
-    Foo = registry.create_class("foo")
-    assert_that(bar[0], is_(instance_of(Foo)))
+        bar.append({})
+        assert_that(bar.pop(), is_(instance_of(Foo)))
+        assert_that(Bar.loads(bar.dumps()), is_(equal_to(bar)))
@@ -0,0 +1,212 @@
+"""
+Reference graph tests.
+"""
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+    is_not,
+    same_instance,
+)
+
+from jsonschematypes.graph import RefGraph, iter_refs, iter_scoped_refs
+from jsonschematypes.registry import Registry
+
+
+def test_iter_refs():
+    """
+    Refs are found in nested subschemas, but not in definitions with ids.
+    """
+    schema = {
+        "id": "foo",
+        "allOf": [{"$ref": "a"}],
+        "anyOf": [{"properties": {"x": {"$ref": "b"}}}],
+        "oneOf": [{"items": [{"$ref": "c"}]}],
+        "not": {"$ref": "d"},
+        "additionalProperties": {"items": {"$ref": "e"}},
+        "patternProperties": {"^x": {"$ref": "f"}},
+        "dependencies": {"x": {"$ref": "g"}, "y": ["x"]},
+        "definitions": {
+            "anonymous": {"$ref": "h"},
+            "named": {"id": "named", "$ref": "i"},
+        },
+    }
+
+    assert_that(sorted(iter_refs(schema)), is_(equal_to(list("abcdefgh"))))
+
+
+def refs(*urls):
+    return [(url, url) for url in urls]
+
+
+def test_iter_scoped_refs():
+    """
+    Subschemas with ids change the resolution scope of the refs within them.
+    """
+    schema = {
+        "id": "http://x/a/foo",
+        "properties": {
+            "x": {"$ref": "a"},
+            "y": {
+                "id": "../b/",
+                "items": {"$ref": "#/definitions/c"},
+                "additionalProperties": {"id": "bar", "$ref": "d"},
+            },
+        },
+    }
+
+    assert_that(sorted(iter_scoped_refs(schema)), is_(equal_to([
+        ("#/definitions/c", "http://x/b/"),
+        ("a", "http://x/a/foo"),
+        ("d", "http://x/b/bar"),
+    ])))
+
+
+def test_missing_refs():
+    """
+    Missing refs are tracked as schemas are added and removed.
+    """
+    graph = RefGraph()
+
+    graph.add("a", refs("b", "c"))
+    assert_that(graph.missing, is_(equal_to({"b", "c"})))
+
+    graph.add("b", refs("c#/definitions/x"))
+    assert_that(graph.missing, is_(equal_to({"c"})))
+
+    graph.add("a", refs())
+    assert_that(graph.missing, is_(equal_to({"c"})))
+
+    graph.remove("b")
+    assert_that(graph.missing, is_(equal_to(set())))
+
+
+def test_unresolved_refs():
+    """
+    Unresolved refs are tracked as schemas are added and removed.
+    """
+    graph = RefGraph()
+
+    graph.add("a", refs("b", "c#/x"))
+    assert_that(graph.unresolved, is_(equal_to({
+        "b": {("a", "b", "b")},
+        "c": {("a", "c#/x", "c#/x")},
+    })))
+
+    graph.add("b", refs("a"))
+    graph.add("c", refs())
+    assert_that(graph.unresolved, is_(equal_to({})))
+
+    graph.remove("b")
+    assert_that(graph.unresolved, is_(equal_to({"b": {("a", "b", "b")}})))
+
+    graph.add("a", refs())
+    assert_that(graph.unresolved, is_(equal_to({})))
+
+
+def test_transitive_queries():
+    """
+    Dependencies and dependents are found transitively, including cycles.
+    """
+    graph = RefGraph.from_refs({
+        "a": refs("b"),
+        "b": refs("c"),
+        "c": refs("b"),
+        "d": refs(),
+    })
+
+    assert_that(graph.dependencies_of(["a"]), is_(equal_to({"a", "b", "c"})))
+    assert_that(graph.dependents_of(["c"]), is_(equal_to({"a", "b", "c"})))
+    assert_that(graph.dependents_of(["d"]), is_(equal_to({"d"})))
+
+    order = graph.topological_order()
+    assert_that(sorted(order), is_(equal_to(["a", "b", "c", "d"])))
+    assert_that(order.index("a") > order.index("b"), is_(equal_to(True)))
+    assert_that(order.index("a") > order.index("c"), is_(equal_to(True)))
+    assert_that(graph.topological_order(["b"]), is_(equal_to(["c", "b"])))
+
+
+def test_registry_graph():
+    """
+    Registry refs are normalized relative to schema ids.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "http://x.y.z/foo/bar",
+        "properties": {
+            "baz": {
+                "anyOf": [
+                    {"$ref": "baz#/definitions/x"},
+                    {"$ref": "#/definitions/qux"},
+                ],
+            },
+        },
+        "definitions": {
+            "qux": {
+                "id": "http://x.y.z/foo/qux",
+            },
+        },
+    })
+
+    assert_that(registry.find_unresolved(), is_(equal_to({"baz#/definitions/x"})))
+    assert_that(
+        registry.graph.dependencies_of(["http://x.y.z/foo/bar"]),
+        is_(equal_to({"http://x.y.z/foo/bar", "http://x.y.z/foo/baz", "http://x.y.z/foo/qux"})),
+    )
+
+
+def test_unresolved_pointers():
+    """
+    Refs with JSON pointers are unresolved unless they point into registered schemas.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "http://x/a",
+        "properties": {
+            "b": {"$ref": "b"},
+            "c": {"$ref": "#/definitions/c"},
+            "d": {"$ref": "http://y/d#/definitions/e"},
+            "f": {"$ref": "#/properties/b"},
+        },
+    })
+
+    assert_that(
+        registry.find_unresolved(),
+        is_(equal_to({"#/definitions/c", "b", "http://y/d#/definitions/e"})),
+    )
+
+    registry.register({"id": "http://y/d", "definitions": {"e": {"id": "http://y/e"}}})
+    assert_that(registry.find_unresolved(), is_(equal_to({"#/definitions/c", "b"})))
+
+
+def test_nested_scopes():
+    """
+    Refs in subschemas with ids are resolved against their ids.
+    """
+    registry = Registry()
+    registry.register({
+        "id": "http://x/a/foo",
+        "properties": {
+            "bar": {
+                "id": "http://x/b/",
+                "properties": {
+                    "baz": {"$ref": "baz"},
+                    "qux": {"$ref": "qux#/definitions/quux"},
+                },
+            },
+        },
+    })
+
+    assert_that(
+        registry.graph.dependencies_of(["http://x/a/foo"]),
+        is_(equal_to({"http://x/a/foo", "http://x/b/baz", "http://x/b/qux"})),
+    )
+    assert_that(registry.find_unresolved(), is_(equal_to({"baz", "qux#/definitions/quux"})))
+
+    registry.register({"id": "http://x/b/baz"})
+    registry.register({"id": "http://x/b/qux", "definitions": {"quux": {"id": "quux"}}})
+    assert_that(registry.find_unresolved(), is_(equal_to(set())))
+
+    Foo = registry.create_class("http://x/a/foo")
+    registry.register({"id": "http://x/b/baz", "type": "object"})
+    assert_that(registry.create_class("http://x/a/foo"), is_not(same_instance(Foo)))
@@ -1,16 +1,28 @@
 """
 Code generation and import tests.
 """
+from tempfile import NamedTemporaryFile
+
 from hamcrest import (
     assert_that,
     calling,
     equal_to,
+    has_key,
     is_,
+    is_not,
     raises,
+    same_instance,
 )
 from jsonschematypes.modules import ModuleLoader
 from jsonschematypes.registry import Registry
-from jsonschematypes.tests.fixtures import schema_for
+from jsonschematypes.tests.fixtures import (
+    ADDRESS_ID,
+    NAME_ID,
+    RECORD_ID,
+    GeneratedModules,
+    build_tar,
+    schema_for,
+)
 
 
 def test_package_names():
@@ -89,10 +101,140 @@ def test_imports():
     registry.load(schema_for("data/name.json"))
     registry.configure_imports()
 
-    from generated.foo import Name
+    import generated.foo
+
+    # ahead-of-time generated modules behave the same
+    with GeneratedModules(registry) as modules:
+        for foo in (generated.foo, modules.import_module("foo")):
+            name = foo.Name(
+                first="George",
+                last="Washington",
+            )
+            name.validate()
+            assert_that(name._ID, is_(equal_to(NAME_ID)))
+            assert_that("Name" in dir(foo), is_(equal_to(True)))
+            assert_that(
+                calling(getattr).with_args(foo, "Address"),
+                raises(AttributeError),
+            )
+
+
+def test_imported_classes_are_invalidated():
+    """
+    Imported modules refer to new classes after a schema changes.
+    """
+    registry = Registry()
+    registry.load(schema_for("data/name.json"))
+    registry.configure_imports(basename="invalidated")
+
+    from invalidated.foo import Name
+    import invalidated.foo
+
+    registry.register(dict(registry[NAME_ID], description="A new name"))
+
+    assert_that(invalidated.foo.Name, is_not(same_instance(Name)))
+    assert_that(invalidated.foo.Name.__doc__, is_(equal_to("A new name")))
+
 
-    name = Name(
-        first="George",
-        last="Washington",
+def test_imports_use_package_index():
+    """
+    Imports only create classes in the imported module; the index follows registration.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+    registry.configure_imports(basename="indexed")
+
+    from indexed import Record
+
+    assert_that(Record._ID, is_(equal_to(RECORD_ID)))
+    assert_that(registry.factory.classes, is_not(has_key(NAME_ID)))
+
+    registry.register({
+        "id": "http://x.y.z/foo/nickname",
+        "type": "object",
+    })
+
+    from indexed.foo import Name, Nickname
+
+    assert_that(Name._ID, is_(equal_to(NAME_ID)))
+    assert_that(Nickname._ID, is_(equal_to("http://x.y.z/foo/nickname")))
+
+    index = registry.finders[0].loader.index
+    assert_that(index.schema_ids_for("indexed.bar"), is_(equal_to([ADDRESS_ID])))
+
+    registry.unregister(ADDRESS_ID)
+    assert_that("indexed.bar" in index, is_(equal_to(False)))
+    assert_that(
+        calling(__import__).with_args("indexed.bar"),
+        raises(ImportError),
     )
-    name.validate()
+
+
+def test_classes_are_created_on_access():
+    """
+    Generated modules create classes when they are first accessed.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+    )
+    registry.configure_imports(basename="lazy")
+
+    import lazy.foo
+
+    assert_that(registry.factory.classes, is_not(has_key(NAME_ID)))
+    assert_that("Name" in dir(lazy.foo), is_(equal_to(True)))
+    assert_that(registry.factory.classes, is_not(has_key(NAME_ID)))
+
+    from lazy.foo import Name
+
+    assert_that(Name, is_(same_instance(registry.create_class(NAME_ID))))
+    assert_that(Name, is_(same_instance(lazy.foo.Name)))
+    assert_that(
+        calling(getattr).with_args(lazy.foo, "Address"),
+        raises(AttributeError),
+    )
+
+
+def test_star_imports_and_lazy_schemas():
+    """
+    Generated modules support `import *`; class names are cached without loading lazy schemas.
+    """
+    with NamedTemporaryFile() as fileobj:
+        build_tar(fileobj)
+        fileobj.flush()
+
+        registry = Registry()
+        registry.load(fileobj.name, lazy=True)
+        registry.configure_imports(basename="starred")
+
+        import starred.foo
+
+        assert_that(starred.foo.__all__, is_(equal_to(["Name"])))
+        assert_that(registry.lazy, has_key(NAME_ID))
+
+        index = registry.finders[0].loader.index
+        assert_that(index.class_names, has_key("starred.foo"))
+
+        registry.register({
+            "id": "http://x.y.z/foo/nickname",
+            "type": "object",
+        })
+        assert_that(
+            index.class_names["starred.foo"],
+            is_(equal_to({"Name": NAME_ID, "Nickname": "http://x.y.z/foo/nickname"})),
+        )
+
+        namespace = {}
+        exec("from starred.foo import *", namespace)
+
+        assert_that(namespace["Name"]._ID, is_(equal_to(NAME_ID)))
+        assert_that(namespace["Nickname"], is_(same_instance(starred.foo.Nickname)))
+
+        registry.unregister("http://x.y.z/foo/nickname")
+        assert_that(starred.foo.__all__, is_(equal_to(["Name"])))
@@ -0,0 +1,101 @@
+"""
+Name cache tests.
+"""
+from tempfile import NamedTemporaryFile
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+)
+
+from jsonschematypes.factory import TypeFactory
+from jsonschematypes.names import CacheInfo, NameCache
+from jsonschematypes.registry import Registry
+from jsonschematypes.tests.fixtures import NAME_ID, schema_for
+
+
+def test_name_cache():
+    """
+    Names are computed once and evicted least recently used first.
+    """
+    calls = []
+
+    def upper(name):
+        calls.append(name)
+        return name.upper()
+
+    cache = NameCache(upper, maxsize=2)
+
+    assert_that(cache["a"], is_(equal_to("A")))
+    assert_that(cache["a"], is_(equal_to("A")))
+    assert_that(cache["b"], is_(equal_to("B")))
+    assert_that(cache["a"], is_(equal_to("A")))
+    assert_that(cache["c"], is_(equal_to("C")))
+    assert_that(cache["b"], is_(equal_to("B")))
+
+    assert_that(calls, is_(equal_to(["a", "b", "c", "b"])))
+    assert_that(cache.info(), is_(equal_to(CacheInfo(hits=2, misses=4, maxsize=2, currsize=2))))
+
+
+def test_disabled_name_cache():
+    """
+    Name caches with a size of zero do not cache.
+    """
+    cache = NameCache(str.upper, maxsize=0)
+
+    cache["a"]
+    cache["a"]
+
+    assert_that(cache.info(), is_(equal_to(CacheInfo(hits=0, misses=2, maxsize=0, currsize=0))))
+
+
+def test_overridden_names_are_cached():
+    """
+    Factories cache names from (overridden) naming methods.
+    """
+    class PrefixedTypeFactory(TypeFactory):
+        def class_name_for(self, schema_id):
+            return "Prefixed" + super(PrefixedTypeFactory, self).class_name_for(schema_id)
+
+    registry = Registry()
+    registry.factory = PrefixedTypeFactory(registry)
+    registry.load(schema_for("data/name.json"))
+
+    assert_that(registry.create_class(NAME_ID).__name__, is_(equal_to("PrefixedName")))
+    assert_that(registry.factory.class_names.info().misses, is_(equal_to(1)))
+    assert_that(registry.factory.attribute_names.info().currsize, is_(equal_to(3)))
+
+
+def test_precomputed_names():
+    """
+    Precomputed names are kept regardless of the cache size.
+    """
+    cache = NameCache(str.upper, maxsize=2)
+
+    cache.update(dict(a="x", b="y", c="z"))
+    cache["d"]
+    cache["e"]
+    cache["f"]
+
+    assert_that(cache["a"], is_(equal_to("x")))
+    assert_that(len(cache), is_(equal_to(5)))
+    assert_that(cache.info(), is_(equal_to(CacheInfo(hits=1, misses=3, maxsize=2, currsize=2))))
+
+
+def test_snapshot_names():
+    """
+    Registries created from snapshots keep all precomputed class names.
+    """
+    registry = Registry()
+    count = TypeFactory.NAME_CACHE_SIZE + 10
+    for index in range(count):
+        registry.register({"id": "http://x.y.z/names/schema{}".format(index)})
+
+    with NamedTemporaryFile() as fileobj:
+        registry.save_snapshot(fileobj.name)
+        snapshot = Registry.from_snapshot(fileobj.name)
+
+    assert_that(len(snapshot.factory.class_names), is_(equal_to(count)))
+    snapshot.create_class("http://x.y.z/names/schema0")
+    assert_that(snapshot.factory.class_names.info().misses, is_(equal_to(0)))
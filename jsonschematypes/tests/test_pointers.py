@@ -0,0 +1,165 @@
+"""
+Pointer index tests.
+"""
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+    none,
+    same_instance,
+)
+
+from jsonschematypes.pointers import normalize_url
+from jsonschematypes.registry import Registry
+
+
+SCHEMA = {
+    "id": "http://x.y.z/base/root",
+    "type": "object",
+    "properties": {
+        "a/b": {"type": "string"},
+        "child": {"$ref": "#/definitions/child"},
+        "sibling": {"$ref": "child"},
+        "other": {"$ref": "other#"},
+        "list": {"items": [{"type": "integer"}, {"$ref": "#/properties/a~1b"}]},
+    },
+    "definitions": {
+        "child": {
+            "id": "child",
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+            },
+        },
+    },
+}
+
+OTHER = {
+    "id": "http://x.y.z/base/other",
+    "type": "object",
+    "properties": {
+        "root": {"$ref": "root"},
+    },
+}
+
+
+def make_registry():
+    registry = Registry()
+    registry.register(SCHEMA)
+    registry.register(OTHER)
+    return registry
+
+
+def test_normalize_url():
+    assert_that(normalize_url("foo#"), is_(equal_to("foo")))
+    assert_that(normalize_url("foo#definitions/bar"), is_(equal_to("foo#/definitions/bar")))
+    assert_that(normalize_url("foo#/a%20b"), is_(equal_to("foo#/a b")))
+
+
+def test_lookup():
+    """
+    Schemas, definitions (by pointer and by relative id) and arbitrary sub-schemas are indexed.
+    """
+    registry = make_registry()
+    pointers = registry.pointers
+
+    assert_that(pointers.get("http://x.y.z/base/root#"), is_(same_instance(SCHEMA)))
+    assert_that(
+        pointers.get("http://x.y.z/base/root#/definitions/child"),
+        is_(same_instance(SCHEMA["definitions"]["child"])),
+    )
+    assert_that(pointers.get("child"), is_(same_instance(SCHEMA["definitions"]["child"])))
+    assert_that(
+        pointers.get("http://x.y.z/base/child#"),
+        is_(same_instance(SCHEMA["definitions"]["child"])),
+    )
+    assert_that(
+        pointers.get("http://x.y.z/base/root#/properties/a~1b"),
+        is_(same_instance(SCHEMA["properties"]["a/b"])),
+    )
+    assert_that(
+        pointers.get("http://x.y.z/base/root#/properties/list/items/0"),
+        is_(equal_to({"type": "integer"})),
+    )
+    assert_that(pointers.get("http://x.y.z/base/root#/properties/missing"), is_(none()))
+    assert_that(pointers.get("http://x.y.z/base/missing"), is_(none()))
+
+
+def test_non_ascii_keys():
+    registry = Registry()
+    registry.register({
+        "id": "http://x.y.z/base/unicode",
+        "properties": {u"caf\u00e9": {"type": "string"}},
+    })
+
+    assert_that(
+        registry.pointers.get(u"http://x.y.z/base/unicode#/properties/caf\u00e9"),
+        is_(equal_to({"type": "string"})),
+    )
+
+
+def test_unregister():
+    registry = make_registry()
+    registry.unregister("http://x.y.z/base/other")
+
+    assert_that(registry.pointers.get("http://x.y.z/base/other#/properties"), is_(none()))
+
+
+def test_expand_ref():
+    """
+    Refs expand to the ids of the schemas they refer to (joined with the schema's id).
+    """
+    registry = make_registry()
+
+    assert_that(registry.expand_ref(SCHEMA, "#/definitions/child"), is_(equal_to("child")))
+    assert_that(registry.expand_ref(SCHEMA, "child"), is_(equal_to("child")))
+    assert_that(registry.expand_ref(SCHEMA, "other#"), is_(equal_to("http://x.y.z/base/other")))
+    assert_that(
+        registry.expand_ref(OTHER, "root#/definitions/child"),
+        is_(equal_to("child")),
+    )
+    assert_that(
+        registry.expand_ref(SCHEMA, "#/properties/a~1b"),
+        is_(equal_to("http://x.y.z/base/root#/properties/a~1b")),
+    )
+
+
+def test_validate():
+    """
+    Relative ids, trailing "#" and arbitrary pointers are resolved through the index.
+    """
+    registry = make_registry()
+
+    assert_that(registry.validate({
+        "a/b": "x",
+        "child": {"name": "x"},
+        "sibling": {"name": "x"},
+        "other": {"root": {"a/b": "y"}},
+        "list": [1, "x"],
+    }, "http://x.y.z/base/root"), is_(equal_to(None)))
+
+    for instance in [
+        {"child": {"name": 1}},
+        {"sibling": {"name": 1}},
+        {"other": {"root": {"a/b": 1}}},
+        {"list": [1, 2]},
+    ]:
+        assert_that(
+            registry.validator_for("http://x.y.z/base/root").is_valid(instance),
+            is_(equal_to(False)),
+        )
+        assert_that(
+            registry.compile("http://x.y.z/base/root").check(instance),
+            is_(equal_to(False)),
+        )
+
+
+def test_create_class_for_pointer():
+    """
+    Classes are created for refs that resolve (by pointer or by id) to registered schemas.
+    """
+    registry = make_registry()
+
+    child_class = registry.create_class_for(OTHER, "root#/definitions/child")
+    assert_that(child_class, is_(same_instance(registry.create_class("child"))))
+    assert_that(registry.create_class_for(SCHEMA, "#/properties/a~1b"), is_(none()))
@@ -1,9 +1,15 @@
 """
 Test registry loading and validation.
 """
+from contextlib import closing
 from gzip import GzipFile
-from tarfile import TarFile
-from tempfile import NamedTemporaryFile
+from io import BytesIO
+from json import dump, dumps
+from os import remove, utime
+from os.path import join
+from shutil import copy, rmtree
+from tarfile import TarFile, TarInfo
+from tempfile import NamedTemporaryFile, mkdtemp
 
 from hamcrest import (
     assert_that,
@@ -13,27 +19,26 @@ from hamcrest import (
     has_key,
     has_length,
     is_,
+    is_not,
     raises,
+    same_instance,
 )
 from jsonschema import RefResolutionError, ValidationError
 
-from jsonschematypes.registry import Registry
+from jsonschematypes.files import GZIP, JSON, TAR, SchemaLoadError, detect_mime_type
+from jsonschematypes.registry import RefreshReport, Registry
+from jsonschematypes.snapshots import StaleSnapshotError
 from jsonschematypes.tests.fixtures import (
     ADDRESS_ID,
+    NAME,
     NAME_ID,
     RECORD,
     RECORD_ID,
+    build_tar,
     schema_for,
 )
 
 
-def build_tar(fileobj, mode="w"):
-    tarfile = TarFile(mode=mode, fileobj=fileobj)
-    tarfile.add(schema_for("data/address.json"))
-    tarfile.add(schema_for("data/name.json"))
-    tarfile.add(schema_for("data/record.json"))
-
-
 def test_load_single_file():
     """
     Registry can load a single file.
@@ -113,6 +118,167 @@ def test_load_compressed_tarfile():
         assert_that(registry, has_key(RECORD_ID))
 
 
+def test_load_compressed_file():
+    """
+    Registry can load a compressed (non-archive) schema file.
+    """
+    registry = Registry()
+
+    with NamedTemporaryFile() as fileobj:
+        with GzipFile(fileobj.name, "w") as gzfileobj:
+            with open(schema_for("data/name.json"), "rb") as schemafileobj:
+                gzfileobj.write(schemafileobj.read())
+        fileobj.flush()
+
+        schema_ids = registry.load(fileobj.name)
+        assert_that(schema_ids, is_(equal_to([NAME_ID])))
+
+
+def test_load_tarfile_lazily():
+    """
+    Registry can index a tar file and load its schemas on first use.
+    """
+    registry = Registry()
+
+    with NamedTemporaryFile() as fileobj:
+        build_tar(fileobj)
+        fileobj.flush()
+
+        schema_ids = registry.load(fileobj.name, lazy=True)
+        assert_that(set(schema_ids), is_(equal_to({ADDRESS_ID, NAME_ID, RECORD_ID})))
+        assert_that(registry, has_length(0))
+        assert_that(NAME_ID in registry, is_(equal_to(True)))
+        assert_that(registry.find_unresolved(), is_(equal_to(set())))
+
+        Record = registry.create_class(RECORD_ID)
+        assert_that(registry, has_length(1))
+
+        record = Record(RECORD)
+        record.validate()
+        assert_that(registry, has_length(3))
+        assert_that(record.name, is_(equal_to(NAME)))
+        # loading the other members did not invalidate the class
+        assert_that(registry.create_class(RECORD_ID), is_(same_instance(Record)))
+
+        with NamedTemporaryFile() as snapshotfileobj:
+            registry = Registry()
+            registry.load(fileobj.name, lazy=True)
+            registry.save_snapshot(snapshotfileobj.name)
+
+            snapshot = Registry.from_snapshot(snapshotfileobj.name)
+            assert_that(snapshot, has_length(0))
+            assert_that(snapshot[NAME_ID], is_(equal_to(registry[NAME_ID])))
+
+
+def test_detect_mime_type():
+    """
+    Mime types are detected from content signatures and extensions.
+    """
+    assert_that(detect_mime_type(schema_for("data/name.json")), is_(equal_to(JSON)))
+
+    with NamedTemporaryFile() as fileobj:
+        build_tar(fileobj)
+        fileobj.flush()
+        assert_that(detect_mime_type(fileobj.name), is_(equal_to(TAR)))
+
+    with NamedTemporaryFile() as fileobj:
+        with GzipFile(fileobj.name, "w") as gzfileobj:
+            gzfileobj.write(b"{}")
+        assert_that(detect_mime_type(fileobj.name), is_(equal_to(GZIP)))
+
+    with NamedTemporaryFile(suffix=".json") as fileobj:
+        fileobj.write(b"\n")
+        fileobj.flush()
+        assert_that(detect_mime_type(fileobj.name), is_(equal_to(JSON)))
+
+
+def test_load_with_mime_type():
+    """
+    Mime type detection can be overridden per call.
+    """
+    registry = Registry(mime_types={
+        "application/x-custom": lambda filename, mime_types, codec: iter([{"id": "custom"}]),
+    })
+
+    schema_ids = registry.load(schema_for("data/name.json"), mime_type="application/x-custom")
+    assert_that(schema_ids, is_(equal_to(["custom"])))
+
+
+def test_two_argument_mime_type_loaders():
+    """
+    Mime type loading functions without a codec argument are still supported.
+    """
+    def iter_custom(filename, mime_types):
+        return iter([{"id": "custom"}])
+
+    registry = Registry(mime_types={"application/x-custom": iter_custom}, codec=u"json")
+
+    schema_ids = registry.load(schema_for("data/name.json"), mime_type="application/x-custom")
+    assert_that(schema_ids, is_(equal_to(["custom"])))
+
+
+def test_load_in_parallel():
+    """
+    Registry can read and parse files in parallel, registering them in order.
+    """
+    filenames = [
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    ]
+    expected = Registry().load(*filenames)
+
+    for processes in (False, True):
+        registry = Registry(codec="json-compact")
+        schema_ids = registry.load(*filenames, workers=2, processes=processes)
+        assert_that(schema_ids, is_(equal_to(expected)))
+        assert_that(registry, has_length(3))
+
+
+def test_load_error_names_file():
+    """
+    Errors parsing a file name the file.
+    """
+    with NamedTemporaryFile(suffix=".json") as fileobj:
+        fileobj.write(b'{"id": ')
+        fileobj.flush()
+
+        for workers in (None, 2):
+            assert_that(
+                calling(Registry().load).with_args(
+                    schema_for("data/name.json"),
+                    fileobj.name,
+                    workers=workers,
+                ),
+                raises(SchemaLoadError, fileobj.name),
+            )
+
+
+def test_read_error_names_file():
+    """
+    Errors reading a file (or archive) name the file.
+    """
+    directory = mkdtemp()
+    try:
+        corrupt = join(directory, "corrupt.tar")
+        with open(corrupt, "wb") as fileobj:
+            fileobj.write(b"not a tar" * 100)
+        missing = join(directory, "missing.json")
+
+        for filename in (corrupt, missing):
+            for workers in (None, 2):
+                assert_that(
+                    calling(Registry().load).with_args(
+                        schema_for("data/name.json"),
+                        filename,
+                        workers=workers,
+                    ),
+                    raises(SchemaLoadError, filename),
+                )
+    finally:
+        rmtree(directory)
+
+
 def test_validate():
     """
     Registry can validate using stored schemas.
@@ -161,3 +327,312 @@ def test_find_unresolved():
         registry.find_unresolved(),
         is_(equal_to({ADDRESS_ID, NAME_ID}))
     )
+
+
+def test_validator_is_cached():
+    """
+    Registry reuses validators across calls.
+    """
+    registry = Registry()
+
+    registry.load(schema_for("data/name.json"))
+
+    validator = registry.validator_for(NAME_ID)
+
+    assert_that(registry.validator_for(NAME_ID), is_(same_instance(validator)))
+    assert_that(registry.validator_for(NAME_ID, skip_http=False), is_not(same_instance(validator)))
+
+
+def test_validator_cache_is_invalidated_on_register():
+    """
+    Registering a schema invalidates cached validators.
+    """
+    registry = Registry()
+
+    registry.load(schema_for("data/name.json"))
+
+    registry.validate(NAME, NAME_ID)
+
+    registry.register({
+        "id": NAME_ID,
+        "properties": {
+            "first": {
+                "type": "integer",
+            },
+        },
+    })
+
+    assert_that(
+        calling(registry.validate).with_args(NAME, NAME_ID),
+        raises(ValidationError),
+    )
+
+
+def test_register_invalidates_dependents_only():
+    """
+    Registering a new version of a schema invalidates it and its dependents only.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    Address = registry.create_class(ADDRESS_ID)
+    Name = registry.create_class(NAME_ID)
+    Record = registry.create_class(RECORD_ID)
+    validator = registry.validator_for(ADDRESS_ID)
+
+    registry.register(dict(registry[NAME_ID], description="A new name"))
+
+    assert_that(registry.create_class(ADDRESS_ID), is_(same_instance(Address)))
+    assert_that(registry.validator_for(ADDRESS_ID), is_(same_instance(validator)))
+    assert_that(registry.create_class(NAME_ID), is_not(same_instance(Name)))
+    assert_that(registry.create_class(RECORD_ID), is_not(same_instance(Record)))
+
+    # registering an identical schema is a no-op
+    Name = registry.create_class(NAME_ID)
+    registry.register(dict(registry[NAME_ID]))
+    assert_that(registry.create_class(NAME_ID), is_(same_instance(Name)))
+
+
+def test_unregister():
+    """
+    Unregistering a schema invalidates its dependents.
+    """
+    registry = Registry()
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+    registry.create_class(RECORD_ID)
+
+    invalidated = registry.unregister(NAME_ID)
+
+    assert_that(invalidated, is_(equal_to({NAME_ID, RECORD_ID})))
+    assert_that(registry.find_unresolved(), is_(equal_to({NAME_ID})))
+    assert_that(registry.create_class(RECORD_ID)(RECORD).name, is_(equal_to(NAME)))
+
+
+def test_load_directory_and_refresh():
+    """
+    Registry can reload changed, new and removed files in a directory.
+    """
+    directory = mkdtemp()
+    try:
+        for name in ("address.json", "name.json"):
+            copy(schema_for(join("data", name)), directory)
+
+        registry = Registry()
+        schema_ids = registry.load_directory(directory, watch=True)
+        assert_that(schema_ids, is_(equal_to([ADDRESS_ID, NAME_ID])))
+        Address = registry.create_class(ADDRESS_ID)
+
+        assert_that(
+            registry.refresh(),
+            is_(equal_to(RefreshReport(set(), set(), set(), set(), {}))),
+        )
+
+        # change a file (with a different mtime)
+        filename = join(directory, "name.json")
+        with open(filename, "w") as fileobj:
+            dump(dict(registry[NAME_ID], description="A new name"), fileobj)
+        utime(filename, (0, 0))
+        # add a file that depends on it
+        copy(schema_for("data/record.json"), directory)
+
+        report = registry.refresh()
+        assert_that(report.added, is_(equal_to({RECORD_ID})))
+        assert_that(report.updated, is_(equal_to({NAME_ID})))
+        assert_that(report.invalidated, is_(equal_to({NAME_ID, RECORD_ID})))
+        assert_that(registry[NAME_ID]["description"], is_(equal_to("A new name")))
+        assert_that(registry.create_class(ADDRESS_ID), is_(same_instance(Address)))
+
+        remove(filename)
+
+        report = registry.refresh()
+        assert_that(report.removed, is_(equal_to({NAME_ID})))
+        assert_that(report.invalidated, is_(equal_to({NAME_ID, RECORD_ID})))
+        assert_that(registry, is_not(has_key(NAME_ID)))
+    finally:
+        rmtree(directory)
+
+
+def test_refresh_definitions_and_failures():
+    """
+    Refreshing removes dropped definitions and skips files that cannot be loaded.
+    """
+    directory = mkdtemp()
+    try:
+        filename = join(directory, "a.json")
+
+        def write(data, mtime):
+            with open(filename, "w") as fileobj:
+                fileobj.write(data)
+            utime(filename, (mtime, mtime))
+
+        schema = {
+            "id": "http://x.y.z/refresh/a",
+            "definitions": {
+                "b": {"id": "http://x.y.z/refresh/b"},
+                "c": {"id": "http://x.y.z/refresh/c"},
+            },
+        }
+        write(dumps(schema), 0)
+        registry = Registry()
+        registry.load_directory(directory)
+
+        # a half-written file
+        write('{"id": ', 1)
+        report = registry.refresh()
+        assert_that(report.failed, has_key(filename))
+        assert_that(report.removed, is_(equal_to(set())))
+        assert_that(registry, has_key("http://x.y.z/refresh/c"))
+
+        del schema["definitions"]["c"]
+        write(dumps(schema), 2)
+        report = registry.refresh()
+        assert_that(report.failed, is_(equal_to({})))
+        assert_that(report.removed, is_(equal_to({"http://x.y.z/refresh/c"})))
+        assert_that(registry, is_not(has_key("http://x.y.z/refresh/c")))
+        assert_that(registry, has_key("http://x.y.z/refresh/b"))
+    finally:
+        rmtree(directory)
+
+
+def test_bulk_load_is_linear():
+    """
+    Registering schemas before the schemas they ref does not walk all their dependents.
+    """
+    class CountingRegistry(Registry):
+        checks = 0
+
+        def is_cached(self, schema_id):
+            CountingRegistry.checks += 1
+            return super(CountingRegistry, self).is_cached(schema_id)
+
+    count = 2000
+    registry = CountingRegistry()
+    registry.load(schema_for("data/name.json"))
+    registry.create_class(NAME_ID)
+
+    with NamedTemporaryFile() as fileobj:
+        tarfile = TarFile(mode="w", fileobj=fileobj)
+        for index in range(count):
+            data = dumps({
+                "id": "http://x.y.z/chain/schema{}".format(index),
+                "type": "object",
+                "properties": {
+                    "next": {"$ref": "http://x.y.z/chain/schema{}".format(index + 1)},
+                },
+            }).encode("utf-8")
+            tarinfo = TarInfo("schema{}.json".format(index))
+            tarinfo.size = len(data)
+            tarfile.addfile(tarinfo, BytesIO(data))
+        tarfile.close()
+        fileobj.flush()
+
+        registry.load(fileobj.name)
+
+    assert_that(registry, has_length(count + 1))
+    assert_that(CountingRegistry.checks, is_(equal_to(count - 1)))
+
+
+def test_refresh_moved_schema():
+    """
+    Schemas may move between files; reloaded files keep their `load()` arguments.
+    """
+    directory = mkdtemp()
+    try:
+        def write_tar(name, mtime, *filenames):
+            path = join(directory, name)
+            with closing(TarFile(path, mode="w")) as tarfile:
+                for filename in filenames:
+                    tarfile.add(schema_for(join("data", filename)))
+            # (padded) archives may keep their sizes
+            utime(path, (mtime, mtime))
+
+        write_tar("a.tar", 0, "address.json")
+        write_tar("b.tar", 0, "name.json", "record.json")
+        registry = Registry()
+        registry.load_directory(directory, lazy=True)
+
+        # move a schema into an earlier file
+        write_tar("a.tar", 1, "address.json", "name.json")
+        write_tar("b.tar", 1, "record.json")
+
+        report = registry.refresh()
+        assert_that(report.added, is_(equal_to(set())))
+        assert_that(report.removed, is_(equal_to(set())))
+        assert_that(registry.lazy, has_key(NAME_ID))
+        assert_that(registry[NAME_ID]["id"], is_(equal_to(NAME_ID)))
+    finally:
+        rmtree(directory)
+
+
+def test_validate_many():
+    """
+    Registry can validate many instances lazily.
+    """
+    registry = Registry()
+
+    registry.load(schema_for("data/name.json"))
+
+    def generate():
+        yield NAME
+        yield {}
+        yield dict(NAME, first=1)
+        yield NAME
+
+    results = list(registry.validate_many(generate(), NAME_ID))
+    assert_that([result.index for result in results], is_(equal_to([0, 1, 2, 3])))
+    assert_that([result.ok for result in results], is_(equal_to([True, False, False, True])))
+    assert_that(results[1].errors, has_length(2))
+    assert_that(results[2].errors, has_length(1))
+
+    results = list(registry.validate_many(generate(), NAME_ID, max_failures=1))
+    assert_that(results, has_length(2))
+
+    assert_that(
+        registry.count_valid(generate(), NAME_ID),
+        is_(equal_to((2, 2))),
+    )
+
+
+def test_snapshot():
+    """
+    Registry can be saved to and created from a snapshot.
+    """
+    registry = Registry()
+
+    with NamedTemporaryFile(suffix=".json") as schemafileobj:
+        with open(schema_for("data/record.json"), "rb") as fileobj:
+            schemafileobj.write(fileobj.read())
+        schemafileobj.flush()
+
+        registry.load(
+            schema_for("data/name.json"),
+            schemafileobj.name,
+        )
+
+        with NamedTemporaryFile() as fileobj:
+            registry.save_snapshot(fileobj.name)
+
+            snapshot = Registry.from_snapshot(fileobj.name)
+            assert_that(snapshot, is_(equal_to(registry)))
+            assert_that(snapshot.find_unresolved(), is_(equal_to({ADDRESS_ID})))
+            assert_that(
+                snapshot.create_class(RECORD_ID).__name__,
+                is_(equal_to("Record")),
+            )
+
+            schemafileobj.write(b" ")
+            schemafileobj.flush()
+
+            assert_that(
+                calling(Registry.from_snapshot).with_args(fileobj.name),
+                raises(StaleSnapshotError),
+            )
+            Registry.from_snapshot(fileobj.name, check=False)
@@ -0,0 +1,63 @@
+"""
+JSON codec tests.
+"""
+import pickle
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    raises,
+)
+
+from jsonschematypes.registry import Registry
+from jsonschematypes.serialization import JSONCodec, make_codec
+from jsonschematypes.tests.fixtures import NAME, NAME_ID, schema_for
+
+
+class UpperCaseCodec(JSONCodec):
+    """
+    A (silly) custom codec.
+    """
+    def dumps(self, obj):
+        return super(UpperCaseCodec, self).dumps(obj).upper()
+
+
+def test_codec_by_name():
+    """
+    Generated classes serialize with their registry's codec.
+    """
+    registry = Registry(codec="json-compact")
+    registry.load(schema_for("data/name.json"))
+
+    Name = registry.create_class(NAME_ID)
+    name = Name(first="George")
+
+    assert_that(name.dumps(), is_(equal_to('{"first":"George"}')))
+    assert_that(Name.loads(b'{"first": "George"}'), is_(equal_to(name)))
+    assert_that(calling(Registry).with_args(codec="unknown"), raises(ValueError))
+
+
+def test_custom_codec():
+    """
+    Registries accept codec instances.
+    """
+    registry = Registry(codec=UpperCaseCodec())
+    registry.load(schema_for("data/name.json"))
+
+    Name = registry.create_class(NAME_ID)
+    assert_that(Name(NAME).dumps(), is_(equal_to(JSONCodec().dumps(NAME).upper())))
+
+    Name = registry.create_record_class(NAME_ID)
+    assert_that(Name(NAME).dumps(), is_(equal_to(JSONCodec().dumps(NAME).upper())))
+
+
+def test_codecs_are_picklable():
+    """
+    Codecs pickle as their options.
+    """
+    codec = pickle.loads(pickle.dumps(make_codec("json-compact")))
+
+    assert_that(codec.dumps({"a": 1}), is_(equal_to('{"a":1}')))
+    assert_that(codec.loads('{"a": 1}'), is_(equal_to({"a": 1})))
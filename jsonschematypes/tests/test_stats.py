@@ -0,0 +1,184 @@
+"""
+Instrumentation tests.
+"""
+from threading import Event, Thread
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    has_entries,
+    is_,
+    none,
+    raises,
+)
+from jsonschema import ValidationError
+
+from jsonschematypes.registry import Registry
+from jsonschematypes.stats import Histogram, Stats
+from jsonschematypes.tests.fixtures import NAME, NAME_ID, RECORD_ID, schema_for
+
+
+def make_registry(stats=None):
+    registry = Registry(stats=stats)
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+    return registry
+
+
+def test_disabled():
+    registry = make_registry()
+
+    assert_that(registry.stats, is_(none()))
+    assert_that(registry.factory.stats, is_(none()))
+    registry.validate(NAME, NAME_ID)
+
+
+def test_stats():
+    """
+    Loading, registration, class generation and validation are recorded.
+    """
+    stats = Stats()
+    registry = make_registry(stats)
+
+    registry.create_class(RECORD_ID)
+    registry.create_class(RECORD_ID)
+    registry.validate(NAME, NAME_ID)
+    registry.validate(NAME, NAME_ID)
+    assert_that(
+        calling(registry.validate).with_args(dict(first=1, last="x"), NAME_ID),
+        raises(ValidationError),
+    )
+    counts = registry.count_valid([NAME, dict()], NAME_ID)
+
+    assert_that(counts.invalid, is_(equal_to(1)))
+    assert_that(sorted(stats.load_times), is_(equal_to(sorted([
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    ]))))
+    assert_that(stats.schemas_registered, is_(equal_to(3)))
+    assert_that(stats.classes_generated, is_(equal_to(1)))
+    assert_that(stats.class_cache_hits, is_(equal_to(1)))
+    assert_that(stats.validator_builds, is_(equal_to({NAME_ID: 1})))
+    assert_that(stats.validation_latency[NAME_ID].count, is_(equal_to(5)))
+    assert_that(stats.validation_failures, is_(equal_to({
+        (NAME_ID, "first"): 1,
+        (NAME_ID, None): 1,
+    })))
+
+
+def test_primitive_classes():
+    """
+    Lookups of classes for primitive schemas are recorded too.
+    """
+    stats = Stats()
+    registry = Registry(stats=stats)
+    registry.register({"id": "http://x.y.z/count", "type": "integer"})
+
+    registry.create_class("http://x.y.z/count")
+    registry.create_class("http://x.y.z/count")
+
+    assert_that(stats.class_cache_misses, is_(equal_to(1)))
+    assert_that(stats.class_cache_hits, is_(equal_to(1)))
+
+
+def test_capture():
+    """
+    Captured counts cover the block only and are added to the installed stats.
+    """
+    stats = Stats()
+    registry = make_registry(stats)
+
+    with registry.capture() as captured:
+        registry.create_class(NAME_ID)
+        registry.validate(NAME, NAME_ID)
+
+    assert_that(registry.stats, is_(equal_to(stats)))
+    assert_that(captured.snapshot(), has_entries(
+        schemas_registered=0,
+        classes_generated=1,
+        validator_builds={NAME_ID: 1},
+    ))
+    assert_that(stats.schemas_registered, is_(equal_to(3)))
+    assert_that(stats.classes_generated, is_(equal_to(1)))
+
+    registry.instrument(None)
+    with registry.capture() as captured:
+        registry.validate(NAME, NAME_ID)
+    assert_that(registry.stats, is_(none()))
+    assert_that(captured.validation_latency[NAME_ID].count, is_(equal_to(1)))
+
+
+def test_interleaved_captures():
+    """
+    Captures may end in any order.
+    """
+    stats = Stats()
+    registry = make_registry(stats)
+
+    outer, inner = registry.capture(), registry.capture()
+    first = outer.__enter__()
+    registry.create_class(NAME_ID)
+    second = inner.__enter__()
+    registry.validate(NAME, NAME_ID)
+    outer.__exit__(None, None, None)
+    registry.create_class(RECORD_ID)
+    inner.__exit__(None, None, None)
+
+    assert_that(registry.stats, is_(equal_to(stats)))
+    assert_that(registry.factory.stats, is_(equal_to(stats)))
+    assert_that(first.classes_generated, is_(equal_to(1)))
+    assert_that(first.validation_latency, is_(equal_to({})))
+    assert_that(second.classes_generated, is_(equal_to(1)))
+    assert_that(second.validation_latency[NAME_ID].count, is_(equal_to(1)))
+    assert_that(stats.classes_generated, is_(equal_to(2)))
+    assert_that(stats.validation_latency[NAME_ID].count, is_(equal_to(1)))
+
+
+def test_concurrent_captures():
+    """
+    Captures only record operations of their own thread.
+    """
+    stats = Stats()
+    registry = make_registry(stats)
+    started, validated = Event(), Event()
+    captured = {}
+
+    def validate():
+        with registry.capture() as captured["validate"]:
+            started.wait()
+            registry.validate(NAME, NAME_ID)
+            validated.set()
+
+    thread = Thread(target=validate)
+    thread.start()
+    with registry.capture() as captured["create"]:
+        started.set()
+        validated.wait()
+        registry.create_class(NAME_ID)
+    thread.join()
+
+    assert_that(registry.stats, is_(equal_to(stats)))
+    assert_that(captured["create"].classes_generated, is_(equal_to(1)))
+    assert_that(captured["create"].validation_latency, is_(equal_to({})))
+    assert_that(captured["validate"].classes_generated, is_(equal_to(0)))
+    assert_that(captured["validate"].validation_latency[NAME_ID].count, is_(equal_to(1)))
+    assert_that(stats.classes_generated, is_(equal_to(1)))
+    assert_that(stats.validation_latency[NAME_ID].count, is_(equal_to(1)))
+
+
+def test_histogram():
+    histogram = Histogram()
+    for seconds in (5e-6, 5e-5, 5e-5, 2.0):
+        histogram.add(seconds)
+
+    assert_that(histogram.counts, is_(equal_to([1, 2, 0, 0, 0, 0, 1])))
+    assert_that(histogram.max, is_(equal_to(2.0)))
+
+    other = Histogram()
+    other.update(histogram)
+    assert_that(other.as_dict()["count"], is_(equal_to(4)))
@@ -0,0 +1,65 @@
+"""
+Incremental loading tests.
+"""
+from io import BytesIO, StringIO
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    raises,
+)
+from jsonschema import ValidationError
+
+from jsonschematypes.registry import Registry
+from jsonschematypes.streams import iter_array, iter_ndjson
+from jsonschematypes.tests.fixtures import NAME, NAME_ID, schema_for
+
+
+def test_iter_ndjson():
+    """
+    Can iterate through newline-delimited JSON.
+    """
+    fileobj = BytesIO(b'{"a": 1}\n\n[2]\n"c"\n')
+
+    assert_that(list(iter_ndjson(fileobj)), is_(equal_to([{"a": 1}, [2], "c"])))
+
+
+def test_iter_array():
+    """
+    Can iterate through a JSON array across chunk boundaries.
+    """
+    data = u'[{"a": "é"}, 12345, -1.5e10, [true, null], "x"]'
+
+    for chunk_size in (1, 2, 3, 1024):
+        assert_that(
+            list(iter_array(BytesIO(data.encode("utf-8")), chunk_size)),
+            is_(equal_to([{"a": u"é"}, 12345, -1.5e10, [True, None], "x"])),
+        )
+        assert_that(
+            list(iter_array(StringIO(data), chunk_size)),
+            is_(equal_to([{"a": u"é"}, 12345, -1.5e10, [True, None], "x"])),
+        )
+
+    assert_that(list(iter_array(StringIO(u" [ ] "))), is_(equal_to([])))
+    assert_that(calling(list).with_args(iter_array(StringIO(u"{}"))), raises(ValueError))
+    assert_that(calling(list).with_args(iter_array(StringIO(u"[1, "))), raises(ValueError))
+
+
+def test_iter_load():
+    """
+    Generated classes can load instances incrementally.
+    """
+    registry = Registry()
+    registry.load(schema_for("data/name.json"))
+
+    Name = registry.create_class(NAME_ID)
+
+    names = Name.iter_load(StringIO(u'[{}, {"first": "George"}]'), format="array")
+    assert_that([name.__class__ for name in names], is_(equal_to([Name, Name])))
+
+    names = Name.iter_load(StringIO(u'{"first": "George", "last": "Washington"}\n{}\n'),
+                           validate=True)
+    assert_that(next(names), is_(equal_to(NAME)))
+    assert_that(calling(next).with_args(names), raises(ValidationError))
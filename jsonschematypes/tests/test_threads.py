@@ -0,0 +1,213 @@
+"""
+Concurrent warm-up tests.
+"""
+from importlib import import_module
+from tempfile import NamedTemporaryFile
+from threading import Event, Thread
+from time import sleep
+from uuid import uuid4
+import sys
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    has_length,
+    is_,
+    same_instance,
+)
+
+from jsonschematypes.factory import TypeFactory
+from jsonschematypes.names import NameCache
+from jsonschematypes.registry import Registry
+from jsonschematypes.tests.fixtures import (
+    NAME,
+    NAME_ID,
+    RECORD,
+    RECORD_ID,
+    build_tar,
+    schema_for,
+)
+
+
+THREADS = 16
+
+
+def make_schemas(count):
+    return [
+        {
+            "id": "http://x.y.z/threads/schema{}".format(index),
+            "type": "object",
+            "properties": {
+                "child": {"$ref": "http://x.y.z/threads/schema{}".format(index + 1)},
+            },
+        }
+        for index in range(count)
+    ]
+
+
+class SlowTypeFactory(TypeFactory):
+    """
+    A factory whose class generation is slow enough for threads to overlap.
+    """
+    def class_name_for(self, schema_id):
+        sleep(0.001)
+        return super(SlowTypeFactory, self).class_name_for(schema_id)
+
+
+def hammer(func, keys, threads=THREADS):
+    """
+    Call `func` for every key from many threads that start at once.
+
+    Returns each thread's results (in key order).
+    """
+    start = Event()
+    results = [None] * threads
+    errors = []
+
+    def run(thread):
+        start.wait()
+        try:
+            results[thread] = [func(key) for key in keys]
+        except Exception as error:
+            errors.append(error)
+
+    workers = [Thread(target=run, args=(thread, )) for thread in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join()
+
+    assert_that(errors, is_(equal_to([])))
+    return results
+
+
+def assert_identical(results):
+    """
+    Every thread got the same objects.
+    """
+    for result in results[1:]:
+        assert_that(
+            all(value is expected for value, expected in zip(result, results[0])),
+            is_(equal_to(True)),
+        )
+
+
+def test_concurrent_make_class():
+    """
+    Classes are created once per schema, however many threads request them first.
+    """
+    registry = Registry()
+    registry.factory = SlowTypeFactory(registry)
+    schemas = make_schemas(20)
+    for schema in schemas:
+        registry.register(schema)
+    schema_ids = [schema["id"] for schema in schemas]
+
+    assert_identical(hammer(registry.create_class, schema_ids))
+    assert_identical(hammer(registry.create_record_class, schema_ids))
+    assert_that(registry.factory.class_names.info().misses, is_(equal_to(20)))
+    assert_that(registry.factory.locks, has_length(0))
+
+
+def test_primitive_classes_are_cached():
+    """
+    Primitive bases are cached like generated classes, so lookups do not lock.
+    """
+    registry = Registry()
+    registry.register({"id": "http://x.y.z/threads/flag", "type": "boolean"})
+
+    assert_that(registry.create_class("http://x.y.z/threads/flag"), is_(equal_to(bool)))
+    assert_that(registry.factory.classes["http://x.y.z/threads/flag"], is_(equal_to(bool)))
+
+
+def test_concurrent_validation():
+    """
+    Validators (and their resolution scopes) may be built and used by many threads at once.
+    """
+    registry = Registry()
+    build = registry.build_validator
+    builds = []
+
+    def slow_build(*args):
+        builds.append(args)
+        sleep(0.001)
+        return build(*args)
+
+    registry.build_validator = slow_build
+    registry.load(
+        schema_for("data/address.json"),
+        schema_for("data/name.json"),
+        schema_for("data/record.json"),
+    )
+
+    instances = [RECORD, dict(RECORD, name=dict(first=1)), NAME] * 20
+
+    def validate(instance):
+        return registry.validator_for(RECORD_ID).is_valid(instance)
+
+    results = hammer(validate, instances)
+    assert_that(results[0][:3], is_(equal_to([True, False, False])))
+    assert_that(set(map(tuple, results)), has_length(1))
+    assert_that(builds, is_(equal_to([(RECORD_ID, True)])))
+
+    assert_identical(hammer(registry.compile, [RECORD_ID, NAME_ID]))
+
+
+def test_concurrent_imports():
+    """
+    Generated modules (and their classes) are created once.
+    """
+    registry = Registry()
+    for schema in make_schemas(5):
+        registry.register(schema)
+    basename = "test_{}".format(uuid4().hex)
+    registry.configure_imports(basename)
+    try:
+        def import_class(index):
+            module = import_module("{}.threads".format(basename))
+            return module, getattr(module, "Schema{}".format(index))
+
+        results = hammer(import_class, range(5))
+        assert_identical([
+            [value for pair in result for value in pair]
+            for result in results
+        ])
+    finally:
+        sys.meta_path.remove(registry.finders[0])
+        for name in list(sys.modules):
+            if name.split(".")[0] == basename:
+                del sys.modules[name]
+
+
+def test_concurrent_name_cache():
+    """
+    Name caches stay bounded (and count every lookup) when shared between threads.
+    """
+    cache = NameCache(str.upper, maxsize=8)
+    keys = [str(index % 20) for index in range(500)]
+
+    results = hammer(cache.__getitem__, keys)
+
+    assert_that(results[0], is_(equal_to([key.upper() for key in keys])))
+    info = cache.info()
+    assert_that(info.currsize, is_(equal_to(8)))
+    assert_that(info.hits + info.misses, is_(equal_to(THREADS * len(keys))))
+
+
+def test_concurrent_lazy_loading():
+    """
+    Lazily indexed schemas are loaded once.
+    """
+    with NamedTemporaryFile() as fileobj:
+        build_tar(fileobj)
+        fileobj.flush()
+
+        registry = Registry()
+        schema_ids = sorted(registry.load(fileobj.name, lazy=True))
+        Record = registry.create_class(RECORD_ID)
+
+        assert_identical(hammer(registry.__getitem__, schema_ids))
+        assert_that(registry, has_length(3))
+        assert_that(registry.lazy, has_length(0))
+        assert_that(registry.create_class(RECORD_ID), is_(same_instance(Record)))
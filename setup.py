@@ -2,7 +2,7 @@
 
 from setuptools import setup, find_packages
 
-__version__ = '0.5'
+__version__ = '0.6'
 
 __build__ = ''
 
@@ -17,13 +17,24 @@ setup(name='jsonschematypes',
           'nose>=1.0'
       ],
       install_requires=[
-          'jsonschema>=2.4.0',
+          # RegistryResolver relies on RefResolver internals (_urljoin_cache, _scopes_stack)
+          'jsonschema>=2.6.0,<3.0.0',
           'inflection>=0.3.1',
-          'python-magic>=0.4.6',
       ],
+      extras_require={
+          'magic': [
+              'python-magic>=0.4.6',
+          ],
+      },
       tests_require=[
           'coverage>=3.7.1',
           'PyHamcrest>=1.8.3',
       ],
       test_suite='jsonschematypes.tests',
+      entry_points={
+          'console_scripts': [
+              'jsonschematypes-benchmark = jsonschematypes.benchmarks.runner:main',
+              'jsonschematypes-codegen = jsonschematypes.codegen:main',
+          ],
+      },
       )